@@ -0,0 +1,122 @@
+"""
+Benchmark dos backends de extração do /browse (src/harvesters/extratores_html.py).
+
+Roda cada backend instalado sobre as páginas salvas em fixtures/, confere que
+o resultado é idêntico ao do BeautifulSoup e mostra páginas/s e o ganho.
+
+As fixtures browse_*.html são geradas pelo servidor DSpace local e só têm a
+lista do /browse. As riunb_*.html são páginas reais do RIUnB (cabeçalho,
+facetas e list-group da barra lateral, scripts), baixadas com --capturar: nelas
+o benchmark também confere que só os itens do índice foram contados (rpp itens).
+
+Uso:
+    python playground/benchmarks/benchmark_extratores.py
+    python playground/benchmarks/benchmark_extratores.py --gerar-fixtures   # refaz as páginas a partir de data/raw
+    python playground/benchmarks/benchmark_extratores.py --capturar         # baixa as páginas reais (precisa de rede)
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+DIR_BENCH = os.path.dirname(os.path.abspath(__file__))
+DIR_FIXTURES = os.path.join(DIR_BENCH, 'fixtures')
+sys.path.insert(0, os.path.join(DIR_BENCH, '..', '..', 'src', 'harvesters'))
+
+import extratores_html  # noqa: E402
+
+# fixture -> (tipo do índice, offset, rpp)
+PAGINAS = {
+    'browse_author_rpp50.html': ('author', 20000, 50),
+    'browse_advisor_rpp50.html': ('advisor', 1000, 50),
+    'browse_subject_rpp50.html': ('subject', 30000, 50),
+    'browse_subject_rpp500.html': ('subject', 5000, 500),
+    'browse_title_rpp50.html': ('title', 0, 50),
+}
+# Páginas reais do RIUnB, mesmo formato
+CAPTURAS = {
+    'riunb_author_rpp50.html': ('author', 0, 50),
+}
+
+
+def gerar_fixtures():
+    import servidor_dspace_local as servidor
+    indices = servidor.carregar_indices()
+    os.makedirs(DIR_FIXTURES, exist_ok=True)
+    for nome, (tipo, offset, rpp) in PAGINAS.items():
+        html = servidor.renderizar_pagina(tipo, indices[tipo][offset:offset + rpp])
+        with open(os.path.join(DIR_FIXTURES, nome), 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"📝 {nome}: {rpp} itens de type={tipo}")
+
+
+def capturar_fixtures():
+    """Baixa as páginas de CAPTURAS do RIUnB com a sessão, os parâmetros e o User-Agent dos coletores."""
+    import motor_coleta
+    from coleta_completa import INDICES
+    os.makedirs(DIR_FIXTURES, exist_ok=True)
+    for k, (nome, (tipo, offset, rpp)) in enumerate(CAPTURAS.items()):
+        if k:
+            time.sleep(1 / motor_coleta.TAXA_POLIDEZ)  # Uma página por vez, no ritmo dos coletores
+        motor = motor_coleta.MotorDeColeta(INDICES[tipo], rpp=rpp)
+        resposta = motor._buscar(offset)
+        resposta.raise_for_status()
+        with open(os.path.join(DIR_FIXTURES, nome), 'w', encoding='utf-8') as f:
+            f.write(resposta.text)
+        print(f"🌐 {nome}: {resposta.url} ({len(resposta.content) / 1024:.0f} KB)")
+
+
+def medir(funcao, html, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao(html)
+    return (time.perf_counter() - inicio) / repeticoes
+
+
+def rodar(repeticoes):
+    fixtures = sorted(glob.glob(os.path.join(DIR_FIXTURES, '*.html')))
+    if not fixtures:
+        print("❌ Nenhuma fixture encontrada. Rode com --gerar-fixtures.")
+        return
+
+    print(f"🔬 Backends instalados: {', '.join(extratores_html.BACKENDS)} | {repeticoes} repetições por página")
+    if not any(os.path.basename(caminho) in CAPTURAS for caminho in fixtures):
+        print("⚠️ Nenhuma página real do RIUnB em fixtures/: só o HTML do servidor local está sendo medido. "
+              "Rode com --capturar.")
+    print("-" * 72)
+    for caminho in fixtures:
+        nome = os.path.basename(caminho)
+        with open(caminho, encoding='utf-8') as f:
+            html = f.read()
+        indice = 1 if '_title_' in nome else 0
+
+        referencia = extratores_html.BACKENDS['bs4'][indice](html)
+        tempo_bs4 = medir(extratores_html.BACKENDS['bs4'][indice], html, repeticoes)
+        print(f"📄 {nome} ({len(html) / 1024:.0f} KB, {referencia[0]} itens)")
+        if nome in CAPTURAS:
+            rpp = CAPTURAS[nome][2]
+            status = "✅" if referencia[0] == len(referencia[1]) == rpp else \
+                f"❌ esperados {rpp} itens do índice (barra lateral ou cabeçalho entrando na contagem?)"
+            print(f"   ↳ página real {status}")
+        for backend, funcoes in extratores_html.BACKENDS.items():
+            resultado = funcoes[indice](html)
+            status = "✅" if resultado == referencia else "❌ DIFERENTE do bs4"
+            tempo = tempo_bs4 if backend == 'bs4' else medir(funcoes[indice], html, repeticoes)
+            print(f"   ↳ {backend:<11} {tempo * 1000:8.3f} ms/página | {1 / tempo:8.0f} páginas/s | "
+                  f"{tempo_bs4 / tempo:5.1f}x {status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos extratores de HTML do /browse")
+    parser.add_argument('--gerar-fixtures', action='store_true', help="Refaz as fixtures a partir de data/raw")
+    parser.add_argument('--capturar', action='store_true', help="Baixa as páginas reais do RIUnB para fixtures/")
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.gerar_fixtures:
+        gerar_fixtures()
+    if args.capturar:
+        capturar_fixtures()
+    rodar(args.repeticoes)
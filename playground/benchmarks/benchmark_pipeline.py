@@ -0,0 +1,418 @@
+"""
+Benchmark de ponta a ponta dos estágios do GID, em escalas sintéticas.
+
+Cada estágio roda num subprocesso próprio (o pico de RSS não vaza de uma
+medição para a outra) sobre dados derivados dos snapshots de data/raw:
+
+    extracao_html         extrair_termos/extrair_titulos sobre as páginas de fixtures/
+    carregar_e_agrupar    IndexadorArtesanal.carregar_e_agrupar
+    analisar_profundidade IndexadorArtesanal.analisar_profundidade (extract por termo)
+    auditar_csv           verificador_autores.auditar_csv
+    processar_xml         organizador_metadados_unb.processar_xml, uma pasta por item
+    crossref              gerador_crossref_unb.gravar_lote
+
+As entradas de N linhas usam primeiro as linhas reais; passando do tamanho do
+snapshot, entram variações determinísticas delas (erro de digitação, plural,
+caixa, acento), como as que os estágios de duplicatas procuram. Ficam em
+.gid_cache/benchmarks/ e o sha256 de cada uma vai para o resultado.
+
+O resultado (segundos, itens/s, pico de RSS) é gravado em resultados/ como
+JSON e comparado com a execução anterior, para as regressões aparecerem.
+
+Uso:
+    python playground/benchmarks/benchmark_pipeline.py
+    python playground/benchmarks/benchmark_pipeline.py --escalas 1000 10000 --estagios crossref auditar_csv
+    python playground/benchmarks/benchmark_pipeline.py --sem-teto   # inclui as escalas acima do teto de cada estágio
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import hashlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unicodedata
+from datetime import datetime
+
+DIR_BENCH = os.path.dirname(os.path.abspath(__file__))
+DIR_RAIZ = os.path.abspath(os.path.join(DIR_BENCH, '..', '..'))
+DIR_FIXTURES = os.path.join(DIR_BENCH, 'fixtures')
+DIR_RESULTADOS = os.path.join(DIR_BENCH, 'resultados')
+DIR_DADOS = os.path.join(DIR_RAIZ, '.gid_cache', 'benchmarks')
+DIR_RAW = os.path.join(DIR_RAIZ, 'data', 'raw')
+for pasta in ('harvesters', 'duplicatas', 'processors', 'comum'):
+    sys.path.insert(0, os.path.join(DIR_RAIZ, 'src', pasta))
+
+ESCALAS = [1000, 10000, 50000, 200000]
+SEMENTE = 42
+TIMEOUT = 1800  # Segundos por medição
+LIMIAR_REGRESSAO = 1.2  # 20% mais lento que a execução anterior já é sinalizado
+
+
+# --- DADOS SINTÉTICOS ---
+
+def ler_snapshot(prefixo):
+    """Primeira coluna do snapshot mais recente de data/raw (riunb_<prefixo>_scraping_*.csv)."""
+    arquivos = sorted(glob.glob(os.path.join(DIR_RAW, f'riunb_{prefixo}_scraping_*.csv')))
+    if not arquivos:
+        raise FileNotFoundError(f"Nenhum snapshot riunb_{prefixo}_scraping_*.csv em {DIR_RAW}")
+    with open(arquivos[-1], newline='', encoding='utf-8-sig') as f:
+        leitor = csv.reader(f)
+        next(leitor, None)
+        return [linha[0] for linha in leitor if linha and linha[0].strip()]
+
+
+def _sem_acentos(texto):
+    return "".join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+def variar(texto, rnd):
+    """Uma variação plausível de 'texto' (o tipo de sujeira que os estágios de duplicatas acham)."""
+    regra = rnd.randrange(6)
+    if regra == 0 and len(texto) > 3:  # Letra faltando
+        k = rnd.randrange(len(texto))
+        return texto[:k] + texto[k + 1:]
+    if regra == 1 and len(texto) > 3:  # Letras trocadas
+        k = rnd.randrange(len(texto) - 1)
+        return texto[:k] + texto[k + 1] + texto[k] + texto[k + 2:]
+    if regra == 2:
+        return texto + 's'
+    if regra == 3:
+        return texto.upper() if rnd.random() < 0.5 else texto.lower()
+    if regra == 4:
+        return _sem_acentos(texto)
+    return texto.replace(' ', '  ', 1) + ' '
+
+
+def escalar(valores, n, semente=SEMENTE):
+    """n valores: os reais e, depois deles, variações sorteadas (sempre as mesmas para a mesma semente)."""
+    rnd = random.Random(semente)
+    saida = list(valores[:n])
+    while len(saida) < n:
+        saida.append(variar(rnd.choice(valores), rnd))
+    return saida
+
+
+def _sha256(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _gravar_csv(nome, cabecalho, linhas):
+    """Grava (uma vez) um CSV sintético em .gid_cache/benchmarks e devolve o caminho."""
+    caminho = os.path.join(DIR_DADOS, nome)
+    if not os.path.exists(caminho):
+        os.makedirs(DIR_DADOS, exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.writer(f)
+            if cabecalho:
+                escritor.writerow(cabecalho)
+            escritor.writerows(linhas)
+        os.replace(temporario, caminho)
+    return caminho
+
+
+def csv_termos(prefixo, n):
+    """termo,freq sem cabeçalho (o formato de data/temp/assuntos.csv e autores.csv)."""
+    rnd = random.Random(SEMENTE + n)
+    termos = escalar(ler_snapshot(prefixo), n)
+    return _gravar_csv(f'{prefixo}_{n}.csv', None, ((t, rnd.randint(1, 40)) for t in termos))
+
+
+def titulos_sinteticos(n):
+    """Títulos montados com palavras-chave reais ('A : B em C'), já que data/raw não tem títulos."""
+    assuntos = ler_snapshot('subjects')
+    rnd = random.Random(SEMENTE)
+    return [f"{rnd.choice(assuntos)} : {rnd.choice(assuntos).lower()} em {rnd.choice(assuntos)}" for _ in range(n)]
+
+
+def csv_crossref(n):
+    rnd = random.Random(SEMENTE)
+    autores = escalar(ler_snapshot('authors'), n)
+    unidades = ["Faculdade de Tecnologia (FT)||Departamento de Engenharia Elétrica (FT ENE)",
+                "Instituto de Ciências Humanas (IH)", "Faculdade de Educação (FE)"]
+    linhas = ((autor, titulo, f"20{rnd.randint(0, 24):02d}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+               rnd.choice(unidades), rnd.choice(["Dissertação", "Tese"]), f"10.26512/{2020 + k % 5}.{k}",
+               f"http://repositorio.unb.br/handle/10482/{10000 + k}")
+              for k, (autor, titulo) in enumerate(zip(autores, titulos_sinteticos(n))))
+    return _gravar_csv(f'crossref_{n}.csv', ['dc.contributor.author', 'dc.title', 'dc.date.submitted',
+                                            'dc.description.unidade', 'dc.type', 'dc.identifier.doi[pt_BR]',
+                                            'dc.identifier.uri'], linhas)
+
+
+DUBLIN_CORE = """<?xml version="1.0" encoding="utf-8"?>
+<dublin_core schema="dc">
+  <dcvalue element="contributor" qualifier="author">{autor}</dcvalue>
+  <dcvalue element="contributor" qualifier="advisor">{orientador}</dcvalue>
+  <dcvalue element="title" qualifier="none" language="pt_BR">{titulo}</dcvalue>
+  <dcvalue element="type" qualifier="none">{tipo}</dcvalue>
+  <dcvalue element="identifier" qualifier="citation">{autor}. {titulo}. 2020. 120 f. Dissertação (Mestrado em {curso}) — Universidade de Brasília, Universidade de Brasília, Brasília, 2020.</dcvalue>
+  <dcvalue element="subject" qualifier="keyword" language="pt_BR">{assuntos}</dcvalue>
+  <dcvalue element="description" qualifier="resumo" language="pt_BR">Resumo do trabalho sobre {titulo}.</dcvalue>
+  <dcvalue element="date" qualifier="issued">2020-10-06</dcvalue>
+  <dcvalue element="publisher" qualifier="program">Programa de Pós-Graduação em {curso}</dcvalue>
+  <dcvalue element="publisher" qualifier="country">Brasil</dcvalue>
+  <dcvalue element="rights" qualifier="license">A concessão da licença deste item refere-se ao termo de autorização.</dcvalue>
+</dublin_core>
+"""
+
+
+def pastas_dublin_core(n, destino):
+    """n pastas de item com dublin_core.xml (processar_xml reescreve os arquivos: são refeitas a cada medição)."""
+    from xml.sax.saxutils import escape
+    rnd = random.Random(SEMENTE)
+    autores = escalar(ler_snapshot('authors'), n)
+    orientadores = ler_snapshot('advisors')
+    assuntos = ler_snapshot('subjects')
+    titulos = titulos_sinteticos(n)
+    for k in range(n):
+        pasta = os.path.join(destino, f'item_{k:06d}')
+        os.makedirs(pasta)
+        with open(os.path.join(pasta, 'dublin_core.xml'), 'w', encoding='utf-8') as f:
+            f.write(DUBLIN_CORE.format(
+                autor=escape(autores[k]), orientador=escape(variar(rnd.choice(orientadores), rnd)),
+                titulo=escape(titulos[k]), tipo=rnd.choice(["masterThesis", "doctoralThesis"]),
+                curso=escape(rnd.choice(assuntos)),
+                assuntos=escape("; ".join(variar(rnd.choice(assuntos), rnd) for _ in range(rnd.randint(2, 5))))))
+    return sorted(glob.glob(os.path.join(destino, '*', 'dublin_core.xml')))
+
+
+# --- ESTÁGIOS ---
+# preparar(n, temporario) -> (contexto, fixture); executar(contexto) -> itens processados
+
+def _preparar_html(n, temporario):
+    import extratores_html
+    paginas = []
+    for caminho in sorted(glob.glob(os.path.join(DIR_FIXTURES, 'browse_*_rpp*.html'))):
+        with open(caminho, encoding='utf-8') as f:
+            html = f.read()
+        funcao = extratores_html.extrair_titulos if '_title_' in caminho else extratores_html.extrair_termos
+        paginas.append((funcao, html))
+    if not paginas:
+        raise FileNotFoundError("Sem fixtures de HTML: rode benchmark_extratores.py --gerar-fixtures")
+    return (paginas, n), f"{len(paginas)} páginas de fixtures/ ({extratores_html.backend_ativo()})"
+
+
+def _executar_html(contexto):
+    paginas, n = contexto
+    itens = 0
+    while itens < n:
+        for funcao, html in paginas:
+            itens += funcao(html)[0]
+    return itens
+
+
+def _preparar_indexador(n, temporario):
+    from indexador_artesanal import IndexadorArtesanal
+    caminho = csv_termos('subjects', n)
+    return IndexadorArtesanal(caminho, temporario), caminho
+
+
+def _executar_carregar(app):
+    app.carregar_e_agrupar()
+    return n_linhas(app.caminho_arquivo)
+
+
+def _preparar_profundidade(n, temporario):
+    app, caminho = _preparar_indexador(n, temporario)
+    app.carregar_e_agrupar()
+    return app, caminho
+
+
+def _executar_profundidade(app):
+    app.analisar_profundidade()
+    return len(app.df_reduzido)
+
+
+def _preparar_auditoria(n, temporario):
+    import verificador_autores
+    verificador_autores.ARQUIVO_ENTRADA = csv_termos('authors', n)
+    verificador_autores.ARQUIVO_SAIDA = os.path.join(temporario, 'relatorio_duplicatas.txt')
+    return verificador_autores, verificador_autores.ARQUIVO_ENTRADA
+
+
+def _executar_auditoria(verificador_autores):
+    verificador_autores.auditar_csv()
+    return n_linhas(verificador_autores.ARQUIVO_ENTRADA)
+
+
+def _preparar_xml(n, temporario):
+    import organizador_metadados_unb as organizador
+    from indexador_artesanal import ler_termos_e_frequencias
+    bases = []
+    for prefixo in ('advisors', 'subjects'):
+        caminho = sorted(glob.glob(os.path.join(DIR_RAW, f'riunb_{prefixo}_scraping_*.csv')))[-1]
+        df = ler_termos_e_frequencias(caminho)
+        bases.append(dict(zip(df['Termo_Original'], df['Frequencia_Raw'].astype(int))))
+    organizador.definir_bases(*bases)
+    xmls = pastas_dublin_core(n, os.path.join(temporario, 'itens'))
+    return (organizador, xmls), f"{n} pastas geradas (advisors/subjects de data/raw como bases)"
+
+
+def _executar_xml(contexto):
+    organizador, xmls = contexto
+    for caminho in xmls:
+        organizador.processar_xml(caminho)
+    return len(xmls)
+
+
+def _preparar_crossref(n, temporario):
+    import gerador_crossref_unb
+    return (gerador_crossref_unb, csv_crossref(n), os.path.join(temporario, 'deposito.xml')), None
+
+
+def _executar_crossref(contexto):
+    gerador, caminho_csv, caminho_xml = contexto
+    with open(caminho_csv, mode='r', encoding='utf-8') as f:
+        return gerador.gravar_lote(csv.DictReader(f), caminho_xml, datetime.now().strftime("%Y%m%d%H%M%S%f")[:-3])
+
+
+def n_linhas(caminho):
+    with open(caminho, 'rb') as f:
+        return sum(bloco.count(b'\n') for bloco in iter(lambda: f.read(1 << 20), b''))
+
+
+# nome -> (preparar, executar, teto): acima do teto a escala só roda com --sem-teto
+# (analisar_profundidade compara cada termo com todos: 200k termos levariam horas)
+ESTAGIOS = {
+    'extracao_html': (_preparar_html, _executar_html, None),
+    'carregar_e_agrupar': (_preparar_indexador, _executar_carregar, None),
+    'analisar_profundidade': (_preparar_profundidade, _executar_profundidade, 50000),
+    'auditar_csv': (_preparar_auditoria, _executar_auditoria, None),
+    'processar_xml': (_preparar_xml, _executar_xml, 50000),
+    'crossref': (_preparar_crossref, _executar_crossref, None),
+}
+
+
+def _rss_mb():
+    """Pico de RSS do processo até agora (ru_maxrss: KB no Linux, bytes no macOS)."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def medir(estagio, n):
+    """Roda UM estágio numa escala (chamado no subprocesso) e devolve as medidas."""
+    preparar, executar, _ = ESTAGIOS[estagio]
+    temporario = tempfile.mkdtemp(prefix=f'gid_bench_{estagio}_')
+    try:
+        with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+            inicio = time.perf_counter()
+            contexto, fixture = preparar(n, temporario)
+            preparo = time.perf_counter() - inicio
+            rss_base = _rss_mb()
+
+            inicio = time.perf_counter()
+            itens = executar(contexto)
+            segundos = time.perf_counter() - inicio
+        medida = {'estagio': estagio, 'escala': n, 'itens': itens, 'segundos': round(segundos, 4),
+                  'itens_por_s': round(itens / segundos, 1) if segundos else None,
+                  'rss_base_mb': round(rss_base, 1), 'rss_pico_mb': round(_rss_mb(), 1),
+                  'preparo_s': round(preparo, 2)}
+        if fixture and os.path.isfile(fixture):
+            medida['fixture'] = os.path.relpath(fixture, DIR_RAIZ)
+            medida['fixture_sha256'] = _sha256(fixture)
+        elif fixture:
+            medida['fixture'] = fixture
+        return medida
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+
+
+# --- ORQUESTRAÇÃO ---
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIR_RAIZ, capture_output=True,
+                              text=True, timeout=30).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def medir_em_subprocesso(estagio, n, timeout):
+    comando = [sys.executable, os.path.abspath(__file__), '--medir', estagio, str(n)]
+    try:
+        proc = subprocess.run(comando, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'estagio': estagio, 'escala': n, 'erro': f'timeout ({timeout}s)'}
+    linhas = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not linhas:
+        return {'estagio': estagio, 'escala': n, 'erro': (proc.stderr.strip().splitlines() or ['sem saída'])[-1]}
+    return json.loads(linhas[-1])
+
+
+def execucao_anterior():
+    arquivos = sorted(glob.glob(os.path.join(DIR_RESULTADOS, 'pipeline_*.json')))
+    if not arquivos:
+        return None, {}
+    with open(arquivos[-1], encoding='utf-8') as f:
+        anterior = json.load(f)
+    return os.path.basename(arquivos[-1]), {(m['estagio'], m['escala']): m for m in anterior['medidas'] if 'segundos' in m}
+
+
+def rodar(estagios, escalas, sem_teto, timeout):
+    nome_anterior, anteriores = execucao_anterior()
+    print(f"🔬 {len(estagios)} estágios x escalas {escalas} | Python {platform.python_version()} | "
+          f"{os.cpu_count()} CPUs" + (f" | comparando com {nome_anterior}" if nome_anterior else ""))
+    print("-" * 88)
+
+    medidas = []
+    for estagio in estagios:
+        teto = ESTAGIOS[estagio][2]
+        for n in escalas:
+            if teto and n > teto and not sem_teto:
+                medidas.append({'estagio': estagio, 'escala': n, 'pulado': f'acima do teto de {teto} (use --sem-teto)'})
+                print(f"⏭️  {estagio:<22} {n:>7} | pulado (teto {teto})")
+                continue
+            medida = medir_em_subprocesso(estagio, n, timeout)
+            medidas.append(medida)
+            if 'erro' in medida:
+                print(f"❌ {estagio:<22} {n:>7} | {medida['erro']}")
+                continue
+            linha = (f"✅ {estagio:<22} {n:>7} | {medida['segundos']:9.3f}s | {medida['itens_por_s']:>11,.0f} itens/s | "
+                     f"RSS pico {medida['rss_pico_mb']:7.1f} MB")
+            anterior = anteriores.get((estagio, n))
+            if anterior and anterior['segundos']:
+                razao = medida['segundos'] / anterior['segundos']
+                linha += f" | {razao:4.2f}x do anterior" + (" ⚠️ REGRESSÃO" if razao > LIMIAR_REGRESSAO else "")
+            print(linha)
+
+    os.makedirs(DIR_RESULTADOS, exist_ok=True)
+    resultado = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_atual(),
+        'maquina': {'python': platform.python_version(), 'plataforma': platform.platform(), 'cpus': os.cpu_count()},
+        'medidas': medidas,
+    }
+    caminho = os.path.join(DIR_RESULTADOS, f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print("-" * 88)
+    print(f"💾 Resultado salvo em: {os.path.relpath(caminho, DIR_RAIZ)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos estágios do GID em escalas sintéticas")
+    parser.add_argument('--escalas', type=int, nargs='+', default=ESCALAS, help="Linhas/itens por medição")
+    parser.add_argument('--estagios', nargs='+', choices=list(ESTAGIOS), default=list(ESTAGIOS))
+    parser.add_argument('--sem-teto', action='store_true', help="Roda também as escalas acima do teto de cada estágio")
+    parser.add_argument('--timeout', type=int, default=TIMEOUT, help="Segundos máximos por medição")
+    parser.add_argument('--medir', nargs=2, metavar=('ESTAGIO', 'N'), help=argparse.SUPPRESS)  # Uso interno (subprocesso)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir(args.medir[0], int(args.medir[1])), ensure_ascii=False))
+    else:
+        rodar(args.estagios, args.escalas, args.sem_teto, args.timeout)
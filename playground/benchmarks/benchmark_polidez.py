@@ -0,0 +1,106 @@
+"""
+Benchmark do modo --adaptativo dos coletores contra o servidor DSpace local.
+
+Para cada cenário (servidor estável, crises de lentidão, 429 esporádicos)
+coleta o mesmo índice com o motor na configuração fixa (rpp 50, taxa no teto,
+pausa de 15s após erro) e com o ControladorAdaptativo. Mostra duração,
+requisições, 429 recebidos e o pico de requisições simultâneas no servidor,
+e confere que os dois CSVs trazem os mesmos registros.
+
+A latência do servidor local é bem menor que a do RIUnB, então o alvo de
+latência aqui é proporcional (--latencia-alvo), não o padrão de 3s.
+
+Uso:
+    python playground/benchmarks/benchmark_polidez.py
+    python playground/benchmarks/benchmark_polidez.py --indice author --taxa 10 --cenarios lentidao
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+DIR_BENCH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DIR_BENCH, '..', '..', 'src', 'harvesters'))
+
+import motor_coleta  # noqa: E402
+import servidor_dspace_local  # noqa: E402
+from rinb_advisor import ORIENTADORES  # noqa: E402
+from riunb_author import AUTORES  # noqa: E402
+from riunb_subjects import ASSUNTOS  # noqa: E402
+
+INDICES = {'advisor': ORIENTADORES, 'author': AUTORES, 'subject': ASSUNTOS}
+
+# Latência fixa + por item: página de 50 ~ 0.1s, de 200 ~ 0.25s
+HUMOR_BASE = {'latencia': 0.05, 'latencia_por_item': 0.001}
+CENARIOS = {
+    'estavel': {},
+    'lentidao': {'lentidao': (10, 4, 10)},   # A cada 10s, 4s com latência x10
+    '429': {'taxa_429': 0.03, 'retry_after': 1},
+}
+LATENCIA_ALVO = 0.5
+TAXA = 4.0          # Servidor local: bem acima do padrão usado contra o RIUnB (TAXA_POLIDEZ)
+SEMENTE = 42
+
+
+def coletar(indice, url, taxa, adaptativo, latencia_alvo, destino):
+    limitador = motor_coleta.LimitadorDePolidez(taxa)
+    controlador = motor_coleta.ControladorAdaptativo(limitador, latencia_alvo=latencia_alvo) if adaptativo else None
+    motor = motor_coleta.MotorDeColeta(indice, base_url=url, limitador=limitador, controlador=controlador)
+    inicio = time.perf_counter()
+    asyncio.run(motor.coletar(destino))
+    return time.perf_counter() - inicio, motor
+
+
+def registros(caminho):
+    with open(caminho, newline='', encoding='utf-8-sig') as f:
+        leitor = csv.reader(f)
+        next(leitor, None)
+        return [tuple(linha[:-2]) for linha in leitor]  # Sem Offset/Timestamp (dependem do rpp)
+
+
+def rodar(tipo, taxa, cenarios, latencia_alvo):
+    indice = INDICES[tipo]
+    indices = servidor_dspace_local.carregar_indices()
+    print(f"🔬 Índice: {tipo} ({len(indices[tipo])} registros) | Teto: {taxa:.1f} req/s | "
+          f"Alvo de latência: {latencia_alvo}s")
+    print("-" * 96)
+
+    with tempfile.TemporaryDirectory() as temporario:
+        for cenario in cenarios:
+            resultados = {}
+            for modo in ('fixo', 'adaptativo'):
+                random.seed(SEMENTE)
+                servidor = servidor_dspace_local.iniciar_em_segundo_plano(indices, **HUMOR_BASE, **CENARIOS[cenario])
+                destino = os.path.join(temporario, f"{cenario}_{modo}.csv")
+                try:
+                    duracao, motor = coletar(indice, servidor.url_browse, taxa, modo == 'adaptativo',
+                                             latencia_alvo, destino)
+                finally:
+                    servidor.shutdown()
+                    servidor.server_close()
+                resultados[modo] = (duracao, servidor, motor, registros(destino))
+
+            print()
+            referencia = resultados['fixo'][3]
+            for modo, (duracao, servidor, motor, linhas) in resultados.items():
+                status = "✅" if linhas == referencia else "❌ REGISTROS DIFERENTES do fixo"
+                print(f"📊 {cenario:<9} {modo:<11} {duracao:7.1f}s | {servidor.requisicoes:5d} req | "
+                      f"{servidor.respostas_429:3d} x 429 | pico {servidor.pico_simultaneas} simultâneas | "
+                      f"rpp final {motor.rpp:3d} | taxa final {motor.limitador.taxa:5.2f} {status}")
+            print(f"   ↳ ganho: {resultados['fixo'][0] / resultados['adaptativo'][0]:.1f}x")
+            print("-" * 96)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coleta fixa x --adaptativo contra o servidor DSpace local")
+    parser.add_argument('--indice', choices=sorted(INDICES), default='advisor')
+    parser.add_argument('--taxa', type=float, default=TAXA, help="Teto de req/s dos dois modos")
+    parser.add_argument('--cenarios', nargs='+', choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument('--latencia-alvo', type=float, default=LATENCIA_ALVO)
+    args = parser.parse_args()
+    rodar(args.indice, args.taxa, args.cenarios, args.latencia_alvo)
@@ -0,0 +1,279 @@
+"""
+Métricas de execução dos estágios do GID: tempos, contadores e caches.
+
+Os scripts contam o que fazem (requisições, retentativas, páginas, comparações
+fuzzy...) e cronometram os trechos que interessam (latência de cada requisição,
+parse de cada página). Tudo fica agrupado pelo estágio em andamento, e cada
+contador ganha a taxa por segundo do estágio. Assim dá para ver se uma coleta
+lenta veio da rede, do parse ou do casamento de termos.
+
+Registrar é barato e acontece sempre. Com GID_METRICAS=<arquivo>, o resumo é
+gravado ao fim do processo: '.prom' no formato texto do Prometheus (serve
+para o textfile collector do node_exporter) e qualquer outra extensão em JSON.
+
+Uso:
+    GID_METRICAS=metricas.json python src/harvesters/riunb_author.py
+    GID_METRICAS=metricas.prom python src/duplicatas/verificador_autores.py
+"""
+
+import atexit
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+ARQUIVO = os.environ.get("GID_METRICAS")
+ESTAGIO_PADRAO = 'geral'
+PREFIXO_PROMETHEUS = 'gid'
+# Limites (segundos) dos baldes dos histogramas: de parse de página (ms) a requisição lenta (s)
+BALDES = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+RE_NOME_INVALIDO = re.compile(r'[^a-zA-Z0-9_]')
+
+_trava = threading.Lock()
+_estagios = {}   # nome -> {'duracao_s', 'contadores', 'tempos', 'valores', 'caches'}
+_atual = [ESTAGIO_PADRAO]
+
+
+def _novo_estagio():
+    return {'duracao_s': 0.0, 'contadores': {}, 'tempos': {}, 'valores': {}, 'caches': {}}
+
+
+def _estagio(nome):
+    return _estagios.setdefault(nome or _atual[-1], _novo_estagio())
+
+
+# --- REGISTRO ---
+
+@contextmanager
+def estagio(nome):
+    """
+    Tudo o que for registrado dentro do bloco vai para 'nome'; a duração soma
+    entre entradas. Também serve de decorador: @metricas.estagio('auditar_csv').
+    """
+    _atual.append(nome)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duracao = time.perf_counter() - inicio
+        _atual.pop()
+        with _trava:
+            _estagio(nome)['duracao_s'] += duracao
+
+
+def contar(nome, valor=1, estagio=None):
+    with _trava:
+        contadores = _estagio(estagio)['contadores']
+        contadores[nome] = contadores.get(nome, 0) + valor
+
+
+def observar(nome, segundos, estagio=None):
+    """Uma amostra de tempo (vai para o histograma 'nome')."""
+    with _trava:
+        tempos = _estagio(estagio)['tempos']
+        tempo = tempos.get(nome)
+        if tempo is None:
+            tempo = tempos[nome] = {'n': 0, 'soma': 0.0, 'min': segundos, 'max': segundos, 'baldes': [0] * len(BALDES)}
+        tempo['n'] += 1
+        tempo['soma'] += segundos
+        tempo['min'] = min(tempo['min'], segundos)
+        tempo['max'] = max(tempo['max'], segundos)
+        for k, limite in enumerate(BALDES):
+            if segundos <= limite:
+                tempo['baldes'][k] += 1
+                break
+
+
+@contextmanager
+def cronometro(nome, estagio=None):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(nome, time.perf_counter() - inicio, estagio)
+
+
+def definir(nome, valor, estagio=None):
+    """Valor instantâneo (ex.: taxa atual do limitador, termos únicos)."""
+    with _trava:
+        _estagio(estagio)['valores'][nome] = valor
+
+
+def registrar_cache(nome, info, estagio=None):
+    """Acertos/erros de um cache: CacheInfo do lru_cache ou um par (acertos, erros)."""
+    acertos, erros = (info.hits, info.misses) if hasattr(info, 'hits') else info
+    with _trava:
+        _estagio(estagio)['caches'][nome] = {'acertos': acertos, 'erros': erros}
+
+
+def registrar_caches(infos, estagio=None):
+    """Vários caches de uma vez (ex.: normalizacao.estatisticas_cache()); os que nem foram consultados ficam de fora."""
+    for nome, info in infos.items():
+        acertos, erros = (info.hits, info.misses) if hasattr(info, 'hits') else info
+        if acertos or erros:
+            registrar_cache(nome, (acertos, erros), estagio)
+
+
+# --- ENTRE PROCESSOS ---
+
+def instantaneo(zerar=False):
+    """Cópia do estado bruto (para um processo do pool devolver ao principal com mesclar())."""
+    with _trava:
+        copia = json.loads(json.dumps(_estagios))
+        if zerar:
+            _estagios.clear()
+    return copia
+
+
+def mesclar(outro):
+    """
+    Soma o instantaneo() de outro processo: contadores, tempos e caches somam,
+    valores ficam com o último. A duração não soma: quem mede o estágio é o
+    relógio do processo principal.
+    """
+    with _trava:
+        for nome, dados in outro.items():
+            destino = _estagio(nome)
+            for chave, valor in dados['contadores'].items():
+                destino['contadores'][chave] = destino['contadores'].get(chave, 0) + valor
+            for chave, tempo in dados['tempos'].items():
+                atual = destino['tempos'].get(chave)
+                if atual is None:
+                    destino['tempos'][chave] = tempo
+                    continue
+                atual['n'] += tempo['n']
+                atual['soma'] += tempo['soma']
+                atual['min'] = min(atual['min'], tempo['min'])
+                atual['max'] = max(atual['max'], tempo['max'])
+                atual['baldes'] = [a + b for a, b in zip(atual['baldes'], tempo['baldes'])]
+            for chave, cache in dados['caches'].items():
+                atual = destino['caches'].setdefault(chave, {'acertos': 0, 'erros': 0})
+                atual['acertos'] += cache['acertos']
+                atual['erros'] += cache['erros']
+            destino['valores'].update(dados['valores'])
+
+
+# --- EXPORTAÇÃO ---
+
+def _taxa_acerto(cache):
+    total = cache['acertos'] + cache['erros']
+    return round(cache['acertos'] / total, 4) if total else None
+
+
+def resumo():
+    """Estado legível: por estágio, duração, contadores (com taxa por segundo), tempos e caches."""
+    saida = {}
+    for nome, dados in instantaneo().items():
+        duracao = dados['duracao_s']
+        saida[nome] = {
+            'duracao_s': round(duracao, 3),
+            'contadores': dados['contadores'],
+            'por_segundo': {chave: round(valor / duracao, 2) for chave, valor in dados['contadores'].items()} if duracao else {},
+            'tempos': {chave: {'n': t['n'], 'total_s': round(t['soma'], 4), 'media_ms': round(t['soma'] / t['n'] * 1000, 3),
+                               'min_ms': round(t['min'] * 1000, 3), 'max_ms': round(t['max'] * 1000, 3)}
+                       for chave, t in dados['tempos'].items()},
+            'valores': dados['valores'],
+            'caches': {chave: {**c, 'taxa_acerto': _taxa_acerto(c)} for chave, c in dados['caches'].items()},
+        }
+    return saida
+
+
+def _nome_prometheus(*partes):
+    return RE_NOME_INVALIDO.sub('_', '_'.join((PREFIXO_PROMETHEUS,) + partes))
+
+
+def _escapar_rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(**rotulos):
+    return '{' + ','.join(f'{chave}="{_escapar_rotulo(valor)}"' for chave, valor in rotulos.items()) + '}'
+
+
+def texto_prometheus():
+    """O resumo no formato de exposição do Prometheus (um '# TYPE' por família)."""
+    familias = {}  # família -> (tipo, [linhas])
+
+    def linha(familia, tipo, rotulos, valor, sufixo=''):
+        familias.setdefault(familia, (tipo, []))[1].append(f"{familia}{sufixo}{_rotulos(**rotulos)} {valor}")
+
+    for estagio_, dados in instantaneo().items():
+        duracao = dados['duracao_s']
+        linha(_nome_prometheus('estagio_duracao_segundos'), 'gauge', {'estagio': estagio_}, round(duracao, 6))
+        for chave, valor in dados['contadores'].items():
+            linha(_nome_prometheus(chave, 'total'), 'counter', {'estagio': estagio_}, valor)
+            if duracao:
+                linha(_nome_prometheus('taxa_por_segundo'), 'gauge', {'estagio': estagio_, 'contador': chave}, round(valor / duracao, 4))
+        for chave, tempo in dados['tempos'].items():
+            familia = _nome_prometheus(chave, 'segundos')
+            acumulado = 0
+            for limite, quantidade in zip(BALDES, tempo['baldes']):
+                acumulado += quantidade
+                linha(familia, 'histogram', {'estagio': estagio_, 'le': limite}, acumulado, '_bucket')
+            linha(familia, 'histogram', {'estagio': estagio_, 'le': '+Inf'}, tempo['n'], '_bucket')
+            linha(familia, 'histogram', {'estagio': estagio_}, round(tempo['soma'], 6), '_sum')
+            linha(familia, 'histogram', {'estagio': estagio_}, tempo['n'], '_count')
+        for chave, valor in dados['valores'].items():
+            if isinstance(valor, (int, float)):
+                linha(_nome_prometheus(chave), 'gauge', {'estagio': estagio_}, valor)
+        for chave, cache in dados['caches'].items():
+            rotulos = {'estagio': estagio_, 'cache': chave}
+            linha(_nome_prometheus('cache_acertos_total'), 'counter', rotulos, cache['acertos'])
+            linha(_nome_prometheus('cache_erros_total'), 'counter', rotulos, cache['erros'])
+            if _taxa_acerto(cache) is not None:
+                linha(_nome_prometheus('cache_taxa_acerto'), 'gauge', rotulos, _taxa_acerto(cache))
+
+    return "".join(f"# TYPE {familia} {tipo}\n" + "\n".join(linhas) + "\n" for familia, (tipo, linhas) in familias.items())
+
+
+def exportar(caminho=None):
+    """Grava o resumo em 'caminho' (ou GID_METRICAS): '.prom' = Prometheus, resto = JSON. Devolve o caminho."""
+    caminho = caminho or ARQUIVO
+    if not caminho or not _estagios:
+        return None
+    if caminho.endswith('.prom'):
+        conteudo = texto_prometheus()
+    else:
+        conteudo = json.dumps({'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                               'script': os.path.basename(sys.argv[0]) if sys.argv else None,
+                               'estagios': resumo()}, ensure_ascii=False, indent=2) + "\n"
+    # Temporário + replace: o coletor do Prometheus nunca lê um arquivo pela metade
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def _exportar_ao_sair():
+    # Processos do pool também importam este módulo: só o principal grava o arquivo
+    if multiprocessing.parent_process() is not None:
+        return
+    try:
+        destino = exportar()
+        if destino:
+            print(f"📈 Métricas salvas em: {destino}")
+    except OSError as e:
+        print(f"⚠️ [MÉTRICAS] Não foi possível gravar {ARQUIVO}: {e}")
+
+
+if ARQUIVO:
+    atexit.register(_exportar_ao_sair)
+
+
+if __name__ == "__main__":
+    with estagio('demo'):
+        for k in range(200):
+            with cronometro('latencia_requisicao'):
+                time.sleep(0.001 * (k % 5))
+            contar('requisicoes')
+        contar('retentativas', 3)
+        registrar_cache('normalizacao', (150, 50))
+    print(json.dumps(resumo(), ensure_ascii=False, indent=2))
+    print(texto_prometheus())
@@ -0,0 +1,130 @@
+"""
+Normalização de texto compartilhada pelos estágios do GID.
+
+Antes cada script tinha a sua cópia (IndexadorArtesanal.normalizar,
+ArtesaoDeDados.normalizar, normalizar_texto do processador de títulos,
+regex recompiladas em cada chamada). Aqui ficam:
+
+- os padrões já compilados (RE_*);
+- as regras por string, memorizadas (lru_cache): o mesmo nome que aparece
+  em 50 mil linhas é normalizado uma vez só por processo;
+- entradas em lote (lista ou pandas.Series) que processam cada valor
+  distinto uma única vez e devolvem o resultado na mesma forma.
+
+Uso:
+    python src/comum/normalizacao.py "  SILVA, João  P. "
+"""
+
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+TAMANHO_CACHE = 1 << 16  # Entradas memorizadas por regra (~50k nomes de autores cabem inteiros)
+
+# --- PADRÕES PRÉ-COMPILADOS ---
+RE_NAO_PALAVRA = re.compile(r'[^\w]')           # Núcleo da palavra: 'UnB,' -> 'UnB'
+RE_NAO_AUTOR = re.compile(r'[^\w\s,]')          # Pontuação que não serve para comparar nomes
+RE_ESPACOS = re.compile(r'\s+')
+RE_DOIS_PONTOS = re.compile(r'\s*:\s*')         # 'Título:subtítulo' -> 'Título : subtítulo'
+RE_NAO_LETRA_ASCII = re.compile(r'[^A-Z]')      # Depois de remover acentos e passar para maiúsculas
+RE_LETRAS_REPETIDAS = re.compile(r'(.)\1+')
+RE_ESPACO_OU_VIRGULA = re.compile(r'[\s,]')
+RE_SEPARADORES = re.compile(r'[\W_]+')         # Pontuação e espaços em sequência
+
+
+# --- REGRAS POR STRING (memorizadas) ---
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _minusculas(texto):
+    return texto.lower().strip()
+
+
+def minusculas(texto):
+    """Chave de agrupamento leve: minúsculas e sem espaços nas pontas (acentos ficam)."""
+    if not isinstance(texto, str):
+        return str(texto)
+    return _minusculas(texto)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def normalizar_autor(texto):
+    """'Silva,  João P.' -> 'SILVA, JOÃO P': sem pontuação (fora a vírgula), espaços simples, maiúsculas."""
+    if not texto:
+        return ""
+    limpo = RE_NAO_AUTOR.sub('', texto)
+    limpo = RE_ESPACOS.sub(' ', limpo.strip())
+    return limpo.upper()
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def remover_acentos(texto):
+    """'ARAÚJO' -> 'ARAUJO'."""
+    if texto.isascii():
+        return texto
+    nfkd = unicodedata.normalize('NFKD', texto)
+    return "".join(c for c in nfkd if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def chave_comparacao(texto):
+    """'Educação:um  Estudo (2ª ed.)' -> 'educacao um estudo 2a ed': sem caixa, acentos e pontuação."""
+    if not isinstance(texto, str):
+        texto = str(texto)
+    # Acentos removidos palavra a palavra: as palavras se repetem entre títulos e o cache acerta
+    return " ".join(remover_acentos(palavra) for palavra in RE_SEPARADORES.split(texto.lower()) if palavra)
+
+
+def nucleo_palavra(palavra):
+    """Palavra sem pontuação, como a comparam as regras de caixa: '(UnB).' -> 'UnB'."""
+    return RE_NAO_PALAVRA.sub('', palavra)
+
+
+# --- ENTRADAS EM LOTE ---
+
+def em_lote(regra, textos):
+    """
+    Aplica 'regra' a uma lista ou pandas.Series, uma vez por valor distinto.
+    Devolve o mesmo tipo recebido (Series com o mesmo índice).
+    """
+    if pd is not None and isinstance(textos, pd.Series):
+        codigos, unicos = pd.factorize(textos, use_na_sentinel=False)
+        convertidos = [regra(valor) for valor in unicos]
+        return pd.Series([convertidos[c] for c in codigos], index=textos.index, name=textos.name, dtype=object)
+    feitos = {}
+    return [feitos[t] if t in feitos else feitos.setdefault(t, regra(t)) for t in textos]
+
+
+def minusculas_lote(textos):
+    """minusculas() de uma coluna inteira; numa Series usa as operações vetorizadas do pandas."""
+    if pd is not None and isinstance(textos, pd.Series):
+        return textos.astype(str).str.lower().str.strip()
+    return em_lote(minusculas, textos)
+
+
+def normalizar_autor_lote(textos):
+    return em_lote(normalizar_autor, textos)
+
+
+def chave_comparacao_lote(textos):
+    return em_lote(chave_comparacao, textos)
+
+
+def estatisticas_cache():
+    """Acertos/erros de cada regra memorizada (para conferir o reaproveitamento)."""
+    return {regra.__name__.lstrip('_'): regra.cache_info() for regra in (_minusculas, normalizar_autor, remover_acentos, chave_comparacao)}
+
+
+if __name__ == "__main__":
+    exemplos = sys.argv[1:] or ["  SILVA, João  P. ", "Araújo, Maria (UnB)", "  Política Pública "]
+    for texto in exemplos:
+        print(f"🔤 {texto!r}")
+        print(f"   ↳ minusculas: {minusculas(texto)!r} | autor: {normalizar_autor(texto)!r} | "
+              f"sem acentos: {remover_acentos(texto)!r} | comparação: {chave_comparacao(texto)!r}")
+    print(f"📦 Lote: {normalizar_autor_lote(exemplos * 3)[:3]}")
+    print(f"🧮 Cache: {estatisticas_cache()}")
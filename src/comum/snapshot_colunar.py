@@ -0,0 +1,141 @@
+"""
+Snapshot colunar (Arrow IPC) ao lado dos CSVs de coleta.
+
+Para cada riunb_*.csv gravamos um riunb_*.arrow com as mesmas colunas, já
+tipadas: números em int32, datas de coleta em timestamp e textos com
+codificação de dicionário (cada termo/página guardado uma vez só). O arquivo
+vai sem compressão, então pode ser mapeado em memória: abrir um snapshot de
+50 mil linhas custa milissegundos e não copia os dados.
+
+O pyarrow é opcional: sem ele, nada é gravado e os leitores usam o CSV.
+O .arrow guarda o tamanho e o mtime do CSV de origem; se o CSV mudar
+depois, o snapshot é ignorado (e pode ser refeito pela linha de comando).
+
+Uso:
+    python src/comum/snapshot_colunar.py data/raw/*.csv
+"""
+
+import csv
+import glob
+import os
+import sys
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+DISPONIVEL = pa is not None
+EXTENSAO = '.arrow'
+VERSAO = b'1'
+
+
+def caminho_colunar(caminho_csv):
+    return os.path.splitext(caminho_csv)[0] + EXTENSAO
+
+
+def _tipar_coluna(coluna):
+    """Inteiros em int32 quando cabem, datas em microssegundos, textos em dicionário."""
+    if pa.types.is_integer(coluna.type):
+        try:
+            return pc.cast(coluna, pa.int32())
+        except pa.ArrowInvalid:
+            return coluna
+    if pa.types.is_timestamp(coluna.type):
+        return pc.cast(coluna, pa.timestamp('us'))
+    if pa.types.is_string(coluna.type):
+        return coluna.dictionary_encode()
+    return coluna
+
+
+def _cabecalho(caminho_csv):
+    with open(caminho_csv, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def gravar_de_csv(caminho_csv, silencioso=False):
+    """Gera o .arrow de um CSV de coleta. Devolve o caminho (ou None se não deu)."""
+    if not DISPONIVEL:
+        return None
+    try:
+        info = os.stat(caminho_csv)
+        cabecalho = _cabecalho(caminho_csv)
+        # A primeira coluna é o termo: texto sempre, mesmo que pareça número ("1968")
+        bruto = pa_csv.read_csv(caminho_csv, convert_options=pa_csv.ConvertOptions(
+            column_types={cabecalho[0]: pa.string()} if cabecalho else {}, strings_can_be_null=False))
+        colunas = [_tipar_coluna(bruto.column(k).combine_chunks()) for k in range(bruto.num_columns)]
+        metadados = {b'gid.versao': VERSAO, b'gid.origem': os.path.basename(caminho_csv).encode('utf-8'),
+                     b'gid.csv_tamanho': str(info.st_size).encode(), b'gid.csv_mtime_ns': str(info.st_mtime_ns).encode()}
+        tabela = pa.table(colunas, names=bruto.column_names).replace_schema_metadata(metadados)
+
+        destino = caminho_colunar(caminho_csv)
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        with pa.OSFile(temporario, 'wb') as f, pa.ipc.new_file(f, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        os.replace(temporario, destino)
+        return destino
+    except (OSError, pa.ArrowException) as e:
+        if not silencioso:
+            print(f"⚠️ [COLUNAR] Não foi possível gerar o snapshot de {caminho_csv}: {e}")
+        return None
+
+
+def abrir(caminho_arrow):
+    """Tabela Arrow mapeada em memória (sem cópia)."""
+    return pa.ipc.open_file(pa.memory_map(caminho_arrow, 'r')).read_all()
+
+
+def atualizado(caminho_csv):
+    """True se existe um .arrow gerado a partir DESTA versão do CSV."""
+    destino = caminho_colunar(caminho_csv)
+    if not DISPONIVEL or not os.path.exists(destino):
+        return False
+    try:
+        metadados = pa.ipc.open_file(pa.memory_map(destino, 'r')).schema.metadata or {}
+        if not os.path.exists(caminho_csv):
+            return True  # Só sobrou o snapshot colunar: ele é a fonte
+        info = os.stat(caminho_csv)
+        return (metadados.get(b'gid.versao') == VERSAO
+                and metadados.get(b'gid.csv_tamanho') == str(info.st_size).encode()
+                and metadados.get(b'gid.csv_mtime_ns') == str(info.st_mtime_ns).encode())
+    except (OSError, pa.ArrowException):
+        return False
+
+
+def carregar_tabela(caminho_csv):
+    """Tabela Arrow do snapshot, se estiver atualizado; senão None (use o CSV)."""
+    if not atualizado(caminho_csv):
+        return None
+    return abrir(caminho_colunar(caminho_csv))
+
+
+def carregar_dataframe(caminho_csv):
+    """DataFrame (textos como Categorical) a partir do .arrow, ou None."""
+    tabela = carregar_tabela(caminho_csv)
+    return tabela.to_pandas() if tabela is not None else None
+
+
+if __name__ == "__main__":
+    if not DISPONIVEL:
+        print("❌ pyarrow não está instalado (pip install pyarrow).")
+        sys.exit(1)
+
+    raiz = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+    arquivos = sys.argv[1:] or sorted(glob.glob(os.path.join(raiz, 'data', 'raw', 'riunb_*.csv')))
+    for caminho in arquivos:
+        inicio = time.perf_counter()
+        destino = gravar_de_csv(caminho)
+        if not destino:
+            continue
+        gerar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        tabela = abrir(destino)
+        abrir_ms = (time.perf_counter() - inicio) * 1000
+        print(f"🧊 {os.path.basename(destino)}: {tabela.num_rows} linhas | "
+              f"{os.path.getsize(destino) / 1024:.0f} KB (CSV: {os.path.getsize(caminho) / 1024:.0f} KB) | "
+              f"gerado em {gerar:.2f}s | aberto em {abrir_ms:.1f} ms")
+        print(f"   ↳ {', '.join(f'{campo.name}: {campo.type}' for campo in tabela.schema)}")
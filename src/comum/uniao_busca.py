@@ -0,0 +1,46 @@
+"""
+Union-find compartilhado pelos agrupadores de duplicatas.
+
+O indexador de assuntos (src/duplicatas/indexador_artesanal.py) e o de
+títulos (src/duplicatas/processador_titulo.py) ligam os pares parecidos e
+leem os grupos como componentes conexos: o resultado não depende da ordem
+em que os pares chegam.
+"""
+
+
+class UniaoBusca:
+    """
+    Union-find (conjuntos disjuntos) sobre os índices 0..n-1.
+    União pelo tamanho + compressão de caminho: cada operação custa O(α(n)),
+    praticamente constante, então ligar E arestas sai em O(E).
+    """
+
+    def __init__(self, n):
+        self.pai = list(range(n))
+        self.tamanho = [1] * n
+
+    def achar(self, x):
+        pai = self.pai
+        raiz = x
+        while pai[raiz] != raiz:
+            raiz = pai[raiz]
+        while pai[x] != raiz:  # Compressão: todo o caminho passa a apontar para a raiz
+            pai[x], x = raiz, pai[x]
+        return raiz
+
+    def unir(self, a, b):
+        ra, rb = self.achar(a), self.achar(b)
+        if ra == rb:
+            return False
+        if self.tamanho[ra] < self.tamanho[rb]:
+            ra, rb = rb, ra
+        self.pai[rb] = ra
+        self.tamanho[ra] += self.tamanho[rb]
+        return True
+
+    def grupos(self):
+        """Componentes com 2+ membros, cada um em ordem crescente de índice."""
+        componentes = {}
+        for x in range(len(self.pai)):
+            componentes.setdefault(self.achar(x), []).append(x)
+        return [membros for membros in componentes.values() if len(membros) > 1]
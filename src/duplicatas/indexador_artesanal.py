@@ -1,4 +1,8 @@
 import pandas as pd
+import numpy as np
+import csv
+import io
+from bisect import bisect_left, bisect_right
 from rapidfuzz import process, fuzz
 from unidecode import unidecode
 import time
@@ -6,6 +10,90 @@ import sys
 import os
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comum'))
+import metricas  # noqa: E402
+import normalizacao  # noqa: E402
+import snapshot_colunar  # noqa: E402
+from uniao_busca import UniaoBusca  # noqa: E402
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+# Linhas da matriz de similaridade calculadas por vez no modo em lote.
+# 256 linhas x 46k colunas em float64 ~ 95 MB de pico.
+TAMANHO_BLOCO_CDIST = 256
+LIMITE_VARIACOES = 50  # Mesmo 'limit' do process.extract do modo clássico
+TAMANHO_AMOSTRA = 16 * 1024  # Bytes lidos para descobrir delimitador e cabeçalho
+COLUNAS = ['Termo_Original', 'Frequencia_Raw']
+
+
+def _numerico(valor):
+    try:
+        float(valor)
+        return True
+    except ValueError:
+        return False
+
+
+def detectar_formato(caminho, tamanho_amostra=TAMANHO_AMOSTRA):
+    """
+    Olha só o começo do arquivo: delimitador e aspas (csv.Sniffer) e se a
+    primeira linha é cabeçalho (segunda coluna não numérica, ex.: 'Frequencia').
+    Retorna (delimitador, aspas, primeira_linha, tem_cabecalho).
+    """
+    with open(caminho, newline='', encoding='utf-8-sig', errors='replace') as f:
+        amostra = f.read(tamanho_amostra)
+    if len(amostra) == tamanho_amostra and '\n' in amostra:
+        amostra = amostra[:amostra.rindex('\n') + 1]  # Sem linha cortada no fim
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t|')
+        delimitador, aspas = dialeto.delimiter, dialeto.quotechar or '"'
+    except csv.Error:
+        delimitador, aspas = ',', '"'  # Uma coluna só (ou amostra ambígua): padrão dos coletores
+    primeira = next(csv.reader(io.StringIO(amostra), delimiter=delimitador, quotechar=aspas), [])
+    tem_cabecalho = len(primeira) > 1 and bool(primeira[1].strip()) and not _numerico(primeira[1])
+    return delimitador, aspas, primeira, tem_cabecalho
+
+
+def ler_termos_e_frequencias(caminho):
+    """
+    Só as duas primeiras colunas (termo, frequência) de uma lista de frequências:
+    aceita tanto 'termo,freq' sem cabeçalho quanto a saída dos coletores
+    (Termo,Frequencia,Offset,Timestamp_Coleta). Usa o leitor do pyarrow se
+    estiver instalado; senão, o motor C do pandas. Termos ficam sempre como texto.
+    """
+    delimitador, aspas, primeira, tem_cabecalho = detectar_formato(caminho)
+    n_colunas = min(2, len(primeira)) or 1
+
+    if pa_csv is not None and primeira:
+        nomes = [f"c{k}" for k in range(len(primeira))]
+        try:
+            tabela = pa_csv.read_csv(
+                caminho,
+                read_options=pa_csv.ReadOptions(column_names=nomes, skip_rows=int(tem_cabecalho)),
+                parse_options=pa_csv.ParseOptions(delimiter=delimitador, quote_char=aspas),
+                convert_options=pa_csv.ConvertOptions(include_columns=nomes[:n_colunas],
+                                                      column_types={'c0': pa.string()},
+                                                      strings_can_be_null=False))
+            df = tabela.to_pandas()
+        except pa.ArrowInvalid:
+            df = None  # Linhas com número variável de colunas: o pandas é mais tolerante
+    else:
+        df = None
+
+    if df is None:
+        df = pd.read_csv(caminho, sep=delimitador, quotechar=aspas, header=0 if tem_cabecalho else None,
+                         usecols=list(range(n_colunas)), dtype={0: str}, encoding='utf-8-sig',
+                         keep_default_na=False)
+
+    df.columns = COLUNAS[:n_colunas]
+    if n_colunas == 1:
+        df['Frequencia_Raw'] = np.nan
+    return df
+
 class IndexadorArtesanal:
     def __init__(self, caminho_arquivo, output_dir, threshold=85): # Aumentei levemente o threshold padrão
         self.caminho_arquivo = caminho_arquivo
@@ -21,28 +109,36 @@ class IndexadorArtesanal:
         NÃO removemos acentos aqui para a visualização final, 
         mas usaremos unidecode na comparação interna se necessário.
         """
-        if not isinstance(texto, str):
-            return str(texto)
-        return texto.lower().strip()
+        return normalizacao.minusculas(texto)
 
+    @staticmethod
+    def normalizar_serie(termos):
+        """Mesma regra do normalizar(), vetorizada sobre uma coluna inteira."""
+        return normalizacao.minusculas_lote(termos)
+
+    @metricas.estagio('carregar_e_agrupar')
     def carregar_e_agrupar(self):
         print(f"📂 [Fase 1] Carregamento Inteligente: {os.path.basename(self.caminho_arquivo)}")
         try:
-            df_bruto = pd.read_csv(
-                self.caminho_arquivo, 
-                header=None, 
-                sep=None, 
-                engine='python',
-                names=['Termo_Original', 'Frequencia_Raw'],
-                dtype={0: str}
-            )
-            
+            # Snapshot colunar (.arrow) gerado pelo coletor: abre mapeado, já tipado
+            tabela = snapshot_colunar.carregar_tabela(self.caminho_arquivo)
+            if tabela is not None and tabela.num_columns >= 2:
+                print("   ↳ Lendo o snapshot colunar (.arrow)")
+                df_bruto = pd.DataFrame({
+                    'Termo_Original': tabela.column(0).cast(pa.string()).to_pandas(),
+                    'Frequencia_Raw': tabela.column(1).to_pandas(),
+                })
+            else:
+                df_bruto = ler_termos_e_frequencias(self.caminho_arquivo)
+
+            metricas.contar('linhas', len(df_bruto))
+
             # Limpeza básica
             df_bruto['Frequencia'] = pd.to_numeric(df_bruto['Frequencia_Raw'], errors='coerce').fillna(0)
             df_bruto['Termo_Original'] = df_bruto['Termo_Original'].fillna('')
             
             # Criamos uma chave normalizada para agrupar idênticos exatos primeiro (ex: "Casa " e "casa")
-            df_bruto['Chave_Busca'] = df_bruto['Termo_Original'].apply(self.normalizar)
+            df_bruto['Chave_Busca'] = self.normalizar_serie(df_bruto['Termo_Original'])
 
             # Agrupamento inicial (Otimização)
             self.df_reduzido = df_bruto.groupby('Chave_Busca').agg({
@@ -53,6 +149,7 @@ class IndexadorArtesanal:
             # Ordena por frequência (termos mais comuns costumam ser os "corretos")
             self.df_reduzido = self.df_reduzido.sort_values(by='Frequencia', ascending=False)
 
+            metricas.definir('termos_unicos', len(self.df_reduzido))
             print(f"   ↳ Termos únicos para análise: {len(self.df_reduzido)}")
             print("-" * 50)
 
@@ -60,6 +157,7 @@ class IndexadorArtesanal:
             print(f"❌ Erro crítico ao ler arquivo: {e}")
             sys.exit(1)
 
+    @metricas.estagio('analise_classica')
     def analisar_profundidade(self):
         print("🧠 [Fase 2] Análise Estrita (Grafia e Plurais)")
 # --- 1. CLÁUSULA DE GUARDA (Segurança) ---
@@ -104,6 +202,7 @@ class IndexadorArtesanal:
             # fuzz.ratio: Compara a string inteira. 
             # "Banana" vs "Bananas" = Alto
             # "Banana" vs "Banana Prata" = Baixo (diferença de tamanho penaliza)
+            metricas.contar('comparacoes_fuzzy', total)
             matches = process.extract(
                 termo_pai, 
                 termos_processar, 
@@ -153,6 +252,163 @@ class IndexadorArtesanal:
         print(f"\n\n✅ Análise concluída em {tempo:.2f} minutos.")
         print(f"📊 {len(self.relatorio)} grupos de correções encontrados.")
 
+    def _matriz_esparsa(self, termos, tamanho_bloco, limite=LIMITE_VARIACOES):
+        """
+        Calcula a matriz termo x termo em blocos com process.cdist (C++, todos os núcleos)
+        e guarda apenas os acertos acima do threshold.
+
+        Truque de bancada: fuzz.ratio nunca passa de 200*min/(la+lb), então cada bloco
+        (montado em ordem de comprimento) só é comparado com a faixa de comprimentos
+        que ainda pode atingir o threshold.
+
+        Retorna, para cada linha, os índices e scores dos acertos já na ordem do
+        process.extract (score decrescente, posição crescente) e cortados em 'limite'
+        (None = todos os acertos, usado no agrupamento por grafo).
+        """
+        total = len(termos)
+        comprimentos = np.fromiter((len(t) for t in termos), dtype=np.int64, count=total)
+        ordem = np.argsort(comprimentos, kind='stable')
+        comp_ordenados = comprimentos[ordem].tolist()
+        termos_ordenados = [termos[k] for k in ordem]
+
+        fator = self.threshold / (200 - self.threshold)
+        acertos = [None] * total
+
+        for inicio in range(0, total, tamanho_bloco):
+            linhas = ordem[inicio:inicio + tamanho_bloco]
+            menor, maior = comp_ordenados[inicio], comp_ordenados[min(inicio + tamanho_bloco, total) - 1]
+
+            # Faixa de comprimentos viáveis (com folga de 1 caractere para arredondamentos)
+            col_ini = bisect_left(comp_ordenados, int(menor * fator) - 1)
+            col_fim = bisect_right(comp_ordenados, int(maior / fator) + 1) if fator else total
+
+            scores = process.cdist(
+                [termos[k] for k in linhas],
+                termos_ordenados[col_ini:col_fim],
+                scorer=fuzz.ratio,
+                score_cutoff=self.threshold,
+                dtype=np.float64,
+                workers=-1
+            )
+            metricas.contar('comparacoes_fuzzy', len(linhas) * (col_fim - col_ini))
+
+            for r, linha in enumerate(linhas):
+                cols = np.nonzero(scores[r])[0]
+                indices = ordem[col_ini + cols]
+                valores = scores[r, cols]
+                # Mesmo desempate do process.extract: score desc, depois posição na lista
+                seq = np.lexsort((indices, -valores))[:limite]
+                acertos[linha] = (indices[seq].tolist(), valores[seq].tolist())
+
+            feito = min(inicio + tamanho_bloco, total)
+            sys.stdout.write(f"\r   ⏳ Matriz: {feito / total * 100:.1f}% ({feito}/{total})")
+            sys.stdout.flush()
+
+        print()
+        return acertos
+
+    @metricas.estagio('analise_lote')
+    def analisar_em_lote(self, tamanho_bloco=TAMANHO_BLOCO_CDIST):
+        """
+        Mesmo resultado de analisar_profundidade, mas a similaridade é calculada
+        de uma vez (matriz esparsa via cdist) em vez de um process.extract por termo.
+        A regra de agrupamento continua a mesma: ordem de frequência, o "pai" vence.
+        """
+        print("🧠 [Fase 2] Análise em Lote (Matriz de Similaridade)")
+        if self.df_reduzido is None or self.df_reduzido.empty:
+            print("⚠️ Aviso: 'df_reduzido' está vazio ou não foi carregado. Operação cancelada.")
+            return
+
+        print(f"   ↳ Usando 'Ratio' em blocos de {tamanho_bloco} termos (cdist, todos os núcleos)")
+
+        termos = self.df_reduzido['Chave_Busca'].tolist()
+        originais = self.df_reduzido['Termo_Original'].tolist()
+        frequencias = self.df_reduzido['Frequencia'].tolist()
+
+        acertos = self._matriz_esparsa(termos, tamanho_bloco)
+
+        ja_agrupados = set()
+        for i, termo_pai in enumerate(termos):
+            if i in ja_agrupados:
+                continue
+
+            indices, scores = acertos[i]
+            if len(indices) <= 1:
+                continue
+
+            variacoes_encontradas = []
+            freq_acumulada = 0
+
+            for j, score in zip(indices, scores):
+                if j in ja_agrupados and j != i:
+                    continue
+
+                freq_acumulada += frequencias[j]
+                ja_agrupados.add(j)
+                if j != i:
+                    variacoes_encontradas.append(f"{originais[j]} [Score: {score:.0f}]")
+
+            if variacoes_encontradas:
+                self.relatorio.append({
+                    'Termo Sugerido (Mais Comum)': originais[i],
+                    'Variações Detectadas (Duplicatas)': " | ".join(variacoes_encontradas),
+                    'Qtd Variações': len(variacoes_encontradas),
+                    'Frequência Total': int(freq_acumulada)
+                })
+
+        tempo = (time.time() - self.inicio) / 60
+        print(f"\n✅ Análise concluída em {tempo:.2f} minutos.")
+        print(f"📊 {len(self.relatorio)} grupos de correções encontrados.")
+
+    @metricas.estagio('analise_grafo')
+    def analisar_em_grafo(self, tamanho_bloco=TAMANHO_BLOCO_CDIST):
+        """
+        Agrupamento por componentes conexos: todo par acima do threshold vira uma
+        aresta e o union-find junta as arestas (A~B e B~C colocam A, B e C no mesmo
+        grupo). Diferente dos modos 'lote'/'classico', o resultado não depende da
+        ordem de visita e grupos grandes não são cortados em LIMITE_VARIACOES.
+        O termo sugerido é o mais frequente do grupo; o score mostrado é o de cada
+        variação contra ele (abaixo do threshold = entrou por encadeamento).
+        """
+        print("🧠 [Fase 2] Análise por Grafo (Componentes Conexos)")
+        if self.df_reduzido is None or self.df_reduzido.empty:
+            print("⚠️ Aviso: 'df_reduzido' está vazio ou não foi carregado. Operação cancelada.")
+            return
+
+        print(f"   ↳ Usando 'Ratio' em blocos de {tamanho_bloco} termos + union-find (sem limite por grupo)")
+
+        termos = self.df_reduzido['Chave_Busca'].tolist()
+        originais = self.df_reduzido['Termo_Original'].tolist()
+        frequencias = self.df_reduzido['Frequencia'].tolist()
+
+        acertos = self._matriz_esparsa(termos, tamanho_bloco, limite=None)
+
+        uniao = UniaoBusca(len(termos))
+        arestas = 0
+        for i, (indices, _) in enumerate(acertos):
+            for j in indices:
+                if j > i:  # A matriz é simétrica: cada par uma vez só
+                    arestas += 1
+                    uniao.unir(i, j)
+        print(f"   ↳ {arestas} pares acima do threshold")
+        metricas.contar('pares_acima_threshold', arestas)
+
+        for membros in uniao.grupos():
+            # df_reduzido vem por frequência decrescente: o menor índice é o mais comum
+            pai = membros[0]
+            scores = [(fuzz.ratio(termos[pai], termos[j]), j) for j in membros[1:]]
+            scores.sort(key=lambda par: (-par[0], par[1]))
+            self.relatorio.append({
+                'Termo Sugerido (Mais Comum)': originais[pai],
+                'Variações Detectadas (Duplicatas)': " | ".join(f"{originais[j]} [Score: {score:.0f}]" for score, j in scores),
+                'Qtd Variações': len(scores),
+                'Frequência Total': int(sum(frequencias[j] for j in membros))
+            })
+
+        tempo = (time.time() - self.inicio) / 60
+        print(f"\n✅ Análise concluída em {tempo:.2f} minutos.")
+        print(f"📊 {len(self.relatorio)} grupos de correções encontrados.")
+
     def salvar(self):
         if not self.relatorio:
             print("✨ Nenhuma duplicata encontrada com esses parâmetros.")
@@ -189,6 +445,10 @@ if __name__ == "__main__":
     # Se colocar 95 pega apenas typos muito óbvios.
     # Se colocar 70 começa a pegar coisas erradas.
     SENSIBILIDADE = 88 
+
+    # 3. Modo de análise: 'lote' (matriz via cdist, segundos), 'classico' (extract por termo) ou
+    #    'grafo' (componentes conexos via union-find: independente da ordem, mas encadeia A~B~C num grupo só)
+    MODO_ANALISE = 'lote'
     
     print("="*60)
     print(f"🔍 DETETIVE DE GRAFIA E PLURAIS - UnB")
@@ -197,7 +457,12 @@ if __name__ == "__main__":
     if os.path.exists(caminho_input):
         app = IndexadorArtesanal(caminho_input, dir_output, threshold=SENSIBILIDADE)
         app.carregar_e_agrupar()
-        app.analisar_profundidade()
+        if MODO_ANALISE == 'grafo':
+            app.analisar_em_grafo()
+        elif MODO_ANALISE == 'lote':
+            app.analisar_em_lote()
+        else:
+            app.analisar_profundidade()
         app.salvar()
     else:
         print(f"❌ ARQUIVO NÃO ENCONTRADO: {NOME_ARQUIVO_ALVO}")
\ No newline at end of file
@@ -1,11 +1,32 @@
 import pandas as pd
+import numpy as np
+import argparse
+import csv
+import itertools
+import json
+import math
+import operator
 import os
 import glob
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comum'))
+import metricas  # noqa: E402
+import normalizacao  # noqa: E402
+from uniao_busca import UniaoBusca  # noqa: E402
+
 # --- Configurações e Constantes ---
 PREFIXO_SAIDA = 'relatorio_duplicatas'
 
+# Modo de detecção: 'exato' (strip + minúsculas, como sempre foi) ou 'similar' (MinHash/LSH)
+MODO_DETECCAO = 'exato'
+LIMIAR_SIMILARIDADE = 0.8   # Jaccard mínimo entre os conjuntos de 5-gramas de caracteres
+TAMANHO_SHINGLE = 5
+NUM_PERMUTACOES = 128
+BANDAS = 16                 # 16 bandas x 8 linhas: um par com Jaccard 0.8 vira candidato em ~95% dos casos
+SEMENTE = 1                 # Mesmas permutações em toda execução (relatórios reprodutíveis)
+LOTE_ASSINATURAS = 512      # Títulos por bloco no cálculo das assinaturas (~40 MB de pico)
+
 def buscar_arquivo_csv():
     """
     Examina o diretório atual em busca de arquivos CSV.
@@ -32,44 +53,216 @@ def normalizar_texto(texto):
     - Converte para minúsculas
     - Remove espaços no início e fim
     """
-    if isinstance(texto, str):
-        return texto.strip().lower()
-    return str(texto)
+    return normalizacao.minusculas(texto)
 
-def gerar_relatorio_txt(df, nome_arquivo):
+class IndiceMinHash:
     """
-    Gera um relatório TXT estruturado para leitura humana.
+    Quase-duplicatas sem comparar todos contra todos.
+
+    Cada chave (título sem caixa, acentos e pontuação) vira o conjunto dos seus
+    5-gramas de caracteres. A assinatura MinHash guarda, para NUM_PERMUTACOES
+    funções de hash, o menor valor do conjunto: a fração de posições iguais entre
+    duas assinaturas estima o Jaccard dos conjuntos. O LSH corta a assinatura em
+    BANDAS faixas e só títulos que coincidem numa faixa inteira viram candidatos;
+    para esses poucos pares o Jaccard é calculado exatamente.
     """
-    try:
-        with open(nome_arquivo, 'w', encoding='utf-8') as f:
-            f.write("RELATÓRIO DE DUPLICIDADES ENCONTRADAS\n")
-            f.write("=====================================\n")
-            f.write(f"Total de registros duplicados listados: {len(df)}\n\n")
-            
-            # Agrupa por título normalizado para exibir em blocos
-            grupos = df.groupby('titulo_normalizado')
-            
-            contador = 0
-            for _, grupo in grupos:
-                contador += 1
-                # Pega o título da primeira ocorrência para exibição
-                titulo_display = grupo.iloc[0]['Titulo']
-                
-                f.write(f"#{contador} TÍTULO: {titulo_display}\n")
-                f.write("-" * 80 + "\n")
-                
-                for _, row in grupo.iterrows():
-                    data = row['Data'] if pd.notna(row['Data']) else "S/ Data"
-                    link = row['Link'] if pd.notna(row['Link']) else "S/ Link"
-                    f.write(f"   DATA: {data:<12} | LINK: {link}\n")
-                
-                f.write("\n")
-        return True
-    except Exception as e:
-        print(f"Erro ao gerar TXT: {e}")
-        return False
 
-def main():
+    def __init__(self, chaves, limiar=LIMIAR_SIMILARIDADE):
+        self.chaves = chaves
+        self.limiar = limiar
+        self._conjuntos = {}
+
+        # Hash multiplicar-somar-deslocar (32 -> 32 bits): 'a' ímpar, aritmética módulo 2^64
+        rng = np.random.default_rng(SEMENTE)
+        self.a = rng.integers(1, 2 ** 63, size=NUM_PERMUTACOES, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=NUM_PERMUTACOES, dtype=np.uint64)
+        self.assinaturas = self._assinar()
+
+    @staticmethod
+    def _shingles(chave, k=TAMANHO_SHINGLE):
+        if len(chave) <= k:
+            return frozenset([chave])
+        return frozenset(chave[i:i + k] for i in range(len(chave) - k + 1))
+
+    def _hashes_shingles(self):
+        """
+        Hash de 32 bits de cada k-grama de todas as chaves, sem laço em Python:
+        as chaves viram um único vetor de code points e cada janela de k posições
+        recebe um hash polinomial. Chaves curtas são completadas até k (um k-grama só).
+        Devolve (hashes, quantidade de k-gramas por chave); repetições dentro de uma
+        chave não atrapalham, o MinHash só olha o mínimo.
+        """
+        k = TAMANHO_SHINGLE
+        texto = "".join(chave.ljust(k) for chave in self.chaves)
+        pontos = np.frombuffer(texto.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        comprimentos = np.fromiter((max(len(c), k) for c in self.chaves), dtype=np.int64, count=len(self.chaves))
+
+        janelas = len(pontos) - k + 1
+        h = np.zeros(janelas, dtype=np.uint64)
+        base = np.uint64(0x100000001B3)  # Primo do FNV-64; o produto dá a volta em 2^64
+        for j in range(k):
+            h = h * base + pontos[j:j + janelas]
+        h ^= h >> np.uint64(29)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(32)
+
+        # Só janelas inteiras dentro de uma chave
+        quantidades = comprimentos - k + 1
+        inicios_chaves = np.concatenate(([0], np.cumsum(comprimentos)[:-1]))
+        validas = np.repeat(inicios_chaves, quantidades) + (
+            np.arange(quantidades.sum()) - np.repeat(np.cumsum(quantidades) - quantidades, quantidades))
+        return h[validas] & np.uint64(0xFFFFFFFF), quantidades
+
+    def _assinar(self):
+        total = len(self.chaves)
+        assinaturas = np.empty((total, NUM_PERMUTACOES), dtype=np.uint32)
+        if not total:
+            return assinaturas
+        hashes, quantidades = self._hashes_shingles()
+        fronteiras = np.concatenate(([0], np.cumsum(quantidades)))
+        for inicio in range(0, total, LOTE_ASSINATURAS):
+            fim = min(inicio + LOTE_ASSINATURAS, total)
+            valores = hashes[fronteiras[inicio]:fronteiras[fim]]
+            misturados = (self.a[:, None] * valores[None, :] + self.b[:, None]) >> np.uint64(32)
+            assinaturas[inicio:fim] = np.minimum.reduceat(
+                misturados, fronteiras[inicio:fim] - fronteiras[inicio], axis=1).T
+        return assinaturas
+
+    def candidatos(self):
+        """Pares (i, j), i < j, que caem no mesmo balde em pelo menos uma banda."""
+        linhas = NUM_PERMUTACOES // BANDAS
+        pares = set()
+        for banda in range(BANDAS):
+            faixa = np.ascontiguousarray(self.assinaturas[:, banda * linhas:(banda + 1) * linhas])
+            chaves_banda = faixa.view(np.dtype((np.void, faixa.itemsize * linhas))).ravel()
+            _, balde, contagem = np.unique(chaves_banda, return_inverse=True, return_counts=True)
+            cheios = np.nonzero(contagem[balde] > 1)[0]
+            if not len(cheios):
+                continue
+            cheios = cheios[np.argsort(balde[cheios], kind='stable')]
+            cortes = np.nonzero(np.diff(balde[cheios]))[0] + 1
+            for membros in np.split(cheios, cortes):
+                pares.update(itertools.combinations(membros.tolist(), 2))
+        return pares
+
+    def conjunto(self, i):
+        if i not in self._conjuntos:
+            self._conjuntos[i] = self._shingles(self.chaves[i])
+        return self._conjuntos[i]
+
+    def jaccard(self, i, j):
+        a, b = self.conjunto(i), self.conjunto(j)
+        return len(a & b) / len(a | b)
+
+    def agrupar(self):
+        """
+        Componentes de pares com Jaccard >= limiar (union-find). Devolve, para cada
+        chave, o índice do representante do grupo (a primeira chave do grupo).
+        """
+        uniao = UniaoBusca(len(self.chaves))
+        candidatos = self.candidatos()
+        confirmados = 0
+        for i, j in candidatos:
+            if self.jaccard(i, j) >= self.limiar:
+                uniao.unir(i, j)
+                confirmados += 1
+        print(f"-> LSH: {len(candidatos)} pares candidatos, {confirmados} acima de {self.limiar:.2f}")
+        metricas.contar('comparacoes_jaccard', len(candidatos))
+        metricas.contar('pares_confirmados', confirmados)
+
+        representante = list(range(len(self.chaves)))
+        for membros in uniao.grupos():
+            for k in membros:
+                representante[k] = membros[0]
+        return representante
+
+
+def marcar_similares(df, limiar=LIMIAR_SIMILARIDADE):
+    """
+    Preenche 'titulo_normalizado' com a chave do representante do grupo de quase-duplicatas
+    e 'Similaridade' com o Jaccard de cada título contra esse representante.
+    """
+    chaves = normalizacao.chave_comparacao_lote(df['Titulo'])
+    unicas = [chave for chave in pd.unique(chaves) if chave]
+    posicao = {chave: k for k, chave in enumerate(unicas)}
+
+    indice = IndiceMinHash(unicas, limiar)
+    representante = indice.agrupar()
+    similaridade = [indice.jaccard(k, r) if k != r else 1.0 for k, r in enumerate(representante)]
+
+    # Títulos vazios não formam grupo entre si
+    df['titulo_normalizado'] = [unicas[representante[posicao[c]]] if c else f"\x00{n}" for n, c in enumerate(chaves)]
+    df['Similaridade'] = [round(similaridade[posicao[c]], 3) if c else 0.0 for c in chaves]
+    metricas.registrar_caches(normalizacao.estatisticas_cache())
+
+
+def _vazio(valor):
+    return valor is None or (isinstance(valor, float) and math.isnan(valor))
+
+def _valor_csv(valor):
+    return '' if _vazio(valor) else valor
+
+def _valor_json(valor):
+    """Mesmo formato do DataFrame.to_json: NaN -> null e '/' escapada."""
+    if _vazio(valor):
+        return 'null'
+    if isinstance(valor, str):
+        return json.dumps(valor, ensure_ascii=False).replace('/', '\\/')
+    if isinstance(valor, (bool, np.bool_)):
+        return 'true' if valor else 'false'
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+def exportar_relatorios(df, nome_csv, nome_json, nome_txt):
+    """
+    Gera o CSV, o JSON e o TXT numa passada só pelos grupos já ordenados
+    (por 'titulo_normalizado'): cada linha sai para os três arquivos ao mesmo
+    tempo, por escritores com buffer, sem cópias do DataFrame nem iterrows.
+    Os formatos são os mesmos do to_csv / to_json(indent=4) / relatório antigo.
+    """
+    colunas = [c for c in df.columns if c != 'titulo_normalizado']
+    pos = {c: k for k, c in enumerate(colunas)}
+    p_titulo, p_data, p_link = pos['Titulo'], pos['Data'], pos['Link']
+    p_sim = pos.get('Similaridade')
+    chaves_json = [f'        {json.dumps(c, ensure_ascii=False)}:' for c in colunas]
+
+    linhas = zip(df['titulo_normalizado'], df[colunas].itertuples(index=False, name=None))
+    buffer = 1 << 20
+    with open(nome_csv, 'w', newline='', encoding='utf-8-sig', buffering=buffer) as f_csv, \
+         open(nome_json, 'w', encoding='utf-8', buffering=buffer) as f_json, \
+         open(nome_txt, 'w', encoding='utf-8', buffering=buffer) as f_txt:
+        escritor_csv = csv.writer(f_csv, lineterminator=os.linesep)
+        escritor_csv.writerow(colunas)
+        f_json.write('[\n')
+        f_txt.write("RELATÓRIO DE DUPLICIDADES ENCONTRADAS\n")
+        f_txt.write("=====================================\n")
+        f_txt.write(f"Total de registros duplicados listados: {len(df)}\n\n")
+
+        primeiro_json = True
+        for contador, (_, grupo) in enumerate(itertools.groupby(linhas, key=operator.itemgetter(0)), start=1):
+            for n, (_, linha) in enumerate(grupo):
+                if n == 0:
+                    # Título da primeira ocorrência para exibição
+                    f_txt.write(f"#{contador} TÍTULO: {linha[p_titulo]}\n")
+                    f_txt.write("-" * 80 + "\n")
+
+                escritor_csv.writerow([_valor_csv(v) for v in linha])
+
+                f_json.write('    {\n' if primeiro_json else ',\n    {\n')
+                f_json.write(',\n'.join(chave + _valor_json(v) for chave, v in zip(chaves_json, linha)))
+                f_json.write('\n    }')
+                primeiro_json = False
+
+                data = linha[p_data] if not _vazio(linha[p_data]) else "S/ Data"
+                link = linha[p_link] if not _vazio(linha[p_link]) else "S/ Link"
+                if p_sim is not None:
+                    f_txt.write(f"   DATA: {data:<12} | SIMILARIDADE: {linha[p_sim]:.2f} | LINK: {link}\n")
+                else:
+                    f_txt.write(f"   DATA: {data:<12} | LINK: {link}\n")
+            f_txt.write("\n")
+        f_json.write('\n]')
+
+@metricas.estagio('processador_titulo')
+def main(modo=MODO_DETECCAO, limiar=LIMIAR_SIMILARIDADE):
     print("--- Iniciando Processador de Duplicatas (Modo Dinâmico) ---\n")
 
     # 1. Detecção Automática do Arquivo
@@ -110,12 +303,17 @@ def main():
         df.columns[2]: 'Data'
     }
     df.rename(columns=mapa_colunas, inplace=True)
+    metricas.contar('titulos', len(df))
 
     # 4. Processamento (A Busca pela Perfeição)
     print("-> Processando duplicatas...")
     
     # Cria impressão digital do título
-    df['titulo_normalizado'] = df['Titulo'].apply(normalizar_texto)
+    if modo == 'similar':
+        print(f"-> Modo similar: MinHash/LSH com Jaccard >= {limiar:.2f} (pontuação, acentos e caixa ignorados)")
+        marcar_similares(df, limiar)
+    else:
+        df['titulo_normalizado'] = normalizacao.minusculas_lote(df['Titulo'])
     
     # Encontra duplicatas (mantendo todas as ocorrências para comparação)
     duplicatas = df[df.duplicated(subset=['titulo_normalizado'], keep=False)].copy()
@@ -132,28 +330,28 @@ def main():
     # 5. Exportação dos Artefatos
     print("\nGerando arquivos de saída...")
     
-    # Preparando DataFrame final (removendo coluna auxiliar interna)
-    df_final = duplicatas.drop(columns=['titulo_normalizado'])
-    
     # Nomes dos arquivos
     nome_csv = f"{PREFIXO_SAIDA}.csv"
     nome_json = f"{PREFIXO_SAIDA}.json"
     nome_txt = f"{PREFIXO_SAIDA}.txt"
-    
-    # CSV
-    df_final.to_csv(nome_csv, index=False, encoding='utf-8-sig') # utf-8-sig para compatibilidade Excel
-    print(f"   [OK] {nome_csv}")
-    
-    # JSON
-    df_final.to_json(nome_json, orient='records', force_ascii=False, indent=4)
-    print(f"   [OK] {nome_json}")
-    
-    # TXT
-    if gerar_relatorio_txt(duplicatas, nome_txt):
-        print(f"   [OK] {nome_txt}")
+
+    # CSV (utf-8-sig para compatibilidade Excel), JSON e TXT numa passada só
+    try:
+        exportar_relatorios(duplicatas, nome_csv, nome_json, nome_txt)
+    except (OSError, ValueError) as e:
+        print(f"ERRO ao gerar os relatórios: {e}")
+        sys.exit()
+    for nome in (nome_csv, nome_json, nome_txt):
+        print(f"   [OK] {nome}")
 
     print("\n--- Concluído com sucesso ---")
     print("Verifique a pasta do script para encontrar os arquivos gerados.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Títulos duplicados no CSV da pasta atual")
+    parser.add_argument('--modo', choices=['exato', 'similar'], default=MODO_DETECCAO,
+                        help="'similar' também acha títulos que só diferem em pontuação, acentos ou subtítulo")
+    parser.add_argument('--limiar', type=float, default=LIMIAR_SIMILARIDADE,
+                        help="Jaccard mínimo no modo similar (0 a 1)")
+    args = parser.parse_args()
+    main(args.modo, args.limiar)
\ No newline at end of file
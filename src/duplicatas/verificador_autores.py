@@ -1,12 +1,22 @@
+import argparse
 import csv
 import difflib
-import re
 import os
+import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+import numpy as np
+from rapidfuzz import process, fuzz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comum'))
+import metricas  # noqa: E402
+import normalizacao  # noqa: E402
 
 # --- CONFIGURAÇÃO ---
 ARQUIVO_ENTRADA = 'autores.csv'
 ARQUIVO_SAIDA = 'relatorio_duplicatas.txt'
 LIMITE_SIMILARIDADE = 0.88  # Aumentei ligeiramente a precisão para evitar "falsos positivos"
+MODO_AUDITORIA = 'blocagem'  # 'blocagem' (grafia + abreviação) ou 'fonetico' (também Souza/Sousa, Luiz/Luis)
 
 class ArtesaoDeDados:
     """
@@ -19,13 +29,14 @@ class ArtesaoDeDados:
         Padroniza o texto para comparação justa.
         Remove pontuação excessiva, converte para maiúsculas e limpa espaços.
         """
-        if not texto: return ""
-        # Remove caracteres que não sejam letras, números, vírgulas ou espaços
-        # Isso ajuda a evitar que um ponto final acidental atrapalhe a comparação
-        limpo = re.sub(r'[^\w\s,]', '', texto) 
-        # Remove espaços duplos
-        limpo = re.sub(r'\s+', ' ', limpo.strip())
-        return limpo.upper()
+        # Remove pontuação (fora a vírgula), espaços duplos e passa para maiúsculas.
+        # Regra e cache compartilhados em src/comum/normalizacao.py
+        return normalizacao.normalizar_autor(texto)
+
+    @staticmethod
+    def remover_acentos(texto: str) -> str:
+        """'ARAÚJO' -> 'ARAUJO' (usado apenas nas chaves de blocagem)."""
+        return normalizacao.remover_acentos(texto)
 
     @staticmethod
     def calcular_similaridade(a: str, b: str) -> float:
@@ -46,6 +57,116 @@ class ArtesaoDeDados:
         # Verifica se o início coincide perfeitamente
         return nl.startswith(nc)
 
+class ArtesaoFonetico:
+    """Especialista em transformar texto escrito em representação sonora (PT-BR)."""
+
+    @staticmethod
+    def gerar_impressao_digital(texto: str) -> str:
+        if not texto: return ""
+        s = ArtesaoDeDados.remover_acentos(texto.upper())
+        s = normalizacao.RE_NAO_LETRA_ASCII.sub('', s)
+
+        # Fonética simplificada PT-BR
+        if s.startswith('H'): s = s[1:]
+        s = s.replace('PH', 'F').replace('Y', 'I')
+        s = s.replace('QU', 'K').replace('CA', 'KA').replace('CO', 'KO').replace('CU', 'KU')
+        s = s.replace('Z', 'S').replace('X', 'S').replace('SS', 'S').replace('SC', 'S')
+        s = s.replace('GE', 'JE').replace('GI', 'JI')
+        s = s.replace('W', 'V')
+        s = normalizacao.RE_LETRAS_REPETIDAS.sub(r'\1', s)
+
+        return s
+
+class MotorDeCandidatos:
+    """
+    Índice que substitui a comparação 'todos contra todos' no difflib.
+    Só chegam às verificações de similaridade e abreviação os pares que
+    podem passar nelas, sem perder nenhum:
+
+    - Abreviação: o nome curto é prefixo do longo, então os candidatos formam
+      um intervalo contíguo na lista ordenada (busca binária).
+    - Grafia similar: o rapidfuzz (C++, todos os núcleos) compara todos os pares
+      e descarta os que não têm chance. fuzz.ratio usa a maior subsequência comum,
+      que nunca é menor que os blocos do SequenceMatcher, então é um teto seguro.
+      Com os nomes ordenados por tamanho, cada nome só enfrenta os de tamanho
+      compatível com o limite (o menor precisa ter ao menos limite / (2 - limite)
+      do tamanho do maior), o que corta uns 3/4 das comparações.
+    """
+
+    BLOCO = 500  # Linhas por chamada ao cdist (matriz de BLOCO x candidatos em uint8)
+
+    def __init__(self, normas: list, limite: float = LIMITE_SIMILARIDADE):
+        self.normas = normas
+        self.vizinhos = defaultdict(set)
+
+        # 1. Intervalos de prefixo (critério de abreviação)
+        self.sem_ponto = [n.replace('.', '').strip() for n in normas]
+        self.ordem = sorted(range(len(normas)), key=lambda k: self.sem_ponto[k])
+        self.chaves_ordenadas = [self.sem_ponto[k] for k in self.ordem]
+        self.por_chave = defaultdict(list)
+        for k, chave in enumerate(self.sem_ponto):
+            self.por_chave[chave].append(k)
+
+        # 2. Pré-filtro de grafia: blocos de linhas contra os nomes de tamanho compatível
+        por_tamanho = sorted(range(len(normas)), key=lambda k: len(normas[k]))
+        textos = [normas[k] for k in por_tamanho]
+        tamanhos = [len(t) for t in textos]
+        proporcao = limite / (2 - limite)
+        for inicio in range(0, len(textos), self.BLOCO):
+            fim = min(inicio + self.BLOCO, len(textos))
+            teto = bisect_right(tamanhos, tamanhos[fim - 1] / proporcao)
+            # As colunas começam em 'inicio': cada par aparece uma vez (coluna depois da linha)
+            scores = process.cdist(textos[inicio:fim], textos[inicio:teto], scorer=fuzz.ratio,
+                                   score_cutoff=limite * 100, dtype=np.uint8, workers=-1)
+            for a, b in zip(*np.nonzero(scores)):
+                if b > a:
+                    i, j = por_tamanho[inicio + a], por_tamanho[inicio + b]
+                    self.vizinhos[i].add(j)
+                    self.vizinhos[j].add(i)
+
+    def candidatos(self, i: int) -> list:
+        """Índices j > i (em ordem crescente) que merecem a comparação completa."""
+        achados = set(self.vizinhos.get(i, ()))
+        chave = self.sem_ponto[i]
+
+        # Abreviação: nomes que começam com a chave...
+        inicio = bisect_left(self.chaves_ordenadas, chave)
+        fim = bisect_left(self.chaves_ordenadas, chave + '\U0010ffff')
+        achados.update(self.ordem[inicio:fim])
+        # ...e nomes que são prefixo da chave
+        for tamanho in range(len(chave)):
+            achados.update(self.por_chave.get(chave[:tamanho], ()))
+
+        return sorted(j for j in achados if j > i)
+
+class IndiceFonetico(MotorDeCandidatos):
+    """
+    Modo fonético: índice invertido por impressão digital sonora.
+
+    - Impressão idêntica ('SOUZA, LUIZ' e 'SOUSA, LUIS' -> 'SOUSALUIS') vira
+      candidato direto, sem comparação par a par.
+    - Grafia e abreviações continuam vindo do pré-filtro do rapidfuzz e dos
+      intervalos de prefixo.
+    Acha tudo o que a blocagem acha e mais as variantes sonoras, pelo custo de
+    um dicionário a mais.
+    """
+
+    def __init__(self, normas: list, limite: float = LIMITE_SIMILARIDADE):
+        self.fonetica = [ArtesaoFonetico.gerar_impressao_digital(n) for n in normas]
+        self.por_impressao = defaultdict(list)
+        for k, impressao in enumerate(self.fonetica):
+            if len(impressao) > 2:  # Impressões curtas demais não distinguem ninguém
+                self.por_impressao[impressao].append(k)
+        super().__init__(normas, limite)
+
+    def mesmo_som(self, i: int, j: int) -> bool:
+        return len(self.fonetica[i]) > 2 and self.fonetica[i] == self.fonetica[j]
+
+    def candidatos(self, i: int) -> list:
+        achados = set(super().candidatos(i))
+        achados.update(j for j in self.por_impressao.get(self.fonetica[i], ()) if j > i)
+        return sorted(achados)
+
 def reconstruir_linha_fragmentada(linha: list) -> tuple:
     """
     Resolve o problema da 'Vírgula ABNT' colidindo com a 'Vírgula CSV'.
@@ -64,8 +185,9 @@ def reconstruir_linha_fragmentada(linha: list) -> tuple:
         
     return linha[0], "0" # Fallback para linhas malformadas
 
-def auditar_csv():
-    print(f"--- Iniciando Auditoria: {ARQUIVO_ENTRADA} ---")
+@metricas.estagio('auditar_csv')
+def auditar_csv(modo: str = MODO_AUDITORIA):
+    print(f"--- Iniciando Auditoria: {ARQUIVO_ENTRADA} (modo {modo}) ---")
     
     if not os.path.exists(ARQUIVO_ENTRADA):
         print(f"ERRO CRÍTICO: O arquivo '{ARQUIVO_ENTRADA}' não foi encontrado.")
@@ -113,9 +235,13 @@ def auditar_csv():
 
     print(f"Dados carregados: {len(dados_processados)} autores. Analisando padrões...")
 
-    # 2. Motor de Comparação (O2)
+    # 2. Motor de Comparação (Blocagem: só pares que podem casar)
+    fonetico = modo == 'fonetico'
+    normas = [d['norm'] for d in dados_processados]
+    motor = IndiceFonetico(normas) if fonetico else MotorDeCandidatos(normas)
     relatorio = []
     indices_ignorados = set()
+    comparacoes = 0
 
     for i in range(len(dados_processados)):
         if i in indices_ignorados: continue
@@ -124,10 +250,11 @@ def auditar_csv():
         grupo = [pivo]
         encontrou_similar = False
 
-        for j in range(i + 1, len(dados_processados)):
+        for j in motor.candidatos(i):
             if j in indices_ignorados: continue
             
             candidato = dados_processados[j]
+            comparacoes += 1
             
             # Comparações
             similiaridade = ArtesaoDeDados.calcular_similaridade(pivo['norm'], candidato['norm'])
@@ -137,6 +264,8 @@ def auditar_csv():
             motivo = ""
             if similiaridade > LIMITE_SIMILARIDADE:
                 motivo = f"Grafia similar ({similiaridade:.0%})"
+            elif fonetico and motor.mesmo_som(i, j):
+                motivo = f"Fonética idêntica ({motor.fonetica[i]})"
             elif abreviacao:
                 motivo = "Possível abreviação/incompleto"
             
@@ -149,6 +278,11 @@ def auditar_csv():
         if encontrou_similar:
             relatorio.append(grupo)
 
+    metricas.contar('registros', len(dados_processados))
+    metricas.contar('comparacoes_fuzzy', comparacoes)
+    metricas.contar('grupos', len(relatorio))
+    metricas.registrar_caches(normalizacao.estatisticas_cache())
+
     # 3. Escrita do Relatório (Design de Informação)
     with open(ARQUIVO_SAIDA, 'w', encoding='utf-8') as f:
         f.write("======================================================\n")
@@ -172,4 +306,8 @@ def auditar_csv():
     print("Abra este arquivo para validar as inconsistências.")
 
 if __name__ == "__main__":
-    auditar_csv()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Auditoria de duplicidades em listas de autores")
+    parser.add_argument('--modo', choices=['blocagem', 'fonetico'], default=MODO_AUDITORIA,
+                        help="'fonetico' também agrupa variantes sonoras (Souza/Sousa, Luiz/Luis)")
+    args = parser.parse_args()
+    auditar_csv(args.modo)
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Cache em disco das respostas do /browse, para rodar os coletores de novo sem
+baixar tudo outra vez (ajuste de seletores, desenvolvimento, coletas repetidas).
+
+- Chave: URL + parâmetros (em ordem), como o requests montaria a requisição.
+- Cada resposta 200 vira um arquivo em .gid_cache/http/ (pickle com o corpo
+  comprimido), gravado num temporário e trocado no fim, como o cache de bases
+  do organizador.
+- Dentro do TTL a resposta sai do disco. Vencida, ela é revalidada: se o servidor
+  mandou ETag/Last-Modified, vai um GET condicional e um 304 renova a entrada sem
+  baixar o corpo; sem validadores, baixa de novo.
+- Modo replay: ignora o TTL e nunca revalida (só vai à rede o que não está no cache).
+- Tamanho limitado: passando de 'tamanho_maximo', saem as entradas usadas há
+  mais tempo (o mtime do arquivo marca o último uso) até sobrar 90% do limite.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DIR_CACHE_HTTP = os.path.join(os.environ.get("GID_CACHE_DIR", ".gid_cache"), "http")
+TTL = 24 * 3600                       # Segundos em que uma página é servida sem perguntar ao servidor
+TAMANHO_MAXIMO = 512 * 1024 * 1024    # Bytes em disco (corpos comprimidos)
+VERSAO_CACHE = 1
+EXTENSAO = '.resposta'
+CABECALHOS_GUARDADOS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CacheHTTP:
+    """Cache de GETs compartilhado pelos workers do motor (as gravações são protegidas por trava)."""
+
+    def __init__(self, diretorio=DIR_CACHE_HTTP, ttl=TTL, tamanho_maximo=TAMANHO_MAXIMO, replay=False):
+        self.diretorio = diretorio
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self.replay = replay
+        self._trava = threading.Lock()
+        self.acertos = self.revalidadas = self.baixadas = 0
+
+        os.makedirs(diretorio, exist_ok=True)
+        self._tamanhos = {}
+        for entrada in os.scandir(diretorio):
+            if entrada.name.endswith(EXTENSAO):
+                self._tamanhos[entrada.name] = entrada.stat().st_size
+        self.ocupado = sum(self._tamanhos.values())
+
+    # --- Chaves e arquivos ---
+
+    @staticmethod
+    def url_canonica(url, params=None):
+        return requests.Request('GET', url, params=sorted((params or {}).items())).prepare().url
+
+    def _arquivo(self, url_canonica):
+        return hashlib.sha1(url_canonica.encode('utf-8')).hexdigest() + EXTENSAO
+
+    def _ler(self, nome):
+        try:
+            with open(os.path.join(self.diretorio, nome), 'rb') as f:
+                registro = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"\n[AVISO] Entrada ilegível no cache HTTP, baixando de novo: {e}")
+            return None
+        return registro if registro.get('versao') == VERSAO_CACHE else None
+
+    def _gravar(self, nome, registro):
+        caminho = os.path.join(self.diretorio, nome)
+        try:
+            temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporario, 'wb') as f:
+                pickle.dump(registro, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, caminho)  # Nunca deixa uma entrada pela metade
+            tamanho = os.path.getsize(caminho)
+        except OSError as e:
+            print(f"\n[AVISO] Não foi possível gravar no cache HTTP: {e}")
+            return
+        with self._trava:
+            self.ocupado += tamanho - self._tamanhos.get(nome, 0)
+            self._tamanhos[nome] = tamanho
+            if self.ocupado > self.tamanho_maximo:
+                self._despejar()
+
+    def _despejar(self):
+        """Remove as entradas usadas há mais tempo até ficar em 90% do limite (chamado com a trava)."""
+        idades = []
+        for nome in self._tamanhos:
+            try:
+                idades.append((os.path.getmtime(os.path.join(self.diretorio, nome)), nome))
+            except OSError:
+                idades.append((0, nome))
+        for _, nome in sorted(idades):
+            if self.ocupado <= self.tamanho_maximo * 0.9:
+                break
+            try:
+                os.remove(os.path.join(self.diretorio, nome))
+            except OSError:
+                pass
+            self.ocupado -= self._tamanhos.pop(nome)
+
+    def _tocar(self, nome):
+        """Marca a entrada como usada agora (o despejo olha o mtime)."""
+        try:
+            os.utime(os.path.join(self.diretorio, nome))
+        except OSError:
+            pass
+
+    # --- Respostas ---
+
+    @staticmethod
+    def _resposta(registro, url):
+        """requests.Response montada a partir da entrada (quem chama não distingue do GET real)."""
+        resposta = requests.Response()
+        resposta.status_code = 200
+        resposta._content = zlib.decompress(registro['corpo'])
+        resposta.headers = CaseInsensitiveDict(registro['cabecalhos'])
+        resposta.encoding = registro['encoding']
+        resposta.url = url
+        resposta.reason = 'OK (cache)'
+        return resposta
+
+    def _guardar(self, nome, url, resposta, validadores):
+        if 'no-store' in resposta.headers.get('Cache-Control', ''):
+            return
+        cabecalhos = {k: resposta.headers[k] for k in CABECALHOS_GUARDADOS if k in resposta.headers}
+        self._gravar(nome, {'versao': VERSAO_CACHE, 'url': url, 'armazenado_em': time.time(),
+                            'cabecalhos': cabecalhos, 'encoding': resposta.encoding,
+                            'corpo': zlib.compress(resposta.content, 1), 'validadores': validadores})
+
+    def _valida(self, registro):
+        return registro is not None and (self.replay or time.time() - registro['armazenado_em'] < self.ttl)
+
+    def fresca(self, url, params=None):
+        """Resposta do disco se ainda estiver no TTL (ou em replay); senão None. Não toca na rede."""
+        canonica = self.url_canonica(url, params)
+        nome = self._arquivo(canonica)
+        registro = self._ler(nome)
+        if not self._valida(registro):
+            return None
+        self._tocar(nome)
+        with self._trava:
+            self.acertos += 1
+        return self._resposta(registro, canonica)
+
+    def get(self, sessao, url, params=None, headers=None, timeout=None):
+        """
+        Mesmo contrato de sessao.get(url, params=..., headers=..., timeout=...):
+        serve do disco, revalida (GET condicional) ou baixa e guarda.
+        """
+        guardada = self.fresca(url, params)
+        if guardada is not None:
+            return guardada
+
+        canonica = self.url_canonica(url, params)
+        nome = self._arquivo(canonica)
+        registro = self._ler(nome)
+        headers = dict(headers or {})
+        validadores = (registro or {}).get('validadores') or {}
+        if 'ETag' in validadores:
+            headers['If-None-Match'] = validadores['ETag']
+        if 'Last-Modified' in validadores:
+            headers['If-Modified-Since'] = validadores['Last-Modified']
+
+        resposta = sessao.get(url, params=params, headers=headers, timeout=timeout)
+        if resposta.status_code == 304 and registro:
+            # Nada mudou no servidor: renova a entrada sem baixar o corpo
+            registro['armazenado_em'] = time.time()
+            self._gravar(nome, registro)
+            with self._trava:
+                self.revalidadas += 1
+            return self._resposta(registro, canonica)
+
+        with self._trava:
+            self.baixadas += 1
+        if resposta.status_code == 200:
+            self._guardar(nome, canonica, resposta,
+                          {k: resposta.headers[k] for k in ('ETag', 'Last-Modified') if k in resposta.headers})
+        return resposta
+
+    def estatisticas(self):
+        return {'acertos': self.acertos, 'revalidadas': self.revalidadas, 'baixadas': self.baixadas,
+                'entradas': len(self._tamanhos), 'ocupado_mb': round(self.ocupado / 1024 / 1024, 1)}
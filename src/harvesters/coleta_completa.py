@@ -0,0 +1,158 @@
+"""
+Coleta completa: os índices do /browse (autores, orientadores, assuntos e
+títulos) num só processo, em vez de rodar os quatro scripts um depois do outro.
+
+- Uma sessão HTTP (um pool de conexões) e um LimitadorDePolidez para todos:
+  --taxa é o orçamento global de requisições por segundo e --concorrencia o
+  total de requisições em voo, com os mesmos padrões de um coletor sozinho —
+  o RIUnB vê a carga de um script, não de quatro. Um 429 em qualquer índice
+  freia todos, e quando um índice termina os outros ficam com o orçamento inteiro.
+- A meta de terminar no tempo do índice mais longo (e não na soma) ficou de
+  fora por polidez: com o orçamento padrão, a coleta completa leva o tempo das
+  requisições somadas, como os quatro scripts em sequência. Quem puder dar ao
+  servidor a carga de N scripts ao mesmo tempo passa --taxa N x TAXA_POLIDEZ
+  (ex.: --taxa 2.0 --concorrencia 16 para os quatro índices) e chega ao tempo do maior.
+- Com --adaptativo, um só ControladorAdaptativo cuida da taxa compartilhada;
+  o rpp é ajustado por índice.
+- Cada índice tem o seu MotorDeColeta: mesmos CSV/JSON Lines, diário e
+  snapshot colunar dos scripts separados, e --resume retoma cada um de onde parou.
+- No fim, um resumo por índice (registros, requisições, duração, arquivo),
+  gravado também em riunb_coleta_completa_<timestamp>.json.
+
+Uso:
+    python src/harvesters/coleta_completa.py
+    python src/harvesters/coleta_completa.py --indices author advisor --adaptativo
+    python src/harvesters/coleta_completa.py --base-url http://127.0.0.1:8765/browse --resume
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from extratores_html import usar_backend
+from motor_coleta import (TAXA_POLIDEZ, LimitadorDePolidez, MotorDeColeta, adicionar_argumentos_coleta,
+                          configurar_sessao, criar_cache, criar_controlador, gravar_snapshot_colunar,
+                          preparar_saida, resumir_cache, resumir_controlador)
+from rinb_advisor import ORIENTADORES
+from riunb_author import AUTORES
+from riunb_subjects import ASSUNTOS
+from riunb_title import TITULOS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comum'))
+import metricas  # noqa: E402
+
+INDICES = {'author': AUTORES, 'advisor': ORIENTADORES, 'subject': ASSUNTOS, 'title': TITULOS}
+PREFIXO_RESUMO = 'riunb_coleta_completa'
+
+
+async def _coletar_indice(motor, saida):
+    """Coleta um índice e devolve a duração em segundos."""
+    arquivo_csv, diario, retomando, arquivo_json = saida
+    inicio = time.perf_counter()
+    await motor.coletar(arquivo_csv, diario, retomando, arquivo_json)
+    return time.perf_counter() - inicio
+
+
+async def _coletar_todos(motores, saidas):
+    # return_exceptions: um índice que falha não derruba os outros
+    return await asyncio.gather(*(_coletar_indice(motores[tipo], saidas[tipo]) for tipo in motores),
+                                return_exceptions=True)
+
+
+def gravar_resumo(resumo, timestamp_str):
+    destino = f"{PREFIXO_RESUMO}_{timestamp_str}.json"
+    with open(destino, 'w', encoding='utf-8') as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    return destino
+
+
+def coletar_indices(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Coleta todos os índices do /browse do RIUnB num só processo. Por polidez, a taxa é um "
+                    "orçamento global: com o padrão, a coleta leva o tempo das requisições somadas, não o do "
+                    "índice mais longo.")
+    parser.add_argument('--indices', nargs='+', choices=list(INDICES), default=list(INDICES),
+                        help="Índices a coletar (padrão: todos)")
+    adicionar_argumentos_coleta(parser, ajuda_taxa=(
+        f"Teto GLOBAL de requisições por segundo, somando todos os índices (padrão {TAXA_POLIDEZ}, o de um "
+        f"coletor sozinho). Para terminar perto do tempo do índice mais longo, use N x {TAXA_POLIDEZ} com N "
+        f"índices, se o servidor tolerar a carga de N coletores"))
+    args = parser.parse_args(argv)
+
+    tipos = list(dict.fromkeys(args.indices))
+    backend = usar_backend(args.parser)
+    cache = criar_cache(args)
+    # Orçamento global: taxa, requisições em voo e controlador valem para todos os índices juntos
+    limitador = LimitadorDePolidez(args.taxa, taxa_minima=args.taxa_min)
+    controlador = criar_controlador(args, limitador, adaptar_rpp=not cache)
+    vagas = asyncio.Semaphore(args.concorrencia)
+    sessao = configurar_sessao(args.concorrencia)
+
+    motores, saidas = {}, {}
+    for tipo in tipos:
+        indice = INDICES[tipo]
+        # Cada índice pode usar todas as vagas quando os outros já terminaram
+        motores[tipo] = MotorDeColeta(indice, base_url=args.base_url,
+                                      rpp=controlador.rpp(tipo) if controlador else args.rpp,
+                                      concorrencia=args.concorrencia, sessao=sessao, limitador=limitador,
+                                      cache=cache, controlador=controlador, vagas=vagas)
+        saidas[tipo] = preparar_saida(indice, motores[tipo], args.resume)
+
+    print(f"🔬 [INÍCIO] Coleta completa: {', '.join(INDICES[tipo].rotulo for tipo in tipos)}")
+    for tipo in tipos:
+        arquivo_csv, _, _, arquivo_json = saidas[tipo]
+        print(f"📁 [{INDICES[tipo].rotulo.upper()}] {arquivo_csv}" + (f" | JSON: {arquivo_json}" if arquivo_json else ""))
+    print(f"⚙️ [CONFIG] RPP: {args.rpp}{' (adaptativo)' if args.adaptativo and not cache else ''} | "
+          f"Concorrência: {args.concorrencia} no total | Polidez: {args.taxa:.1f} req/s no total | HTML: {backend}"
+          + (f" | Cache: {cache.diretorio}" if cache else ""))
+    print("-" * 60)
+
+    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M")
+    inicio = time.time()
+    try:
+        with metricas.estagio('coleta_completa'):
+            resultados = dict(zip(tipos, asyncio.run(_coletar_todos(motores, saidas))))
+            metricas.definir('taxa_final_req_s', limitador.taxa)
+            for tipo in tipos:
+                metricas.definir(f'registros_{tipo}', motores[tipo].total_coletado)
+            resumir_cache(cache)
+            resumir_controlador(controlador)
+    except KeyboardInterrupt:
+        print("\n\n🛑 [INTERROMPIDO] Coleta completa abortada. Cada índice foi salvo até o seu último checkpoint.")
+        print("♻️ Para continuar deste ponto: --resume")
+        return motores
+
+    duracao = time.time() - inicio
+    resumo = {'inicio': datetime.fromtimestamp(inicio).isoformat(timespec='seconds'), 'duracao_s': round(duracao, 1),
+              'taxa_global': args.taxa, 'taxa_final': round(limitador.taxa, 2),
+              'requisicoes': sum(motor.requisicoes for motor in motores.values()), 'indices': {}}
+
+    print(f"\n\n📊 [RESUMO] Coleta completa em {duracao / 60:.1f} min | {resumo['requisicoes']} requisições | "
+          f"Taxa final: {limitador.taxa:.2f} req/s")
+    for tipo, resultado in resultados.items():
+        motor = motores[tipo]
+        arquivo_csv, _, _, arquivo_json = saidas[tipo]
+        falhou = isinstance(resultado, BaseException)
+        resumo['indices'][tipo] = {
+            'registros': motor.total_coletado, 'requisicoes': motor.requisicoes, 'rpp_final': motor.rpp,
+            'duracao_s': None if falhou else round(resultado, 1), 'arquivo': arquivo_csv, 'arquivo_json': arquivo_json,
+            'erro': repr(resultado) if falhou else None,
+        }
+        if falhou:
+            print(f"   ❌ {motor.indice.rotulo:<13} falhou após {motor.total_coletado} registros: {resultado!r} "
+                  f"(continue com --resume)")
+            continue
+        print(f"   ↳ {motor.indice.rotulo:<13} {motor.total_coletado:7d} registros | {motor.requisicoes:5d} req | "
+              f"{resultado / 60:5.1f} min | {arquivo_csv}")
+        gravar_snapshot_colunar(arquivo_csv)
+
+    print(f"📄 Resumo salvo em: {gravar_resumo(resumo, timestamp_str)}")
+    return motores
+
+
+if __name__ == "__main__":
+    coletar_indices()
@@ -0,0 +1,258 @@
+import asyncio
+import csv
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from motor_coleta import DiarioDeColeta, gravar_snapshot_colunar, linha_json
+
+# --- CONFIGURAÇÃO ---
+DIR_RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DIR_RAW = os.path.join(DIR_RAIZ, 'data', 'raw')
+SALTO_MAXIMO = 64   # Maior salto (em páginas) entre duas sondagens de uma faixa sem mudanças
+
+
+def localizar_snapshot(indice, diretorios=('', DIR_RAW)):
+    """Snapshot completo mais recente do índice (diretório atual ou data/raw)."""
+    candidatos = []
+    for diretorio in diretorios:
+        for caminho in glob.glob(os.path.join(diretorio, indice.nome_saida('*'))):
+            # Coleta interrompida (diário sem 'concluido') não serve de referência, nem um
+            # delta antigo gravado com o nome de snapshot (páginas copiadas sem conferir)
+            estado = DiarioDeColeta(caminho).ler_estado()
+            if estado is None or (estado.get('concluido') and not estado.get('paginas_copiadas')):
+                candidatos.append(caminho)
+    if not candidatos:
+        return None
+    # O timestamp no nome (YYYYMMDD_HHMM) ordena cronologicamente
+    return max(candidatos, key=os.path.basename)
+
+
+def carregar_snapshot(caminho):
+    """
+    Lê o CSV de uma coleta anterior: lista ordenada de (valores, offset, timestamp).
+    Páginas sobrepostas da coleta antiga geram linhas repetidas: ficamos com a primeira.
+    """
+    registros = []
+    vistos = set()
+    with open(caminho, mode='r', newline='', encoding='utf-8-sig') as f:
+        leitor = csv.reader(f)
+        next(leitor, None)
+        for linha in leitor:
+            if len(linha) < 4:
+                continue
+            *valores, offset, timestamp = linha
+            valores = tuple(valores)
+            if valores[0] in vistos:
+                continue
+            vistos.add(valores[0])
+            registros.append((valores, offset, timestamp))
+    return registros
+
+
+class ColetaDelta:
+    """
+    Coleta incremental contra o snapshot anterior.
+
+    O /browse é ordenado, então uma página que bate com o snapshot (mesmos termos,
+    mesma 'Frequencia', na mesma sequência) diz onde estamos nele: o deslocamento
+    d = offset - posição conta as inserções/remoções antes daquele ponto.
+    Enquanto as sondagens batem com o mesmo d, os saltos dobram (2, 4, 8... até
+    SALTO_MAXIMO páginas) e o trecho pulado é copiado do snapshot. Quando uma
+    sondagem não bate, uma busca binária acha a primeira página diferente e a
+    coleta segue dali, baixando página a página até reencontrar o snapshot.
+
+    Limite: uma página pulada não é baixada, então uma mudança só de frequência
+    (ou uma inserção compensada por uma remoção) dentro dela não aparece:
+    conferir exigiria baixar a página, que é justamente o que o salto economiza.
+    Por isso o resultado é um delta, não um snapshot: vai para
+    delta_riunb_<tipo>_<timestamp>.csv (TipoIndice.nome_delta), fora do padrão
+    riunb_*_scraping_* que os leitores de snapshot usam; as linhas copiadas
+    mantêm o Timestamp_Coleta antigo e a base do próximo --delta continua sendo
+    a última coleta completa.
+    """
+
+    def __init__(self, motor, snapshot, salto_maximo=SALTO_MAXIMO):
+        self.motor = motor
+        self.rpp = motor.rpp
+        self.snapshot = snapshot
+        self.posicao = {valores[0]: k for k, (valores, _, _) in enumerate(snapshot)}
+        self.salto_maximo = salto_maximo
+
+        self.linhas = []             # Novo dataset: [*valores, offset, timestamp]
+        self.ultima_entrada = ""
+        self.requisicoes = 0
+        self.paginas_reaproveitadas = 0
+        self._cache = {}
+
+    async def _pagina(self, offset):
+        if offset in self._cache:
+            return self._cache.pop(offset)
+        self.requisicoes += 1
+        html = await self.motor._buscar_pagina(offset)
+        n_itens, registros = self.motor.extrair(html)
+        return n_itens, registros, datetime.now().isoformat()
+
+    def _deslocamento(self, offset, registros):
+        """d se a página é um trecho contíguo e idêntico do snapshot, senão None."""
+        if not registros or registros[0][0] not in self.posicao:
+            return None
+        inicio = self.posicao[registros[0][0]]
+        if inicio + len(registros) > len(self.snapshot):
+            return None
+        for k, valores in enumerate(registros):
+            if self.snapshot[inicio + k][0] != tuple(valores):
+                return None
+        return offset - inicio
+
+    def _emitir_pagina(self, offset, registros, timestamp):
+        """Grava uma página baixada. Retorna False no fim do índice."""
+        if registros and registros[0][0] == self.ultima_entrada:
+            print(f"\n[INFO] Repetição de dados ou fim de índice detectado.")
+            return False
+        for valores in registros:
+            self.linhas.append([*valores, offset, timestamp])
+        if registros:
+            self.ultima_entrada = registros[0][0]
+        return True
+
+    def _reaproveitar(self, offset_ini, offset_fim, d):
+        """Copia do snapshot as páginas [offset_ini, offset_fim) que não foram baixadas."""
+        for pos in range(offset_ini - d, min(offset_fim - d, len(self.snapshot))):
+            valores, _, timestamp = self.snapshot[pos]
+            novo = pos + d
+            self.linhas.append([*valores, novo - novo % self.rpp, timestamp])
+        self.paginas_reaproveitadas += (offset_fim - offset_ini) // self.rpp
+
+    async def coletar(self):
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(1))
+        offset = 0
+        salto = 2
+
+        while True:
+            n_itens, registros, timestamp = await self._pagina(offset)
+            if not n_itens:
+                print(f"\n[FIM] Fim da lista alcançado no offset {offset}.")
+                break
+            if not self._emitir_pagina(offset, registros, timestamp):
+                break
+
+            d = self._deslocamento(offset, registros)
+            if d is None:
+                offset += self.rpp
+                salto = 2
+                self._progresso(offset)
+                continue
+
+            # Página conhecida: sonda 'salto' páginas adiante
+            sonda = offset + salto * self.rpp
+            self._cache[sonda] = await self._pagina(sonda)
+            if self._bate(sonda, d):
+                self._reaproveitar(offset + self.rpp, sonda, d)
+                salto = min(salto * 2, self.salto_maximo)
+                offset = sonda
+                self._progresso(offset)
+                continue
+
+            # Algo mudou no caminho: busca binária pela última página ainda igual
+            base, limite = offset, sonda
+            while limite - base > self.rpp:
+                meio = base + (limite - base) // self.rpp // 2 * self.rpp
+                self._cache[meio] = await self._pagina(meio)
+                if self._bate(meio, d):
+                    del self._cache[meio]  # O snapshot já tem essa página
+                    base = meio
+                else:
+                    limite = meio
+            self._reaproveitar(offset + self.rpp, base + self.rpp, d)
+            for antigo in [o for o in self._cache if o > limite]:
+                del self._cache[antigo]  # Sondas além da mudança: o deslocamento lá é outro
+            offset = limite
+            salto = 2
+            self._progresso(offset)
+
+        return self.linhas
+
+    def _bate(self, offset, d):
+        n_itens, registros, _ = self._cache[offset]
+        return bool(n_itens) and self._deslocamento(offset, registros) == d
+
+    def _progresso(self, offset):
+        print(f"🔎 Delta: offset {offset} | Requisições: {self.requisicoes} | "
+              f"Páginas reaproveitadas: {self.paginas_reaproveitadas}", end='\r')
+
+    def mudancas(self):
+        """Compara o dataset novo com o snapshot: adicionados, removidos e frequência alterada."""
+        antigos = {valores[0]: valores[1:] for valores, _, _ in self.snapshot}
+        novos = {linha[0]: tuple(linha[1:-2]) for linha in self.linhas}
+        log = []
+        for termo, valores in novos.items():
+            if termo not in antigos:
+                log.append([termo, 'ADICIONADO', '', ';'.join(valores)])
+            elif antigos[termo] != valores:
+                log.append([termo, 'ALTERADO', ';'.join(antigos[termo]), ';'.join(valores)])
+        for termo, valores in antigos.items():
+            if termo not in novos:
+                log.append([termo, 'REMOVIDO', ';'.join(valores), ''])
+        return log
+
+
+def executar_delta(indice, motor, caminho_snapshot=None):
+    caminho_snapshot = caminho_snapshot or localizar_snapshot(indice)
+    if not caminho_snapshot or not os.path.exists(caminho_snapshot):
+        print(f"❌ [DELTA] Nenhum snapshot anterior de '{indice.tipo}' encontrado. Rode a coleta completa primeiro.")
+        return None
+
+    snapshot = carregar_snapshot(caminho_snapshot)
+    agora = datetime.now()
+    output_file = indice.nome_delta(agora.strftime("%Y%m%d_%H%M"))
+    if os.path.exists(output_file):
+        output_file = indice.nome_delta(agora.strftime("%Y%m%d_%H%M%S"))  # Outro delta no mesmo minuto
+    arquivo_log = f"{os.path.splitext(output_file)[0]}_mudancas.csv"
+
+    print(f"🔬 [DELTA] Coleta incremental de {indice.rotulo} (type={indice.tipo})")
+    print(f"📚 [BASE] {caminho_snapshot} ({len(snapshot)} registros)")
+    print(f"📁 [DELTA] {output_file} (não substitui o snapshot) | Mudanças: {arquivo_log}")
+    print("-" * 60)
+
+    coleta = ColetaDelta(motor, snapshot)
+    try:
+        linhas = asyncio.run(coleta.coletar())
+    except KeyboardInterrupt:
+        print(f"\n\n🛑 [INTERROMPIDO] Coleta delta abortada. Nada foi gravado (o snapshot anterior segue válido).")
+        return None
+
+    with open(output_file, mode='w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(indice.cabecalho)
+        writer.writerows(linhas)
+    if indice.campos_json:
+        with open(os.path.splitext(output_file)[0] + '.jsonl', 'w', encoding='utf-8') as f_json:
+            f_json.writelines(linha_json(indice, linha) for linha in linhas)
+    diario = DiarioDeColeta(output_file)
+    diario.abrir(indice, coleta.rpp)
+    diario.concluir(None, delta=True, base=os.path.basename(caminho_snapshot),
+                    paginas_copiadas=coleta.paginas_reaproveitadas)
+    diario.fechar()
+
+    log = coleta.mudancas()
+    coluna_valor = indice.cabecalho[1]
+    with open(arquivo_log, mode='w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow([indice.cabecalho[0], 'Mudanca', f'{coluna_valor}_Anterior', f'{coluna_valor}_Atual'])
+        writer.writerows(log)
+
+    paginas_completas = -(-len(linhas) // coleta.rpp) + 1
+    contagem = {tipo: sum(1 for item in log if item[1] == tipo) for tipo in ('ADICIONADO', 'REMOVIDO', 'ALTERADO')}
+    print(f"\n\n✨ [CONCLUÍDO] {len(linhas)} registros | Requisições: {coleta.requisicoes} "
+          f"(coleta completa: ~{paginas_completas})")
+    print(f"📊 Adicionados: {contagem['ADICIONADO']} | Removidos: {contagem['REMOVIDO']} | "
+          f"Frequência alterada: {contagem['ALTERADO']}")
+    if coleta.paginas_reaproveitadas:
+        print(f"⚠️ [DELTA] {coleta.paginas_reaproveitadas} páginas copiadas do snapshot sem conferir (Timestamp_Coleta antigo): "
+              f"mudanças só de frequência nelas não aparecem no log. O próximo --delta continua usando {caminho_snapshot} "
+              f"como base; rode uma coleta completa de tempos em tempos.")
+    print(f"📄 Delta: {output_file} | Log de mudanças: {arquivo_log}")
+    gravar_snapshot_colunar(output_file)
+    return coleta
@@ -0,0 +1,159 @@
+"""
+Extração dos itens do /browse com backends intercambiáveis.
+
+Cada backend devolve o mesmo que a versão BeautifulSoup: (n_itens, registros),
+onde n_itens conta os <li class="list-group-item"> e registros são pares
+(termo, frequência) ou (título, link). Os backends compilados (selectolax,
+lxml) são opcionais: o primeiro instalado vira o padrão e o BeautifulSoup fica
+como reserva. Força-se um backend com GID_PARSER=<nome> ou '--parser'.
+"""
+
+import os
+
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser  # Versões antigas, sem o Lexbor
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+ORDEM_PREFERENCIA = ('selectolax', 'lxml', 'bs4')
+
+
+# --- BeautifulSoup (referência) ---
+
+def _termos_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    itens = soup.find_all('li', class_='list-group-item')
+    registros = []
+    for item in itens:
+        link_termo = item.find('a')
+        span_freq = item.find('span', class_='badge')
+        if link_termo and span_freq:
+            registros.append((link_termo.get_text(strip=True), span_freq.get_text(strip=True)))
+    return len(itens), registros
+
+
+def _titulos_bs4(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    itens = soup.find_all('li', class_='list-group-item')
+    registros = []
+    for item in itens:
+        tag_a = item.find('a')
+        if tag_a:
+            registros.append((tag_a.get_text(strip=True), tag_a.get('href', '')))
+    return len(itens), registros
+
+
+# --- selectolax (Lexbor, C) ---
+
+def _termos_selectolax(html):
+    itens = HTMLParser(html).css('li.list-group-item')
+    registros = []
+    for item in itens:
+        link_termo = item.css_first('a')
+        span_freq = item.css_first('span.badge')
+        if link_termo is not None and span_freq is not None:
+            registros.append((link_termo.text(strip=True), span_freq.text(strip=True)))
+    return len(itens), registros
+
+
+def _titulos_selectolax(html):
+    itens = HTMLParser(html).css('li.list-group-item')
+    registros = []
+    for item in itens:
+        tag_a = item.css_first('a')
+        if tag_a is not None:
+            registros.append((tag_a.text(strip=True), tag_a.attributes.get('href') or ''))
+    return len(itens), registros
+
+
+# --- lxml (libxml2, C) ---
+
+if lxml is not None:
+    _XP_ITENS = etree.XPath("//li[contains(concat(' ', normalize-space(@class), ' '), ' list-group-item ')]")
+    _XP_LINK = etree.XPath("(.//a)[1]")
+    _XP_BADGE = etree.XPath("(.//span[contains(concat(' ', normalize-space(@class), ' '), ' badge ')])[1]")
+
+
+def _texto_lxml(elemento):
+    """Equivalente ao get_text(strip=True): cada trecho de texto aparado, sem separador."""
+    return "".join(trecho.strip() for trecho in elemento.itertext())
+
+
+def _arvore_lxml(html):
+    if not html.strip():
+        return None
+    try:
+        return lxml.html.fromstring(html)
+    except ValueError:
+        # Texto com declaração de encoding (<?xml ... encoding=...?>) só entra como bytes
+        return lxml.html.fromstring(html.encode('utf-8'))
+
+
+def _termos_lxml(html):
+    arvore = _arvore_lxml(html)
+    itens = _XP_ITENS(arvore) if arvore is not None else []
+    registros = []
+    for item in itens:
+        link_termo = _XP_LINK(item)
+        span_freq = _XP_BADGE(item)
+        if link_termo and span_freq:
+            registros.append((_texto_lxml(link_termo[0]), _texto_lxml(span_freq[0])))
+    return len(itens), registros
+
+
+def _titulos_lxml(html):
+    arvore = _arvore_lxml(html)
+    itens = _XP_ITENS(arvore) if arvore is not None else []
+    registros = []
+    for item in itens:
+        tag_a = _XP_LINK(item)
+        if tag_a:
+            registros.append((_texto_lxml(tag_a[0]), tag_a[0].get('href', '')))
+    return len(itens), registros
+
+
+# --- Registro e seleção ---
+
+BACKENDS = {'bs4': (_termos_bs4, _titulos_bs4)}
+if lxml is not None:
+    BACKENDS['lxml'] = (_termos_lxml, _titulos_lxml)
+if HTMLParser is not None:
+    BACKENDS['selectolax'] = (_termos_selectolax, _titulos_selectolax)
+
+BACKEND_PADRAO = next(nome for nome in ORDEM_PREFERENCIA if nome in BACKENDS)
+_ativo = BACKENDS[BACKEND_PADRAO]
+
+
+def usar_backend(nome=None):
+    """Troca o backend ativo (None = GID_PARSER ou o mais rápido instalado)."""
+    global _ativo
+    nome = nome or os.environ.get('GID_PARSER') or BACKEND_PADRAO
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend '{nome}' indisponível. Instalados: {', '.join(BACKENDS)}")
+    _ativo = BACKENDS[nome]
+    return nome
+
+
+def backend_ativo():
+    return next(nome for nome, funcoes in BACKENDS.items() if funcoes is _ativo)
+
+
+def extrair_termos(html):
+    """Páginas de índice (autor, orientador, assunto): pares (termo, frequência)."""
+    return _ativo[0](html)
+
+
+def extrair_titulos(html):
+    """Páginas de títulos: pares (título, link relativo) do primeiro <a> de cada item."""
+    return _ativo[1](html)
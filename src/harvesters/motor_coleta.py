@@ -0,0 +1,738 @@
+import argparse
+import asyncio
+import csv
+import glob
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from cache_http import TAMANHO_MAXIMO as CACHE_TAMANHO_MAXIMO, TTL as CACHE_TTL, CacheHTTP
+from extratores_html import BACKENDS, extrair_termos, usar_backend
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comum'))
+import metricas  # noqa: E402
+import snapshot_colunar  # noqa: E402
+
+# --- CONFIGURAÇÃO PADRÃO ---
+BASE_URL = os.environ.get("RIUNB_BASE_URL", "https://repositorio.unb.br/browse")
+RPP = 50                # Itens por página (50 evita o timeout que ocorreu no offset 2900)
+RPP_MINIMO = 20         # Limites do rpp no modo --adaptativo
+RPP_MAXIMO = 200
+CONCORRENCIA = 4        # Offsets buscados ao mesmo tempo
+TAXA_POLIDEZ = 0.5      # Requisições por segundo (teto do balde de fichas): o ritmo do antigo time.sleep(2.0)
+TIMEOUT = 60
+PAUSA_ERRO = 15         # Segundos de espera após erro de conexão (mesmo valor dos scripts antigos)
+TAXA_MINIMA = 0.1       # Piso da taxa quando o servidor pede calma
+LATENCIA_ALVO = 3.0     # Segundos por página acima dos quais o modo --adaptativo alivia o servidor
+ACCEPT = 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+
+
+def configurar_sessao(concorrencia=CONCORRENCIA):
+    """
+    Mesmo padrão dos coletores: requests.Session() + Retry.
+    O 429 fica de fora do Retry de propósito: quem trata o 'vá mais devagar'
+    do servidor é o LimitadorDePolidez, que reduz a taxa para TODOS os workers.
+    (Sem respect_retry_after_header=False o urllib3 repetiria sozinho os 429
+    que trazem Retry-After, e o limitador nunca ficaria sabendo.)
+    """
+    sessao = requests.Session()
+    retentativas = Retry(
+        total=5,
+        backoff_factor=3,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adaptador = HTTPAdapter(max_retries=retentativas, pool_maxsize=max(concorrencia, 10))
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    return sessao
+
+
+# --- CONFIGURAÇÃO DE UM ÍNDICE ---
+# (os extratores de página ficam em extratores_html.py)
+
+@dataclass
+class TipoIndice:
+    """Tudo o que diferencia um coletor do outro: o resto é o motor."""
+    tipo: str                                   # Valor do parâmetro 'type=' do /browse
+    rotulo: str                                 # Nome amigável para os logs ("Autores")
+    prefixo_arquivo: str                        # riunb_<tipo>_scraping
+    cabecalho: list                             # Colunas do CSV
+    user_agent: str = 'ResearchBot/1.5 (Academic Study; contact: seu-email@unb.br)'
+    extrator: Callable = extrair_termos
+    campos_json: Optional[list] = None          # Se definido, também gera um JSON Lines com estas chaves
+    params_extra: dict = field(default_factory=dict)
+
+    def nome_saida(self, timestamp_str, extensao='csv'):
+        return f"{self.prefixo_arquivo}_{timestamp_str}.{extensao}"
+
+    def nome_delta(self, timestamp_str, extensao='csv'):
+        """Saída do --delta: fora do padrão riunb_* dos snapshots, que os leitores tomam como coleta completa."""
+        return f"delta_{self.prefixo_arquivo.replace('_scraping', '')}_{timestamp_str}.{extensao}"
+
+
+# --- POLIDEZ ---
+
+class LimitadorDePolidez:
+    """
+    Balde de fichas compartilhado por todos os workers.
+    Cada requisição consome uma ficha; as fichas voltam na 'taxa' atual.
+    Ao receber 429 a taxa cai pela metade e todos esperam o Retry-After;
+    cada sucesso devolve um pouco da taxa, até o teto configurado.
+    """
+
+    def __init__(self, taxa=TAXA_POLIDEZ, capacidade=None, taxa_minima=TAXA_MINIMA):
+        self.taxa_maxima = taxa
+        self.taxa = taxa
+        self.taxa_minima = taxa_minima
+        self.capacidade = capacidade or max(1.0, taxa)
+        self.fichas = self.capacidade
+        self.ultimo = time.monotonic()
+        self.pausa_ate = 0.0
+        self._trava = asyncio.Lock()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa)
+        self.ultimo = agora
+
+    async def adquirir(self):
+        async with self._trava:
+            while True:
+                espera_pausa = self.pausa_ate - time.monotonic()
+                if espera_pausa > 0:
+                    await asyncio.sleep(espera_pausa)
+                    continue
+                self._repor()
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                await asyncio.sleep((1 - self.fichas) / self.taxa)
+
+    def penalizar(self, retry_after=None):
+        """Servidor pediu calma (429): metade da taxa e pausa geral."""
+        self.taxa = max(self.taxa_minima, self.taxa / 2)
+        pausa = retry_after if retry_after is not None else 1 / self.taxa
+        self.pausa_ate = max(self.pausa_ate, time.monotonic() + pausa)
+        self.fichas = 0
+
+    def recompensar(self):
+        """Resposta boa: recupera a taxa aos poucos (aumento aditivo)."""
+        self.taxa = min(self.taxa_maxima, self.taxa + self.taxa_maxima * 0.05)
+
+    def desacelerar(self, fator):
+        """Servidor lento, mas sem 429: reduz a taxa sem pausar ninguém."""
+        self.taxa = max(self.taxa_minima, self.taxa * fator)
+
+
+class ControladorAdaptativo:
+    """
+    Modo --adaptativo: ajusta o rpp e a taxa do limitador pelo que o servidor
+    mostra, sempre dentro dos limites configurados.
+
+    A cada 'janela' respostas olha a latência por página (média móvel) e a
+    fração de erros (exceções e 5xx repetidos pelo urllib3):
+    - erros acima de 'limite_erros': páginas pela metade e taxa x0.5;
+    - latência acima do alvo: páginas x0.75 e taxa x0.8 (página grande demais
+      é o que dava timeout no RIUnB no offset 2900);
+    - latência abaixo de metade do alvo e nenhum erro: páginas x1.25 — menos
+      requisições para o mesmo índice.
+    Cada sucesso só devolve taxa ao limitador se a latência estiver dentro do
+    alvo. O 429 continua com o limitador (metade da taxa + Retry-After) e não
+    encolhe a página: página menor seria ainda mais requisições.
+
+    Um controlador por limitador: na coleta_completa.py os índices dividem o
+    mesmo, e cada um tem o seu rpp (as janelas de latência/erros do rpp são por
+    índice; as da taxa, de todas as respostas juntas).
+
+    Erros de conexão esperam com recuo exponencial (pausa_minima, 2x, 4x...
+    até pausa_maxima) em vez da pausa fixa; o primeiro sucesso zera o recuo.
+
+    Com adaptar_rpp=False (coleta delta, cache) só a taxa e o recuo se adaptam.
+    """
+
+    def __init__(self, limitador, rpp=RPP, rpp_minimo=RPP_MINIMO, rpp_maximo=RPP_MAXIMO,
+                 latencia_alvo=LATENCIA_ALVO, janela=10, limite_erros=0.1,
+                 pausa_minima=1.0, pausa_maxima=PAUSA_ERRO, adaptar_rpp=True):
+        self.limitador = limitador
+        self.rpp_inicial = min(rpp_maximo, max(rpp_minimo, rpp)) if adaptar_rpp else rpp
+        self.rpp_minimo = rpp_minimo
+        self.rpp_maximo = rpp_maximo
+        self.latencia_alvo = latencia_alvo
+        self.janela = janela
+        self.limite_erros = limite_erros
+        self.pausa_minima = pausa_minima
+        self.pausa_maxima = pausa_maxima
+        self.adaptar_rpp = adaptar_rpp
+
+        self.geral = self._nova_janela()  # Decide a taxa (todas as respostas)
+        self.indices = {}                 # tipo do índice -> janela própria + rpp
+        self.erros_seguidos = 0
+        self.ajustes = 0
+
+    @staticmethod
+    def _nova_janela(**extra):
+        # latencia: média móvel exponencial (s por página); respostas/erros: janela atual
+        return {'latencia': None, 'respostas': 0, 'erros': 0, **extra}
+
+    def _indice(self, tipo):
+        if tipo not in self.indices:
+            self.indices[tipo] = self._nova_janela(rpp=self.rpp_inicial)
+        return self.indices[tipo]
+
+    def rpp(self, tipo):
+        return self._indice(tipo)['rpp']
+
+    def definir_rpp(self, tipo, rpp):
+        """rpp de um índice retomado (vem do diário)."""
+        if self.adaptar_rpp:
+            self._indice(tipo)['rpp'] = rpp
+
+    @staticmethod
+    def _observar(janela, latencia, erro):
+        janela['respostas'] += 1
+        if erro:
+            janela['erros'] += 1
+        else:
+            janela['latencia'] = latencia if janela['latencia'] is None else 0.7 * janela['latencia'] + 0.3 * latencia
+
+    def registrar(self, tipo, latencia=None, erro=False):
+        """Uma resposta (latência em s) ou um erro do índice 'tipo'; a cada 'janela' respostas, decide."""
+        indice = self._indice(tipo)
+        self._observar(indice, latencia, erro)
+        self._observar(self.geral, latencia, erro)
+        if not erro:
+            self.erros_seguidos = 0
+            if indice['latencia'] <= self.latencia_alvo:
+                self.limitador.recompensar()
+        if indice['respostas'] >= self.janela:
+            self._avaliar_rpp(tipo, indice)
+        if self.geral['respostas'] >= self.janela:
+            self._avaliar_taxa()
+
+    def _estado(self, janela):
+        """'erros', 'lento', 'folgado' ou None (segue como está); zera a janela."""
+        fracao_erros = janela['erros'] / janela['respostas']
+        latencia = janela['latencia']
+        estado = None
+        if fracao_erros > self.limite_erros:
+            estado = 'erros'
+        elif latencia is not None and latencia > self.latencia_alvo:
+            estado = 'lento'
+        elif latencia is not None and latencia < self.latencia_alvo / 2 and not janela['erros']:
+            estado = 'folgado'
+        janela['respostas'] = janela['erros'] = 0
+        return estado, fracao_erros
+
+    def _avaliar_rpp(self, tipo, indice):
+        estado, fracao_erros = self._estado(indice)
+        if not self.adaptar_rpp or estado is None:
+            return
+        antes = indice['rpp']
+        fator = {'erros': 0.5, 'lento': 0.75, 'folgado': 1.25}[estado]
+        indice['rpp'] = min(self.rpp_maximo, max(self.rpp_minimo, round(antes * fator)))
+        if indice['rpp'] != antes:
+            self._anunciar(f"rpp de {tipo} {antes} -> {indice['rpp']}", indice['latencia'], fracao_erros)
+
+    def _avaliar_taxa(self):
+        estado, fracao_erros = self._estado(self.geral)
+        antes = self.limitador.taxa
+        if estado == 'erros':
+            self.limitador.desacelerar(0.5)
+        elif estado == 'lento':
+            self.limitador.desacelerar(0.8)
+        if round(self.limitador.taxa, 2) != round(antes, 2):
+            self._anunciar(f"taxa {antes:.2f} -> {self.limitador.taxa:.2f} req/s", self.geral['latencia'], fracao_erros)
+
+    def _anunciar(self, mudanca, latencia, fracao_erros):
+        self.ajustes += 1
+        metricas.contar('ajustes_adaptativos')
+        print(f"\n🎛️ [ADAPTATIVO] {mudanca} (latência {latencia or 0:.2f}s, erros {fracao_erros:.0%})")
+
+    def pausa_apos_erro(self):
+        """Recuo exponencial com jitter para o próximo erro de conexão seguido."""
+        pausa = min(self.pausa_maxima, self.pausa_minima * 2 ** self.erros_seguidos)
+        self.erros_seguidos += 1
+        return pausa * random.uniform(1.0, 1.25)
+
+
+def ler_retry_after(response):
+    valor = response.headers.get('Retry-After')
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        return None
+
+
+# --- CHECKPOINTS ---
+
+class DiarioDeColeta:
+    """
+    Diário de checkpoints em JSON Lines ao lado do CSV (<arquivo>.journal).
+    Uma linha por página gravada: próximo offset, última entrada vista, total
+    e o tamanho do CSV (e do JSON Lines, se houver) em bytes naquele instante.
+    Com ele, '--resume' corta os arquivos no último ponto consistente e
+    continua do offset seguinte.
+    """
+    SUFIXO = '.journal'
+
+    def __init__(self, arquivo_csv):
+        self.arquivo_csv = arquivo_csv
+        self.caminho = arquivo_csv + self.SUFIXO
+        self._arquivo = None
+
+    def _escrever(self, registro):
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def abrir(self, indice, rpp, novo=True):
+        self._arquivo = open(self.caminho, 'w' if novo else 'a', encoding='utf-8')
+        if novo:
+            self._escrever({'tipo': indice.tipo, 'arquivo': os.path.basename(self.arquivo_csv), 'rpp': rpp})
+
+    def registrar(self, offset, proximo_offset, ultima_entrada, total, bytes_csv, bytes_json=None, rpp=None):
+        registro = {'offset': offset, 'proximo_offset': proximo_offset,
+                    'ultima_entrada': ultima_entrada, 'total': total, 'bytes_csv': bytes_csv}
+        if rpp is not None:
+            registro['rpp'] = rpp  # No modo --adaptativo o rpp muda no meio da coleta
+        if bytes_json is not None:
+            registro['bytes_json'] = bytes_json
+        self._escrever(registro)
+
+    def concluir(self, offset_final, **extras):
+        self._escrever({'concluido': True, 'offset_final': offset_final, **extras})
+
+    def fechar(self):
+        if self._arquivo:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def ler_estado(self):
+        """Cabeçalho + último checkpoint (None se não houver diário)."""
+        if not os.path.exists(self.caminho):
+            return None
+        estado = {}
+        with open(self.caminho, encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    estado.update(json.loads(linha))
+                except json.JSONDecodeError:
+                    break  # Última linha pela metade (queda no meio da escrita)
+        return estado
+
+    @classmethod
+    def pendente_mais_recente(cls, indice, diretorio=''):
+        """Diário mais recente deste índice que ainda não foi concluído."""
+        padrao = os.path.join(diretorio, indice.nome_saida('*') + cls.SUFIXO)
+        for caminho in sorted(glob.glob(padrao), reverse=True):
+            diario = cls(caminho[:-len(cls.SUFIXO)])
+            estado = diario.ler_estado()
+            if estado and not estado.get('concluido') and os.path.exists(diario.arquivo_csv):
+                return diario, estado
+        return None
+
+
+# --- O MOTOR ---
+
+class MotorDeColeta:
+    """
+    Busca vários offsets do /browse ao mesmo tempo (até 'concorrencia'),
+    respeitando o LimitadorDePolidez, e grava as páginas NA ORDEM dos offsets.
+    O fim do índice é a primeira página vazia (ou repetida), como nos scripts antigos.
+    Com um ControladorAdaptativo, cada offset reservado usa o rpp do momento
+    (as páginas continuam contíguas: a próxima começa onde a anterior terminou).
+    """
+
+    def __init__(self, indice: TipoIndice, base_url=BASE_URL, rpp=RPP,
+                 concorrencia=CONCORRENCIA, taxa=TAXA_POLIDEZ, pausa_erro=PAUSA_ERRO,
+                 sessao=None, limitador=None, cache=None, controlador=None, vagas=None):
+        self.indice = indice
+        self.base_url = base_url
+        self.rpp = rpp
+        self.concorrencia = concorrencia
+        self.pausa_erro = pausa_erro
+        self.sessao = sessao or configurar_sessao(concorrencia)
+        self.limitador = limitador or LimitadorDePolidez(taxa)
+        self.cache = cache                # CacheHTTP opcional (--cache)
+        self.controlador = controlador    # ControladorAdaptativo opcional (--adaptativo)
+        self.vagas = vagas                # asyncio.Semaphore opcional: teto de requisições em voo entre motores
+        self.headers = {'User-Agent': indice.user_agent, 'Accept': ACCEPT}
+
+        self.proximo_offset = 0
+        self.offset_final = None          # Primeiro offset sem dados (fim do índice)
+        self.proximo_a_gravar = 0
+        self.pendentes = {}               # offset -> (itens_html, registros, timestamp, rpp)
+        self.ultima_entrada = ""
+        self.total_coletado = 0
+        self.requisicoes = 0
+        self.diario = None
+        self._executor = None             # Threads deste motor (vários motores podem dividir o mesmo loop)
+
+    def retomar(self, estado):
+        """Continua a partir do último checkpoint do diário."""
+        self.rpp = estado.get('rpp', self.rpp)
+        if self.controlador:
+            self.controlador.definir_rpp(self.indice.tipo, self.rpp)
+        self.proximo_offset = self.proximo_a_gravar = estado.get('proximo_offset', 0)
+        self.ultima_entrada = estado.get('ultima_entrada', "")
+        self.total_coletado = estado.get('total', 0)
+
+    # --- Rede ---
+
+    def _params(self, offset, rpp=None):
+        params = {'type': self.indice.tipo, 'order': 'ASC', 'rpp': str(rpp or self.rpp), 'offset': str(offset)}
+        params.update(self.indice.params_extra)
+        return params
+
+    def _buscar(self, offset, rpp=None):
+        if self.cache:
+            return self.cache.get(self.sessao, self.base_url, params=self._params(offset, rpp), headers=self.headers, timeout=TIMEOUT)
+        return self.sessao.get(self.base_url, params=self._params(offset, rpp), headers=self.headers, timeout=TIMEOUT)
+
+    async def _buscar_pagina(self, offset, rpp=None):
+        """Busca um offset até conseguir (429 -> limitador; erro -> pausa e tenta de novo)."""
+        # Página ainda válida no cache: sai do disco sem gastar ficha do limitador
+        guardada = self.cache.fresca(self.base_url, self._params(offset, rpp)) if self.cache else None
+        if guardada is not None:
+            metricas.contar('paginas_do_cache')
+            return guardada.text
+
+        while True:
+            await self.limitador.adquirir()
+            try:
+                async with self.vagas or nullcontext():
+                    inicio = time.perf_counter()
+                    response = await asyncio.get_running_loop().run_in_executor(self._executor, self._buscar, offset, rpp)
+                    latencia = time.perf_counter() - inicio
+                self.requisicoes += 1
+                metricas.observar('latencia_requisicao', latencia)
+                metricas.contar('requisicoes')
+                # 5xx já repetidos pelo Retry do urllib3 dentro desta mesma chamada
+                repetidas = len(getattr(getattr(response.raw, 'retries', None), 'history', ()) or ())
+                if repetidas:
+                    metricas.contar('retentativas', repetidas)
+                if response.status_code == 429:
+                    metricas.contar('respostas_429')
+                    metricas.contar('retentativas')
+                    self.limitador.penalizar(ler_retry_after(response))
+                    print(f"\n🐢 [429] Servidor pediu calma no offset {offset}. Nova taxa: {self.limitador.taxa:.2f} req/s")
+                    continue
+                response.raise_for_status()
+                if self.controlador:
+                    self.controlador.registrar(self.indice.tipo, latencia, erro=bool(repetidas))  # Decide também a recompensa
+                else:
+                    self.limitador.recompensar()
+                return response.text
+            except Exception as e:
+                metricas.contar('erros_requisicao')
+                metricas.contar('retentativas')
+                if self.controlador:
+                    self.controlador.registrar(self.indice.tipo, erro=True)
+                    pausa = self.controlador.pausa_apos_erro()
+                else:
+                    pausa = self.pausa_erro + random.uniform(0, 1)
+                print(f"\n⚠️ [ALERTA] Erro de conexão no offset {offset}: {e}")
+                print(f"🔄 [RETRY] Pausando {pausa:.0f}s para estabilização do servidor...")
+                await asyncio.sleep(pausa)
+
+    def extrair(self, html):
+        """Extrai a página com o extrator do índice, medindo o tempo de parse."""
+        with metricas.cronometro('parse_pagina'):
+            n_itens, registros = self.indice.extrator(html)
+        metricas.contar('paginas')
+        metricas.contar('registros_extraidos', len(registros))
+        return n_itens, registros
+
+    def _reservar_offset(self):
+        """Próximo (offset, rpp) a buscar, ou None depois do fim do índice."""
+        if self.offset_final is not None and self.proximo_offset >= self.offset_final:
+            return None
+        if self.controlador and self.controlador.adaptar_rpp:
+            self.rpp = self.controlador.rpp(self.indice.tipo)
+        offset = self.proximo_offset
+        self.proximo_offset += self.rpp
+        return offset, self.rpp
+
+    async def _worker(self, gravar):
+        while True:
+            reserva = self._reservar_offset()
+            if reserva is None:
+                return
+            offset, rpp = reserva
+            html = await self._buscar_pagina(offset, rpp)
+            n_itens, registros = self.extrair(html)
+            self.pendentes[offset] = (n_itens, registros, datetime.now().isoformat(), rpp)
+            gravar()
+
+    # --- Gravação ordenada ---
+
+    def _gravar_em_ordem(self, writer, arquivo, arquivo_json=None):
+        """Grava as páginas contíguas já baixadas e detecta o fim do índice."""
+        while self.proximo_a_gravar in self.pendentes:
+            offset = self.proximo_a_gravar
+            n_itens, registros, timestamp, rpp = self.pendentes.pop(offset)
+
+            if self.offset_final is not None and offset >= self.offset_final:
+                break
+
+            if not n_itens:
+                print(f"\n[FIM] Fim da lista de {self.indice.rotulo.lower()} alcançado no offset {offset}.")
+                self._encerrar(offset)
+                break
+
+            if registros and registros[0][0] == self.ultima_entrada:
+                print(f"\n[INFO] Repetição de dados ou fim de índice detectado.")
+                self._encerrar(offset)
+                break
+
+            if not registros:
+                print(f"\n⚠️ [ALERTA] Itens encontrados no HTML mas nenhum registro extraído no offset {offset}. Verifique os seletores.")
+
+            for valores in registros:
+                writer.writerow([*valores, offset, timestamp])
+                if arquivo_json:
+                    arquivo_json.write(linha_json(self.indice, [*valores, offset, timestamp]))
+            arquivo.flush()
+            if arquivo_json:
+                arquivo_json.flush()
+
+            if registros:
+                self.ultima_entrada = registros[0][0]
+            self.total_coletado += len(registros)
+            self.proximo_a_gravar = offset + rpp
+            if self.diario:
+                self.diario.registrar(offset, self.proximo_a_gravar, self.ultima_entrada,
+                                      self.total_coletado, arquivo.tell(),
+                                      arquivo_json.tell() if arquivo_json else None,
+                                      rpp if self.controlador else None)
+            print(f"✅ {self.indice.rotulo} coletados: {self.total_coletado} (Offset: {offset}) | "
+                  f"Taxa: {self.limitador.taxa:.2f} req/s", end='\r')
+
+    def _encerrar(self, offset):
+        self.offset_final = offset if self.offset_final is None else min(self.offset_final, offset)
+        for pendente in [o for o in self.pendentes if o >= self.offset_final]:
+            del self.pendentes[pendente]
+
+    async def coletar(self, arquivo_csv, diario=None, retomando=False, arquivo_json=None):
+        """Coleta gravando em arquivo_csv (e arquivo_json), em modo append se for uma retomada."""
+        # Uma thread por worker: o requests é bloqueante, o asyncio só orquestra
+        self._executor = ThreadPoolExecutor(self.concorrencia)
+        self.diario = diario
+        modo = 'a' if retomando else 'w'
+        try:
+            with open(arquivo_csv, mode=modo, newline='', encoding='utf-8-sig') as arquivo, \
+                    (open(arquivo_json, mode=modo, encoding='utf-8') if arquivo_json else nullcontext()) as f_json:
+                writer = csv.writer(arquivo)
+                if not retomando:
+                    writer.writerow(self.indice.cabecalho)
+                gravar = lambda: self._gravar_em_ordem(writer, arquivo, f_json)
+                await asyncio.gather(*(self._worker(gravar) for _ in range(self.concorrencia)))
+            if diario:
+                diario.concluir(self.offset_final)
+        finally:
+            if diario:
+                diario.fechar()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        return self.total_coletado
+
+
+def linha_json(indice: TipoIndice, linha):
+    """Uma linha do JSON Lines (mesmos valores da linha do CSV, com as chaves de campos_json)."""
+    return json.dumps(dict(zip(indice.campos_json, linha)), ensure_ascii=False) + "\n"
+
+
+def reconstruir_json(indice: TipoIndice, arquivo_csv, arquivo_json):
+    """Regera o JSON Lines a partir do CSV (diários antigos não guardam 'bytes_json')."""
+    with open(arquivo_csv, mode='r', newline='', encoding='utf-8-sig') as f, \
+            open(arquivo_json, 'w', encoding='utf-8') as f_json:
+        leitor = csv.reader(f)
+        next(leitor, None)
+        for linha in leitor:
+            *valores, offset, timestamp = linha
+            f_json.write(linha_json(indice, [*valores, int(offset), timestamp]))
+
+
+# --- PONTO DE ENTRADA COMUM DOS SCRIPTS ---
+
+def gravar_snapshot_colunar(arquivo_csv):
+    """Cópia tipada e mapeável do CSV (.arrow) para os leitores; sem pyarrow, não faz nada."""
+    destino = snapshot_colunar.gravar_de_csv(arquivo_csv)
+    if destino:
+        print(f"🧊 Snapshot colunar: {destino}")
+    return destino
+
+
+def resumir_cache(cache):
+    if not cache:
+        return
+    estatisticas = cache.estatisticas()
+    metricas.registrar_cache('http', (estatisticas['acertos'] + estatisticas['revalidadas'], estatisticas['baixadas']))
+    print(f"\n🗄️ [CACHE] {estatisticas['acertos']} páginas do disco | {estatisticas['revalidadas']} revalidadas (304) | "
+          f"{estatisticas['baixadas']} baixadas | {estatisticas['entradas']} entradas, {estatisticas['ocupado_mb']} MB")
+
+
+def resumir_controlador(controlador):
+    if not controlador:
+        return
+    for tipo, indice in controlador.indices.items():
+        metricas.definir(f'rpp_final_{tipo}', indice['rpp'])
+    rpps = ", ".join(f"{tipo} {indice['rpp']}" for tipo, indice in controlador.indices.items())
+    print(f"\n🎛️ [ADAPTATIVO] {controlador.ajustes} ajustes | rpp final: {rpps or controlador.rpp_inicial} | "
+          f"taxa final: {controlador.limitador.taxa:.2f} req/s | latência média móvel: {controlador.geral['latencia'] or 0:.2f}s")
+
+
+def adicionar_argumentos_coleta(parser, ajuda_taxa="Teto de requisições por segundo"):
+    """Opções de rede, polidez, retomada e cache (comuns aos coletores e ao coleta_completa.py)."""
+    parser.add_argument('--base-url', default=BASE_URL, help="URL do /browse (ex.: servidor local de testes)")
+    parser.add_argument('--rpp', type=int, default=RPP, help="Itens por página")
+    parser.add_argument('--concorrencia', type=int, default=CONCORRENCIA, help="Offsets buscados em paralelo")
+    parser.add_argument('--taxa', type=float, default=TAXA_POLIDEZ, help=ajuda_taxa)
+    parser.add_argument('--adaptativo', action='store_true',
+                        help="Ajusta rpp e taxa pela latência e pelos erros do servidor (dentro dos limites abaixo)")
+    parser.add_argument('--rpp-min', type=int, default=RPP_MINIMO, help="Menor rpp do --adaptativo")
+    parser.add_argument('--rpp-max', type=int, default=RPP_MAXIMO, help="Maior rpp do --adaptativo")
+    parser.add_argument('--taxa-min', type=float, default=TAXA_MINIMA, help="Piso de requisições por segundo")
+    parser.add_argument('--latencia-alvo', type=float, default=LATENCIA_ALVO,
+                        help="Segundos por página acima dos quais o --adaptativo reduz rpp e taxa")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continua a última coleta interrompida deste índice (mesmo CSV)")
+    parser.add_argument('--parser', choices=sorted(BACKENDS), default=None,
+                        help="Backend de HTML (padrão: GID_PARSER ou o mais rápido instalado)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Guarda as páginas em .gid_cache/http (ou GID_CACHE_DIR) e reaproveita na próxima execução")
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL,
+                        help="Segundos em que uma página do cache vale sem revalidar (padrão: 1 dia)")
+    parser.add_argument('--cache-replay', action='store_true',
+                        help="Usa o cache sem TTL nem revalidação (só baixa o que faltar); implica --cache")
+    parser.add_argument('--cache-max-mb', type=int, default=CACHE_TAMANHO_MAXIMO // (1024 * 1024),
+                        help="Tamanho máximo do cache em disco (as entradas menos usadas saem primeiro)")
+    return parser
+
+
+def criar_parser(indice: TipoIndice):
+    parser = argparse.ArgumentParser(description=f"Coleta do índice '{indice.tipo}' do RIUnB")
+    adicionar_argumentos_coleta(parser)
+    parser.add_argument('--delta', action='store_true',
+                        help="Coleta incremental: só baixa as faixas que mudaram desde o último snapshot")
+    parser.add_argument('--snapshot', default=None,
+                        help="CSV de referência do --delta (padrão: o mais recente do índice)")
+    return parser
+
+
+def criar_cache(args):
+    if not (args.cache or args.cache_replay):
+        return None
+    return CacheHTTP(ttl=args.cache_ttl, tamanho_maximo=args.cache_max_mb * 1024 * 1024, replay=args.cache_replay)
+
+
+def criar_controlador(args, limitador, adaptar_rpp=True):
+    if not args.adaptativo:
+        return None
+    return ControladorAdaptativo(limitador, args.rpp, args.rpp_min, args.rpp_max, args.latencia_alvo,
+                                 adaptar_rpp=adaptar_rpp)
+
+
+def preparar_saida(indice: TipoIndice, motor, resume=False):
+    """
+    CSV (e JSON Lines) de destino com o diário aberto: a coleta pendente mais
+    recente se 'resume' (já cortada no último checkpoint), senão um arquivo novo.
+    Devolve (arquivo_csv, diario, retomando, arquivo_json).
+    """
+    pendente = DiarioDeColeta.pendente_mais_recente(indice) if resume else None
+    retomando = bool(pendente) and 'bytes_csv' in pendente[1]
+    if pendente:
+        diario, estado = pendente
+        output_file = diario.arquivo_csv
+        if retomando:
+            # Corta o que foi escrito depois do último checkpoint (página pela metade)
+            with open(output_file, 'r+b') as f:
+                f.truncate(estado['bytes_csv'])
+            motor.retomar(estado)
+        diario.abrir(indice, motor.rpp, novo=not retomando)
+        print(f"♻️ [RETOMADA] Continuando {output_file} a partir do offset {motor.proximo_offset} "
+              f"({motor.total_coletado} registros já salvos)")
+    else:
+        if resume:
+            print(f"ℹ️ [RETOMADA] Nenhuma coleta interrompida de {indice.rotulo.lower()} encontrada. Começando do zero.")
+        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M")
+        output_file = indice.nome_saida(timestamp_str)
+        diario = DiarioDeColeta(output_file)
+        diario.abrir(indice, motor.rpp)
+
+    arquivo_json = os.path.splitext(output_file)[0] + '.jsonl' if indice.campos_json else None
+    if arquivo_json and retomando:
+        if 'bytes_json' in estado and os.path.exists(arquivo_json):
+            with open(arquivo_json, 'r+b') as f:
+                f.truncate(estado['bytes_json'])
+        else:
+            reconstruir_json(indice, output_file, arquivo_json)
+    return output_file, diario, retomando, arquivo_json
+
+
+def executar(indice: TipoIndice, argv=None):
+    parser = criar_parser(indice)
+    args = parser.parse_args(argv)
+    if args.delta and args.resume:
+        parser.error("--delta e --resume não se combinam: a coleta delta não grava checkpoints.")
+
+    backend = usar_backend(args.parser)
+    cache = criar_cache(args)
+    limitador = LimitadorDePolidez(args.taxa, taxa_minima=args.taxa_min)
+    # rpp fixo na coleta delta (ela compara páginas do snapshot) e com cache (a chave inclui o rpp)
+    controlador = criar_controlador(args, limitador, adaptar_rpp=not (args.delta or cache))
+    motor = MotorDeColeta(indice, base_url=args.base_url, rpp=controlador.rpp(indice.tipo) if controlador else args.rpp,
+                          concorrencia=args.concorrencia, limitador=limitador, cache=cache,
+                          controlador=controlador)
+
+    if args.delta:
+        from coleta_delta import executar_delta
+        with metricas.estagio(f"coleta_delta_{indice.tipo}"):
+            resultado = executar_delta(indice, motor, args.snapshot)
+            metricas.definir('taxa_final_req_s', motor.limitador.taxa)
+            resumir_cache(cache)
+            resumir_controlador(controlador)
+        return resultado
+
+    output_file, diario, retomando, arquivo_json = preparar_saida(indice, motor, args.resume)
+
+    print(f"🔬 [INÍCIO] Coleta de {indice.rotulo} (type={indice.tipo})")
+    print(f"📁 [ARQUIVO] {output_file}" + (f" | JSON: {arquivo_json}" if arquivo_json else ""))
+    adaptativo = f" (adaptativo {args.rpp_min}-{args.rpp_max})" if controlador and controlador.adaptar_rpp else ""
+    print(f"⚙️ [CONFIG] RPP: {motor.rpp}{adaptativo} | Concorrência: {args.concorrencia} | Polidez: {args.taxa:.1f} req/s | "
+          f"HTML: {backend}" + (f" | Cache: {cache.diretorio} ({'replay' if cache.replay else f'TTL {cache.ttl:.0f}s'})" if cache else ""))
+    print("-" * 60)
+
+    inicio = time.time()
+    try:
+        with metricas.estagio(f"coleta_{indice.tipo}"):
+            asyncio.run(motor.coletar(output_file, diario, retomando, arquivo_json))
+            metricas.definir('taxa_final_req_s', motor.limitador.taxa)
+            resumir_cache(cache)
+            resumir_controlador(controlador)
+
+        print(f"\n\n✨ [CONCLUÍDO] Extração de {indice.rotulo.lower()} finalizada: {motor.total_coletado} registros "
+              f"em {(time.time() - inicio) / 60:.1f} min.")
+        print(f"📄 Dataset disponível em: {output_file}")
+        gravar_snapshot_colunar(output_file)
+
+    except KeyboardInterrupt:
+        print(f"\n\n🛑 [INTERROMPIDO] Coleta abortada. Dados salvos até o offset {motor.proximo_a_gravar}.")
+        print(f"♻️ Para continuar deste ponto: --resume")
+
+    return motor
@@ -0,0 +1,212 @@
+"""
+Servidor DSpace de mentira para desenvolver os coletores sem bater no RIUnB.
+
+Serve /browse?type=...&rpp=...&offset=... com o mesmo HTML que os extratores
+esperam (li.list-group-item com <a> e span.badge), a partir dos snapshots em
+data/raw. Pode simular lentidão e respostas 429 para exercitar a polidez:
+latência fixa, latência por item da página (páginas grandes custam mais) e
+crises periódicas de lentidão (a cada N segundos, D segundos com a latência
+multiplicada), para ver o --adaptativo dos coletores recuar e se recuperar.
+Manda ETag em cada página e responde 304 ao If-None-Match correspondente
+(--sem-etag simula um servidor sem validadores, como o cache HTTP também precisa tratar).
+
+Uso:
+    python src/harvesters/servidor_dspace_local.py --porta 8765 --latencia 0.2 --taxa-429 0.05
+    python src/harvesters/servidor_dspace_local.py --latencia 0.05 --latencia-por-item 0.004 --lentidao 30 10 8
+    python src/harvesters/riunb_author.py --base-url http://127.0.0.1:8765/browse
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import html
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+DIR_RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+DIR_RAW = os.path.join(DIR_RAIZ, 'data', 'raw')
+
+SNAPSHOTS = {
+    'author': 'riunb_authors_scraping_*.csv',
+    'advisor': 'riunb_advisors_scraping_*.csv',
+    'subject': 'riunb_subjects_scraping_*.csv',
+}
+
+MODELO_PAGINA = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>Navegando por {tipo}</title></head>
+<body>
+<div class="container">
+<h2>Navegando por {tipo}</h2>
+<ul class="list-group">
+{itens}
+</ul>
+</div>
+</body>
+</html>
+"""
+
+MODELO_TERMO = ('<li class="list-group-item"><span class="badge">{freq}</span>'
+                '<a href="/browse?type={tipo}&amp;value={valor}">{termo}</a></li>')
+MODELO_TITULO = '<li class="list-group-item"><a href="/handle/10482/{handle}">{termo}</a></li>'
+
+
+def carregar_indices(dir_raw=DIR_RAW):
+    """Lê o snapshot mais recente de cada tipo: lista de (termo, frequência)."""
+    indices = {}
+    for tipo, padrao in SNAPSHOTS.items():
+        arquivos = sorted(glob.glob(os.path.join(dir_raw, padrao)))
+        if not arquivos:
+            continue
+        with open(arquivos[-1], mode='r', encoding='utf-8-sig') as f:
+            leitor = csv.reader(f)
+            next(leitor, None)
+            # O snapshot pode trazer páginas repetidas (sobreposição de offsets); o índice não
+            registros = {linha[0]: linha[1] for linha in leitor if len(linha) >= 2}
+            indices[tipo] = list(registros.items())
+    # Títulos sintéticos, só para o coletor de títulos ter o que ler
+    indices['title'] = [(f"Título de teste {k:05d}", str(k)) for k in range(1, 2001)]
+    return indices
+
+
+def renderizar_pagina(tipo, registros):
+    if tipo == 'title':
+        itens = [MODELO_TITULO.format(handle=handle, termo=html.escape(termo)) for termo, handle in registros]
+    else:
+        itens = [MODELO_TERMO.format(freq=freq, tipo=tipo, valor=quote(termo), termo=html.escape(termo))
+                 for termo, freq in registros]
+    return MODELO_PAGINA.format(tipo=tipo, itens="\n".join(itens))
+
+
+class ServidorDSpaceLocal(ThreadingHTTPServer):
+    """ThreadingHTTPServer com os índices em memória e o 'humor' configurável."""
+    daemon_threads = True
+
+    def __init__(self, endereco, indices, latencia=0.0, taxa_429=0.0, retry_after=1, etag=True,
+                 latencia_por_item=0.0, lentidao=None):
+        super().__init__(endereco, ManipuladorBrowse)
+        self.indices = indices
+        self.latencia = latencia
+        self.latencia_por_item = latencia_por_item
+        self.lentidao = lentidao          # (período, duração, fator) em segundos, ou None
+        self.inicio = time.monotonic()
+        self.taxa_429 = taxa_429
+        self.retry_after = retry_after
+        self.etag = etag
+        self.requisicoes = 0
+        self.respostas_429 = 0
+        self.respostas_304 = 0
+        self.em_andamento = 0
+        self.pico_simultaneas = 0         # Maior número de requisições atendidas ao mesmo tempo
+        self._trava = threading.Lock()
+
+    def atraso(self, n_itens):
+        """Latência desta resposta: fixa + por item, multiplicada durante uma crise de lentidão."""
+        atraso = self.latencia + self.latencia_por_item * n_itens
+        if self.lentidao:
+            periodo, duracao, fator = self.lentidao
+            if (time.monotonic() - self.inicio) % periodo >= periodo - duracao:
+                atraso *= fator
+        return atraso
+
+    @property
+    def url_browse(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/browse"
+
+
+class ManipuladorBrowse(BaseHTTPRequestHandler):
+
+    def log_message(self, formato, *args):
+        pass  # Silencioso: o terminal é dos coletores
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/browse':
+            self.send_error(404)
+            return
+
+        servidor = self.server
+        with servidor._trava:
+            servidor.requisicoes += 1
+
+        if servidor.taxa_429 and random.random() < servidor.taxa_429:
+            with servidor._trava:
+                servidor.respostas_429 += 1
+            self.send_response(429)
+            self.send_header('Retry-After', str(servidor.retry_after))
+            self.end_headers()
+            return
+
+        params = parse_qs(url.query)
+        tipo = params.get('type', [''])[0]
+        rpp = int(params.get('rpp', ['20'])[0])
+        offset = int(params.get('offset', ['0'])[0])
+        registros = servidor.indices.get(tipo, [])[offset:offset + rpp]
+
+        atraso = servidor.atraso(len(registros))
+        if atraso:
+            with servidor._trava:
+                servidor.em_andamento += 1
+                servidor.pico_simultaneas = max(servidor.pico_simultaneas, servidor.em_andamento)
+            try:
+                time.sleep(atraso)
+            finally:
+                with servidor._trava:
+                    servidor.em_andamento -= 1
+
+        corpo = renderizar_pagina(tipo, registros).encode('utf-8')
+        etag = f'"{hashlib.sha1(corpo).hexdigest()[:16]}"' if servidor.etag else None
+        if etag and self.headers.get('If-None-Match') == etag:
+            with servidor._trava:
+                servidor.respostas_304 += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def iniciar_em_segundo_plano(indices=None, porta=0, **humor):
+    """Sobe o servidor numa thread (porta 0 = livre) e devolve a instância."""
+    servidor = ServidorDSpaceLocal(('127.0.0.1', porta), indices or carregar_indices(), **humor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DSpace local de mentira para os coletores")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.0, help="Segundos de atraso por resposta")
+    parser.add_argument('--taxa-429', type=float, default=0.0, help="Probabilidade de responder 429")
+    parser.add_argument('--retry-after', type=int, default=1, help="Valor do cabeçalho Retry-After")
+    parser.add_argument('--sem-etag', action='store_true', help="Não manda ETag nem responde 304")
+    parser.add_argument('--latencia-por-item', type=float, default=0.0, help="Segundos extras por item da página")
+    parser.add_argument('--lentidao', type=float, nargs=3, metavar=('PERIODO', 'DURACAO', 'FATOR'),
+                        help="A cada PERIODO s, DURACAO s com a latência multiplicada por FATOR")
+    args = parser.parse_args()
+
+    servidor = ServidorDSpaceLocal(('127.0.0.1', args.porta), carregar_indices(),
+                                   latencia=args.latencia, taxa_429=args.taxa_429,
+                                   retry_after=args.retry_after, etag=not args.sem_etag,
+                                   latencia_por_item=args.latencia_por_item, lentidao=args.lentidao)
+    print(f"🧪 [LOCAL] DSpace de mentira em {servidor.url_browse}")
+    for tipo, registros in servidor.indices.items():
+        print(f"   ↳ type={tipo}: {len(registros)} registros")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n🛑 Encerrado. Requisições: {servidor.requisicoes} | 429 enviados: {servidor.respostas_429} | "
+              f"304 enviados: {servidor.respostas_304}")
@@ -1,8 +1,31 @@
+import argparse
 import csv
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
-from datetime import datetime
+import hashlib
+import io
+import itertools
+import json
 import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comum'))
+import metricas  # noqa: E402
+
+# Depósito em lotes (--lotes): limites de cada arquivo enviado ao Crossref (0 = sem limite)
+LIMITE_REGISTROS_LOTE = 5000
+LIMITE_BYTES_LOTE = 10 * 1024 * 1024
+PARTES_POR_LOTE = 100   # Um lote grande demais em bytes vira até 100 arquivos (-2, -3, ...)
+PROCESSOS = int(os.environ.get("GID_PROCESSOS", "1"))
+
+# Na ordem em que o minidom gravava (declarações de namespace primeiro)
+CROSSREF_ATRIBUTOS = {
+    "xmlns": "http://www.crossref.org/schema/5.4.0",
+    "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+    "version": "5.4.0",
+    "xsi:schemaLocation": "http://www.crossref.org/schema/5.4.0 http://www.crossref.org/schema/deposit/crossref5.4.0.xsd"
+}
 
 def converter_grau(grau_raw):
     """Mapeia o tipo de trabalho para o padrão internacional."""
@@ -11,14 +34,291 @@ def converter_grau(grau_raw):
     if 'dissertação' in termo: return "Master"
     return "Thesis"
 
-def criar_xml_unb_v_final():
+class EscritorXMLIncremental:
+    """
+    Grava o XML à medida que os elementos chegam, já indentado, no mesmo formato
+    do minidom.toprettyxml(indent="  ") que usávamos: elemento só com texto numa
+    linha, elemento vazio como <tag/>. Nada fica acumulado em memória.
+    """
+
+    def __init__(self, arquivo, indentacao="  ", nivel=0, declaracao=True):
+        self.arquivo = arquivo
+        self.indentacao = indentacao
+        self.nivel = nivel     # Indentação inicial (trechos gravados à parte, ex.: uma <dissertation>)
+        self.abertos = []
+        self.pendente = False  # '<tag ...' escrito, ainda sem saber se terá filhos
+        if declaracao:
+            arquivo.write('<?xml version="1.0" ?>\n')
+
+    def _recuo(self):
+        return self.indentacao * (self.nivel + len(self.abertos))
+
+    @staticmethod
+    def escapar(texto):
+        # Mesmo resultado de ET.tostring + parse do minidom (quebras \r viram \n)
+        texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+        return texto.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+    def _abrir_tag(self, tag, atributos):
+        if self.pendente:
+            self.arquivo.write(">\n")
+        self.arquivo.write(f"{self._recuo()}<{tag}")
+        for nome, valor in (atributos or {}).items():
+            self.arquivo.write(f' {nome}="{self.escapar(valor)}"')
+
+    def abrir(self, tag, atributos=None):
+        self._abrir_tag(tag, atributos)
+        self.abertos.append(tag)
+        self.pendente = True
+
+    def fechar(self):
+        tag = self.abertos.pop()
+        if self.pendente:
+            self.arquivo.write("/>\n")
+        else:
+            self.arquivo.write(f"{self._recuo()}</{tag}>\n")
+        self.pendente = False
+
+    def folha(self, tag, texto=None, atributos=None):
+        self._abrir_tag(tag, atributos)
+        if texto:
+            self.arquivo.write(f">{self.escapar(texto)}</{tag}>\n")
+        else:
+            self.arquivo.write("/>\n")
+        self.pendente = False
+
+    def trecho(self, texto):
+        """Insere XML já formatado (ex.: dissertações renderizadas em outro escritor)."""
+        if self.pendente:
+            self.arquivo.write(">\n")
+            self.pendente = False
+        self.arquivo.write(texto)
+
+def escrever_cabecalho(xml, timestamp, doi_batch_id=None):
+    xml.abrir("head")
+    xml.folha("doi_batch_id", doi_batch_id or f"UnB_batch_{timestamp}")
+    xml.folha("timestamp", timestamp)
+    xml.abrir("depositor")
+    xml.folha("depositor_name", "bcunb:bcunb")
+    xml.folha("email_address", "patricianuness@unb.br")
+    xml.fechar()
+    xml.folha("registrant", "WEB-FORM")
+    xml.fechar()
+
+def escrever_dissertacao(xml, row):
+    xml.abrir("dissertation")
+
+    # Ordem correta das tags conforme Schema
+    xml.abrir("contributors")
+    xml.abrir("person_name", {"sequence": "first", "contributor_role": "author"})
+    xml.folha("given_name") # Reservado
+    xml.folha("surname", row.get('dc.contributor.author', ''))
+    xml.fechar()
+    xml.fechar()
+
+    xml.abrir("titles")
+    xml.folha("title", row.get('dc.title', ''))
+    xml.fechar()
+
+    # Tratamento de Data
+    data_raw = row.get('dc.date.submitted', '')
+    xml.abrir("approval_date")
+    if len(data_raw) >= 10: # Formato YYYY-MM-DD
+        partes = data_raw.split('-')
+        mes, dia, ano = partes[1], partes[2], partes[0]
+        xml.folha("month", mes)
+        xml.folha("day", dia)
+        xml.folha("year", ano)
+    else:
+        xml.folha("year", data_raw[:4])
+    xml.fechar()
+
+    # Instituição conforme legado
+    xml.abrir("institution")
+    xml.folha("institution_name", "Universidade de Brasília")
+    xml.folha("institution_acronym", "UnB")
+
+    unidade_raw = row.get('dc.description.unidade', '')
+    if unidade_raw:
+        unidade_clean = ", ".join([u.strip() for u in unidade_raw.split('||')])
+        xml.folha("institution_department", unidade_clean)
+    xml.fechar()
+
+    xml.folha("degree", converter_grau(row.get('dc.type', '')))
+
+    # DOI e URL
+    doi_val = row.get('dc.identifier.doi[pt_BR]', '')
+    xml.abrir("doi_data")
+    xml.folha("doi", str(doi_val) if doi_val else "")
+    xml.folha("resource", row.get('dc.identifier.uri', ''))
+    xml.fechar()
+
+    xml.fechar()
+
+@metricas.estagio('crossref')
+def gravar_lote(linhas, caminho_xml, timestamp):
+    """
+    Grava um <doi_batch> com as linhas (qualquer iterável de dicionários do CSV),
+    uma <dissertation> por vez. Escreve num temporário e só troca pelo arquivo
+    final no fim: um erro no meio não deixa XML pela metade. Devolve o nº de registros.
+    """
+    temporario = f"{caminho_xml}.tmp"
+    registros = 0
+    try:
+        with open(temporario, "w", encoding="utf-8") as out:
+            xml = EscritorXMLIncremental(out)
+            xml.abrir("doi_batch", CROSSREF_ATRIBUTOS)
+            escrever_cabecalho(xml, timestamp)
+            xml.abrir("body")
+            for row in linhas:
+                escrever_dissertacao(xml, row)
+                registros += 1
+            xml.fechar()
+            xml.fechar()
+        os.replace(temporario, caminho_xml)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    metricas.contar('registros', registros)
+    metricas.contar('bytes', os.path.getsize(caminho_xml))
+    return registros
+
+# --- DEPÓSITO EM LOTES ---
+
+def renderizar_dissertacao(row):
+    """Uma <dissertation> já indentada como fica dentro de <body>."""
+    buffer = io.StringIO()
+    escrever_dissertacao(EscritorXMLIncremental(buffer, nivel=2, declaracao=False), row)
+    return buffer.getvalue()
+
+def montar_documento(registros, timestamp, doi_batch_id):
+    buffer = io.StringIO()
+    xml = EscritorXMLIncremental(buffer)
+    xml.abrir("doi_batch", CROSSREF_ATRIBUTOS)
+    escrever_cabecalho(xml, timestamp, doi_batch_id)
+    xml.abrir("body")
+    for registro in registros:
+        xml.trecho(registro)
+    xml.fechar()
+    xml.fechar()
+    return buffer.getvalue().encode("utf-8")
+
+def _gerar_lote(tarefa):
+    """
+    Gera os arquivos de UM lote (roda nos processos do pool). Se o lote passar do
+    limite de bytes, é dividido em partes; cada arquivo tem doi_batch_id e
+    timestamp próprios. Devolve as entradas do manifesto.
+    """
+    linhas, numero, caminho_base, inicio, limite_bytes = tarefa
+    renderizados = [renderizar_dissertacao(row) for row in linhas]
+
+    # Tamanho fixo (cabeçalho + fechamento) medido com o maior id possível
+    fixo = len(montar_documento([], "0" * 17, f"UnB_batch_{'0' * 17}_{numero:04d}-{PARTES_POR_LOTE}"))
+    partes, atual, tamanho = [], [], fixo
+    for registro in renderizados:
+        nbytes = len(registro.encode("utf-8"))
+        if atual and limite_bytes and tamanho + nbytes > limite_bytes:
+            partes.append(atual)
+            atual, tamanho = [], fixo
+        atual.append(registro)
+        tamanho += nbytes
+    partes.append(atual)
+    if len(partes) > PARTES_POR_LOTE:
+        raise ValueError(f"Lote {numero} precisaria de {len(partes)} arquivos: aumente o limite de bytes ou reduza o de registros")
+
+    entradas = []
+    for parte, registros in enumerate(partes, start=1):
+        sufixo = f"{numero:04d}" if parte == 1 else f"{numero:04d}-{parte}"
+        # Timestamps distintos e crescentes na ordem dos arquivos
+        timestamp = (inicio + timedelta(milliseconds=(numero - 1) * PARTES_POR_LOTE + parte - 1)).strftime("%Y%m%d%H%M%S%f")[:-3]
+        doi_batch_id = f"UnB_batch_{inicio.strftime('%Y%m%d%H%M%S%f')[:-3]}_{sufixo}"
+        conteudo = montar_documento(registros, timestamp, doi_batch_id)
+        caminho = f"{caminho_base}_{sufixo}.xml"
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "wb") as out:
+            out.write(conteudo)
+        os.replace(temporario, caminho)
+        entradas.append({"arquivo": os.path.basename(caminho), "doi_batch_id": doi_batch_id, "timestamp": timestamp,
+                         "registros": len(registros), "bytes": len(conteudo),
+                         "sha256": hashlib.sha256(conteudo).hexdigest()})
+    return entradas
+
+@metricas.estagio('crossref_lotes')
+def gerar_lotes(caminho_csv, limite_registros=LIMITE_REGISTROS_LOTE, limite_bytes=LIMITE_BYTES_LOTE, processos=PROCESSOS):
+    """
+    Divide o CSV em depósitos de até 'limite_registros' registros e 'limite_bytes'
+    bytes, gerados em paralelo, e grava o manifesto com todos os arquivos.
+    Só 2 lotes por processo ficam em memória ao mesmo tempo.
+    """
+    diretorio = os.path.dirname(caminho_csv)
+    nome_base = os.path.splitext(os.path.basename(caminho_csv))[0]
+    caminho_base = os.path.join(diretorio, f"{nome_base}_para_crossref")
+    inicio = datetime.now()
+
+    lotes = []
+    with open(caminho_csv, mode='r', encoding='utf-8') as f:
+        leitor = csv.DictReader(f)
+        tarefas = ((linhas, numero, caminho_base, inicio, limite_bytes)
+                   for numero, linhas in enumerate(iter(lambda: list(itertools.islice(leitor, limite_registros or None)), []), start=1))
+        try:
+            if processos > 1:
+                with ProcessPoolExecutor(max_workers=processos) as pool:
+                    em_andamento = deque()
+                    for tarefa in tarefas:
+                        em_andamento.append(pool.submit(_gerar_lote, tarefa))
+                        if len(em_andamento) >= processos * 2:
+                            lotes.extend(em_andamento.popleft().result())
+                    while em_andamento:
+                        lotes.extend(em_andamento.popleft().result())
+            else:
+                for tarefa in tarefas:
+                    lotes.extend(_gerar_lote(tarefa))
+        except Exception:
+            # Sem manifesto não há depósito: não deixa lotes soltos de uma execução que falhou
+            for lote in lotes:
+                caminho = os.path.join(diretorio, lote["arquivo"])
+                if os.path.exists(caminho): os.remove(caminho)
+            raise
+
+    manifesto = {
+        "origem": os.path.basename(caminho_csv),
+        "gerado_em": inicio.isoformat(timespec="seconds"),
+        "limite_registros": limite_registros,
+        "limite_bytes": limite_bytes,
+        "total_registros": sum(lote["registros"] for lote in lotes),
+        "lotes": lotes,
+    }
+    metricas.contar('registros', manifesto['total_registros'])
+    metricas.contar('arquivos', len(lotes))
+    metricas.contar('bytes', sum(lote['bytes'] for lote in lotes))
+    caminho_manifesto = f"{caminho_base}_manifesto.json"
+    with open(caminho_manifesto, "w", encoding="utf-8") as out:
+        json.dump(manifesto, out, ensure_ascii=False, indent=2)
+    return caminho_manifesto, manifesto
+
+def criar_xml_unb_v_final(caminho_csv=None, lotes=False, limite_registros=LIMITE_REGISTROS_LOTE,
+                          limite_bytes=LIMITE_BYTES_LOTE, processos=PROCESSOS):
     # 1. Solicitação de Caminho
-    caminho_csv = input("Digite ou cole o caminho completo do arquivo CSV: ").strip().replace('"', '')
-    
+    caminho_csv = caminho_csv or input("Digite ou cole o caminho completo do arquivo CSV: ").strip().replace('"', '')
+
     if not os.path.exists(caminho_csv):
         print(f"Erro: O arquivo '{caminho_csv}' não foi encontrado.")
         return
 
+    if lotes:
+        try:
+            caminho_manifesto, manifesto = gerar_lotes(caminho_csv, limite_registros, limite_bytes, processos)
+        except Exception as e:
+            print(f"\nOcorreu um erro durante a criação dos lotes: {e}")
+            return
+        print("\n" + "="*50)
+        print("ARTESANATO CONCLUÍDO COM SUCESSO!")
+        print(f"{len(manifesto['lotes'])} lotes | {manifesto['total_registros']} registros | "
+              f"maior arquivo: {max((l['bytes'] for l in manifesto['lotes']), default=0) / 1024:.0f} KB")
+        print(f"Manifesto: {caminho_manifesto}")
+        print("="*50)
+        return
+
     # Definir caminho de saída no mesmo diretório
     diretorio = os.path.dirname(caminho_csv)
     nome_base = os.path.splitext(os.path.basename(caminho_csv))[0]
@@ -26,83 +326,27 @@ def criar_xml_unb_v_final():
 
     # 2. Configurações de Cabeçalho
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S%f")[:-3]
-    
-    root = ET.Element("doi_batch", {
-        "version": "5.4.0",
-        "xmlns": "http://www.crossref.org/schema/5.4.0",
-        "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
-        "xsi:schemaLocation": "http://www.crossref.org/schema/5.4.0 http://www.crossref.org/schema/deposit/crossref5.4.0.xsd"
-    })
-
-    head = ET.SubElement(root, "head")
-    ET.SubElement(head, "doi_batch_id").text = f"UnB_batch_{timestamp}"
-    ET.SubElement(head, "timestamp").text = timestamp
-    depositor = ET.SubElement(head, "depositor")
-    ET.SubElement(depositor, "depositor_name").text = "bcunb:bcunb"
-    ET.SubElement(depositor, "email_address").text = "patricianuness@unb.br"
-    ET.SubElement(head, "registrant").text = "WEB-FORM"
-
-    body = ET.SubElement(root, "body")
-
-    # 3. Processamento dos Dados
+
+    # 3. Processamento dos Dados (cada registro vai direto para o arquivo, memória constante)
     try:
         with open(caminho_csv, mode='r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                dissertation = ET.SubElement(body, "dissertation")
-                
-                # Ordem correta das tags conforme Schema
-                contributors = ET.SubElement(dissertation, "contributors")
-                person = ET.SubElement(contributors, "person_name", {"sequence": "first", "contributor_role": "author"})
-                ET.SubElement(person, "given_name") # Reservado
-                ET.SubElement(person, "surname").text = row.get('dc.contributor.author', '')
-
-                titles = ET.SubElement(dissertation, "titles")
-                ET.SubElement(titles, "title").text = row.get('dc.title', '')
-                
-                # Tratamento de Data
-                data_raw = row.get('dc.date.submitted', '')
-                app_date = ET.SubElement(dissertation, "approval_date")
-                if len(data_raw) >= 10: # Formato YYYY-MM-DD
-                    partes = data_raw.split('-')
-                    ET.SubElement(app_date, "month").text = partes[1]
-                    ET.SubElement(app_date, "day").text = partes[2]
-                    ET.SubElement(app_date, "year").text = partes[0]
-                else:
-                    ET.SubElement(app_date, "year").text = data_raw[:4]
-
-                # Instituição conforme legado
-                inst = ET.SubElement(dissertation, "institution")
-                ET.SubElement(inst, "institution_name").text = "Universidade de Brasília"
-                ET.SubElement(inst, "institution_acronym").text = "UnB"
-                
-                unidade_raw = row.get('dc.description.unidade', '')
-                if unidade_raw:
-                    unidade_clean = ", ".join([u.strip() for u in unidade_raw.split('||')])
-                    ET.SubElement(inst, "institution_department").text = unidade_clean
-
-                ET.SubElement(dissertation, "degree").text = converter_grau(row.get('dc.type', ''))
-
-                # DOI e URL
-                doi_val = row.get('dc.identifier.doi[pt_BR]', '')
-                doi_data = ET.SubElement(dissertation, "doi_data")
-                ET.SubElement(doi_data, "doi").text = str(doi_val) if doi_val else ""
-                ET.SubElement(doi_data, "resource").text = row.get('dc.identifier.uri', '')
-
-        # 4. Finalização e Gravação
-        xml_str = ET.tostring(root, encoding='utf-8')
-        pretty_xml = minidom.parseString(xml_str).toprettyxml(indent="  ")
-
-        with open(caminho_xml, "w", encoding="utf-8") as out:
-            out.write(pretty_xml)
-        
+            registros = gravar_lote(csv.DictReader(f), caminho_xml, timestamp)
+
         print("\n" + "="*50)
         print("ARTESANATO CONCLUÍDO COM SUCESSO!")
-        print(f"Arquivo gerado: {caminho_xml}")
+        print(f"Arquivo gerado: {caminho_xml} ({registros} registros)")
         print("="*50)
 
     except Exception as e:
         print(f"\nOcorreu um erro durante a criação do código: {e}")
 
 if __name__ == "__main__":
-    criar_xml_unb_v_final()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Gera o XML de depósito do Crossref a partir do CSV exportado")
+    parser.add_argument('csv', nargs='?', help="CSV de entrada (se omitido, é perguntado)")
+    parser.add_argument('--lotes', action='store_true',
+                        help="Divide o depósito em vários arquivos, cada um com seu doi_batch_id, mais um manifesto")
+    parser.add_argument('--max-registros', type=int, default=LIMITE_REGISTROS_LOTE, help="Registros por lote (0 = sem limite)")
+    parser.add_argument('--max-bytes', type=int, default=LIMITE_BYTES_LOTE, help="Tamanho máximo de cada XML (0 = sem limite)")
+    parser.add_argument('--processos', type=int, default=PROCESSOS, help="Lotes gerados em paralelo (padrão: GID_PROCESSOS ou 1)")
+    args = parser.parse_args()
+    criar_xml_unb_v_final(args.csv, args.lotes, args.max_registros, args.max_bytes, max(1, args.processos))
\ No newline at end of file
@@ -1,10 +1,22 @@
 import os
 import re
 import csv
+import argparse
+import hashlib
+import pickle
+import sys
 import unicodedata
 import xml.etree.ElementTree as ET
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from thefuzz import fuzz, process
+from functools import lru_cache
+from rapidfuzz import fuzz as rfuzz, process as rprocess
+from thefuzz.utils import full_process
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'comum'))
+import metricas  # noqa: E402
+import normalizacao  # noqa: E402
 
 # --- CONFIGURAÇÕES ---
 __version__ = "0.5 (Memória de Caminho)"
@@ -12,16 +24,28 @@ __version__ = "0.5 (Memória de Caminho)"
 # Arquivo para salvar o último caminho usado (criado automaticamente)
 ARQUIVO_CONFIG = ".gid_last_path"
 
-# OBS: Caminhos dos arquivos de referência
-CAMINHO_CSV_ADVISORS = '/Users/leonardorcarvalho/Library/CloudStorage/OneDrive-Pessoal/Documentos/GitHub/gid-docs/testefinal/advisor-ppg.csv'
-CAMINHO_CSV_KEYWORDS = '/Users/leonardorcarvalho/Library/CloudStorage/OneDrive-Pessoal/Documentos/GitHub/gid-docs/testefinal/keywords.csv'
+# OBS: Caminhos dos arquivos de referência (sobrescreva com GID_CSV_ADVISORS / GID_CSV_KEYWORDS ou pela linha de comando)
+CAMINHO_CSV_ADVISORS = os.environ.get("GID_CSV_ADVISORS", '/Users/leonardorcarvalho/Library/CloudStorage/OneDrive-Pessoal/Documentos/GitHub/gid-docs/testefinal/advisor-ppg.csv')
+CAMINHO_CSV_KEYWORDS = os.environ.get("GID_CSV_KEYWORDS", '/Users/leonardorcarvalho/Library/CloudStorage/OneDrive-Pessoal/Documentos/GitHub/gid-docs/testefinal/keywords.csv')
+
+# Cópia binária dos CSVs já lidos (pula a leitura do CSV nas próximas execuções)
+DIR_CACHE = os.environ.get("GID_CACHE_DIR", ".gid_cache")
+VERSAO_CACHE = 1
 
 # Limiares de Semelhança (0 a 100)
 THRESHOLD_ADVISOR = 90
 THRESHOLD_KEYWORD = 90
+TAMANHO_CACHE = 65536   # Termos já resolvidos guardados pelo índice de correspondência
 
+# Processos paralelos para as pastas de itens (1 = serial, como sempre foi)
+PROCESSOS = int(os.environ.get("GID_PROCESSOS", "1"))
+
+# Grafias fixas (siglas e nomes próprios). Para acrescentar outras sem mexer no código, use o
+# arquivo ARQUIVO_PRESERVAR (uma por linha; sobrescreva com GID_PRESERVAR ou --preservar).
 PRESERVAR = ['UnB', 'IBICT', 'Brasília', 'Distrito Federal', 'Brasil', 'PMDF', 'DF', 'Mestrado', 'Doutorado', 'MEC', 'CAPES', 'MDF', 'PP', 'PEAD']
 
+ARQUIVO_PRESERVAR = os.environ.get("GID_PRESERVAR", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preservar.txt'))
+
 TEXTO_LICENCA = (
     "A concessão da licença deste item refere-se ao termo de autorização impresso assinado pelo autor com as seguintes condições: "
     "Na qualidade de titular dos direitos de autor da publicação, autorizo a Universidade de Brasília e o IBICT a disponibilizar "
@@ -77,17 +101,197 @@ def carregar_csv_dict(caminho, com_frequencia=False):
         print(f"[ERRO] Falha ao ler CSV {caminho}: {e}")
     return dados
 
-BASE_ADVISORS = carregar_csv_dict(CAMINHO_CSV_ADVISORS)
-BASE_KEYWORDS = carregar_csv_dict(CAMINHO_CSV_KEYWORDS, com_frequencia=True)
+class IndiceDeCorrespondencia:
+    """
+    Substitui process.extract(termo, lista, limit=3, scorer=fuzz.token_sort_ratio)
+    com o mesmo resultado, montado uma vez só:
+
+    - As referências são pré-processadas como o thefuzz faz (full_process com
+      force_ascii) e já com os tokens ordenados: o token_sort_ratio vira um
+      fuzz.ratio simples.
+    - Forma idêntica é nota 100: se 'limite' referências batem, nem há busca.
+    - O ratio nunca passa de 200*min/(la+lb), então só entram na busca as
+      referências com comprimento compatível com a nota mínima (busca binária).
+    - Termos repetidos (muito comuns nas keywords) saem de um cache LRU.
+
+    Só voltam candidatos com nota >= limiar - 0.5 (os únicos que arredondam
+    para o limiar); quem chama continua aplicando o limiar, como antes.
+    """
+
+    def __init__(self, referencias: dict, limiar: int, tamanho_cache: int = TAMANHO_CACHE):
+        self.termos = list(referencias.keys())
+        self.corte = limiar - 0.5
+        formas = [self.forma(t) for t in self.termos]
+
+        self.exatos = {}
+        for k, forma in enumerate(formas):
+            self.exatos.setdefault(forma, []).append(k)
+
+        self.ordem = sorted(range(len(formas)), key=lambda k: len(formas[k]))
+        self.formas_ordenadas = [formas[k] for k in self.ordem]
+        self.comprimentos = [len(f) for f in self.formas_ordenadas]
+        self.melhores = lru_cache(maxsize=tamanho_cache)(self._melhores)
+
+    @staticmethod
+    def forma(texto: str) -> str:
+        """'Educação a distância' -> 'a distncia educao' (o que o token_sort_ratio compara)."""
+        return " ".join(sorted(full_process(texto, force_ascii=True).split()))
+
+    def _melhores(self, consulta: str, limite: int = 3) -> list:
+        # O thefuzz processa a consulta duas vezes (sem e com force_ascii)
+        forma = self.forma(full_process(consulta))
+
+        exatos = self.exatos.get(forma, ())
+        if len(exatos) >= limite:
+            return [(self.termos[k], 100) for k in exatos[:limite]]
+
+        # ratio >= corte  =>  corte/(200-corte) <= lb/la <= (200-corte)/corte
+        la, fator = len(forma), self.corte / (200 - self.corte)
+        inicio = bisect_left(self.comprimentos, la * fator - 1)
+        fim = bisect_right(self.comprimentos, la / fator + 1)
+        metricas.contar('comparacoes_fuzzy', fim - inicio)
+        achados = rprocess.extract(forma, self.formas_ordenadas[inicio:fim], scorer=rfuzz.ratio,
+                                   score_cutoff=self.corte, limit=None)
+        # Mesma ordem do process.extract: nota decrescente, empate pela posição na lista
+        achados = sorted((-nota, self.ordem[inicio + pos]) for _, nota, pos in achados)[:limite]
+        return [(self.termos[k], int(round(-nota))) for nota, k in achados]
+
+# --- BASES DE REFERÊNCIA (carregadas só quando alguém precisa) ---
+
+_BASES = {}
+
+def _hash_arquivo(caminho):
+    h = hashlib.sha1()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def carregar_csv_com_cache(caminho, com_frequencia=False):
+    """
+    carregar_csv_dict com cópia em pickle no DIR_CACHE. A cópia vale enquanto o
+    CSV tiver o mesmo mtime e tamanho; se só o mtime mudou (arquivo copiado ou
+    'tocado'), o hash do conteúdo decide.
+    """
+    if not os.path.exists(caminho):
+        return carregar_csv_dict(caminho, com_frequencia)
+
+    info = os.stat(caminho)
+    chave = hashlib.sha1(f"{os.path.abspath(caminho)}|{com_frequencia}".encode('utf-8')).hexdigest()[:16]
+    arquivo_cache = os.path.join(DIR_CACHE, f"{chave}.pickle")
+
+    registro = None
+    try:
+        with open(arquivo_cache, 'rb') as f:
+            registro = pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[AVISO] Cache ilegível, lendo o CSV de novo: {e}")
+
+    if registro and registro.get('versao') == VERSAO_CACHE and registro['tamanho'] == info.st_size:
+        if registro['mtime_ns'] == info.st_mtime_ns:
+            return registro['dados']
+        if registro['sha1'] == _hash_arquivo(caminho):
+            registro['mtime_ns'] = info.st_mtime_ns
+            _gravar_cache(arquivo_cache, registro)
+            return registro['dados']
+
+    dados = carregar_csv_dict(caminho, com_frequencia)
+    _gravar_cache(arquivo_cache, {'versao': VERSAO_CACHE, 'caminho': os.path.abspath(caminho),
+                                  'mtime_ns': info.st_mtime_ns, 'tamanho': info.st_size,
+                                  'sha1': _hash_arquivo(caminho), 'dados': dados})
+    return dados
 
+def _gravar_cache(arquivo_cache, registro):
+    try:
+        os.makedirs(DIR_CACHE, exist_ok=True)
+        temporario = f"{arquivo_cache}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(registro, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, arquivo_cache)  # Nunca deixa um cache pela metade
+    except OSError as e:
+        print(f"[AVISO] Não foi possível gravar o cache de {registro['caminho']}: {e}")
+
+def configurar_bases(csv_advisors=None, csv_keywords=None):
+    """Troca os CSVs de referência (CLI); as bases são recarregadas no próximo uso."""
+    global CAMINHO_CSV_ADVISORS, CAMINHO_CSV_KEYWORDS
+    if csv_advisors: CAMINHO_CSV_ADVISORS = csv_advisors
+    if csv_keywords: CAMINHO_CSV_KEYWORDS = csv_keywords
+    _BASES.clear()
+
+def definir_bases(advisors, keywords):
+    """Instala bases já carregadas (ex.: recebidas pelos processos do pool)."""
+    _BASES.clear()
+    _BASES['advisors'], _BASES['keywords'] = advisors, keywords
+
+def base_advisors():
+    if 'advisors' not in _BASES:
+        _BASES['advisors'] = carregar_csv_com_cache(CAMINHO_CSV_ADVISORS)
+    return _BASES['advisors']
+
+def base_keywords():
+    if 'keywords' not in _BASES:
+        _BASES['keywords'] = carregar_csv_com_cache(CAMINHO_CSV_KEYWORDS, com_frequencia=True)
+    return _BASES['keywords']
+
+def indice_advisors():
+    if 'indice_advisors' not in _BASES:
+        _BASES['indice_advisors'] = IndiceDeCorrespondencia(base_advisors(), THRESHOLD_ADVISOR)
+    return _BASES['indice_advisors']
+
+def indice_keywords():
+    if 'indice_keywords' not in _BASES:
+        _BASES['indice_keywords'] = IndiceDeCorrespondencia(base_keywords(), THRESHOLD_KEYWORD)
+    return _BASES['indice_keywords']
+
+# --- REGRAS DE CAIXA ---
+
+_MAPA_PRESERVAR = None  # minúsculas -> grafia oficial (montado no primeiro uso)
+
+def ler_lista_preservar(caminho):
+    """Uma grafia por linha; linhas vazias e comentários (#) são ignorados."""
+    if not caminho or not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8-sig') as f:
+        return [linha.strip() for linha in f if linha.strip() and not linha.lstrip().startswith('#')]
+
+def configurar_preservar(caminho=None, mapa=None):
+    """
+    Monta o dicionário de grafias fixas: PRESERVAR + arquivo. Quando duas entradas
+    diferem só na caixa, vale a primeira (como na antiga busca linear).
+    'mapa' instala um dicionário pronto (processos do pool).
+    """
+    global _MAPA_PRESERVAR, ARQUIVO_PRESERVAR
+    if caminho: ARQUIVO_PRESERVAR = caminho
+    if mapa is None:
+        mapa = {}
+        for termo in PRESERVAR + ler_lista_preservar(ARQUIVO_PRESERVAR):
+            mapa.setdefault(termo.lower(), termo)
+    _MAPA_PRESERVAR = mapa
+    aplicar_regra_caracteres.cache_clear()
+    tratar_titulo.cache_clear()
+    return mapa
+
+def mapa_preservar():
+    if _MAPA_PRESERVAR is None:
+        configurar_preservar()
+    return _MAPA_PRESERVAR
+
+def _nucleo_e_grafia(palavra, mapa):
+    """Núcleo da palavra (sem pontuação) e a grafia fixa dele, se houver: O(1) por palavra."""
+    # Palavra só com letras/dígitos já é o próprio núcleo: pula a regex
+    nucleo = palavra if palavra.isalnum() else normalizacao.nucleo_palavra(palavra)
+    return nucleo, mapa.get(nucleo.lower())
+
+@lru_cache(maxsize=normalizacao.TAMANHO_CACHE)
 def aplicar_regra_caracteres(texto):
     if not texto: return texto
-    palavras = texto.strip().split()
+    mapa = mapa_preservar()
     resultado = []
-    for p in palavras:
-        p_limpa = re.sub(r'[^\w]', '', p)
-        if any(fixo.lower() == p_limpa.lower() for fixo in PRESERVAR):
-            correta = [fixo for fixo in PRESERVAR if fixo.lower() == p_limpa.lower()][0]
+    for p in texto.split():
+        p_limpa, correta = _nucleo_e_grafia(p, mapa)
+        if correta:
             resultado.append(p.replace(p_limpa, correta))
         elif len(p_limpa) <= 3:
             resultado.append(p.lower())
@@ -95,22 +299,22 @@ def aplicar_regra_caracteres(texto):
             resultado.append(p.capitalize())
     return " ".join(resultado)
 
+@lru_cache(maxsize=normalizacao.TAMANHO_CACHE)
 def tratar_titulo(texto):
     if not texto: return ""
-    txt = texto.strip()
-    palavras = txt.split()
+    mapa = mapa_preservar()
     res = []
-    for i, p in enumerate(palavras):
-        p_l = re.sub(r'[^\w]', '', p)
-        if any(f.lower() == p_l.lower() for f in PRESERVAR):
-            correta = [f for f in PRESERVAR if f.lower() == p_l.lower()][0]
+    for i, p in enumerate(texto.split()):
+        p_l, correta = _nucleo_e_grafia(p, mapa)
+        if correta:
             res.append(p.replace(p_l, correta))
         else:
             res.append(p.capitalize() if i == 0 else p.lower())
-    return re.sub(r'\s*:\s*', ' : ', " ".join(res))
+    return normalizacao.RE_DOIS_PONTOS.sub(' : ', " ".join(res))
 
 # --- PROCESSAMENTO XML ---
 
+@metricas.cronometro('processar_xml')
 def processar_xml(caminho_arquivo):
     diretorio_item = os.path.dirname(caminho_arquivo)
     nome_pasta = os.path.basename(diretorio_item)
@@ -164,9 +368,9 @@ def processar_xml(caminho_arquivo):
                     termos = re.split(r'[;,\.]', txt)
                     for t in [term.strip() for term in termos if term.strip()]:
                         t_limpo = re.sub(r'[\{\}\[\]\<\>\\\/]', '', t)
-                        m_k = process.extract(t_limpo, list(BASE_KEYWORDS.keys()), limit=3, scorer=fuzz.token_sort_ratio)
+                        m_k = indice_keywords().melhores(t_limpo)
                         validos = [m for m in m_k if m[1] >= THRESHOLD_KEYWORD]
-                        escolhido = max(validos, key=lambda x: BASE_KEYWORDS[x[0]])[0] if validos else aplicar_regra_caracteres(t_limpo)
+                        escolhido = max(validos, key=lambda x: base_keywords()[x[0]])[0] if validos else aplicar_regra_caracteres(t_limpo)
                         
                         RELATORIO_KEYWORDS.append({'arquivo': nome_pasta, 'original': t, 'escolhido': escolhido, 'status': "CSV" if validos else "ORIGINAL"})
                         
@@ -177,7 +381,7 @@ def processar_xml(caminho_arquivo):
                     continue
 
                 if el == "contributor" and qu == "advisor":
-                    m_a = process.extract(txt, list(BASE_ADVISORS.keys()), limit=3, scorer=fuzz.token_sort_ratio)
+                    m_a = indice_advisors().melhores(txt)
                     res = m_a[0][0] if m_a and m_a[0][1] >= THRESHOLD_ADVISOR else aplicar_regra_caracteres(txt)
                     RELATORIO_ADVISORS.append({'arquivo': nome_pasta, 'original': txt, 'escolhido': res, 'status': "CSV" if m_a and m_a[0][1] >= THRESHOLD_ADVISOR else "ORIGINAL"})
                     txt = res
@@ -260,12 +464,85 @@ def sanitizar_diretorios(caminho_raiz):
                 except Exception as e:
                     print(f"   Erro ao renomear {item}: {e}")
 
+# --- EXECUÇÃO EM LOTE (SERIAL OU PARALELA) ---
+
+def listar_xmls_por_pasta(caminho_raiz):
+    """Arquivos .xml agrupados por pasta, na ordem do os.walk (a ordem dos relatórios)."""
+    pastas = []
+    for raiz, _, arquivos in os.walk(caminho_raiz):
+        xmls = [os.path.join(raiz, a) for a in arquivos if a.lower().endswith(".xml")]
+        if xmls:
+            pastas.append(xmls)
+    return pastas
+
+def _inicializar_worker(advisors, keywords, preservar, data_execucao):
+    """Cada processo recebe as bases do processo principal e monta os próprios índices."""
+    global DATA_EXECUCAO
+    definir_bases(advisors, keywords)
+    configurar_preservar(mapa=preservar)
+    DATA_EXECUCAO = data_execucao
+
+def _caches():
+    """Acertos/erros dos caches do organizador (regras de caixa e índices de correspondência)."""
+    caches = {'aplicar_regra_caracteres': aplicar_regra_caracteres.cache_info(), 'tratar_titulo': tratar_titulo.cache_info()}
+    for nome in ('indice_advisors', 'indice_keywords'):
+        if nome in _BASES:
+            caches[nome] = _BASES[nome].melhores.cache_info()
+    return caches
+
+def _processar_pasta(xmls):
+    """
+    Processa os XMLs de UMA pasta (todos gravam no mesmo dublin_core.xml, então
+    nunca são divididos entre processos) e devolve as linhas de relatório geradas
+    e as métricas desta tarefa (com os caches em diferença, para o principal somar).
+    """
+    inicio_a, inicio_k = len(RELATORIO_ADVISORS), len(RELATORIO_KEYWORDS)
+    antes = _caches()
+    with metricas.estagio('organizar_metadados'):
+        for caminho in xmls:
+            processar_xml(caminho)
+        for nome, info in _caches().items():
+            anterior = antes.get(nome)
+            metricas.registrar_cache(nome, (info.hits - (anterior.hits if anterior else 0),
+                                            info.misses - (anterior.misses if anterior else 0)))
+    novos = RELATORIO_ADVISORS[inicio_a:], RELATORIO_KEYWORDS[inicio_k:], metricas.instantaneo(zerar=True)
+    del RELATORIO_ADVISORS[inicio_a:], RELATORIO_KEYWORDS[inicio_k:]
+    return novos
+
+@metricas.estagio('organizar_metadados')
+def processar_pastas(caminho_raiz, processos=PROCESSOS):
+    """
+    Processa todas as pastas de itens. Com processos > 1, as pastas vão para um
+    pool; os relatórios voltam na ordem do os.walk, então saem iguais com
+    qualquer número de processos.
+    """
+    pastas = listar_xmls_por_pasta(caminho_raiz)
+    if processos > 1 and len(pastas) > 1:
+        print(f"⚙️ Processando {len(pastas)} pastas em {processos} processos...")
+        with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_worker,
+                                 initargs=(base_advisors(), base_keywords(), mapa_preservar(), DATA_EXECUCAO)) as pool:
+            # Lotes de pastas por tarefa: menos idas e vindas entre processos
+            lote = max(1, min(64, len(pastas) // (processos * 4)))
+            resultados = pool.map(_processar_pasta, pastas, chunksize=lote)
+            for advisors, keywords, medidas in resultados:
+                RELATORIO_ADVISORS.extend(advisors)
+                RELATORIO_KEYWORDS.extend(keywords)
+                metricas.mesclar(medidas)
+    else:
+        for xmls in pastas:
+            for caminho in xmls:
+                processar_xml(caminho)
+        metricas.registrar_caches(_caches())
+    total = sum(len(xmls) for xmls in pastas)
+    metricas.contar('xmls', total)
+    return total
+
 def exibir_relatorios():
     print("\n" + "="*80 + "\n📊 RESUMO GID/UnB\n" + "="*80)
     print(f"Orientadores processados: {len(RELATORIO_ADVISORS)}")
     print(f"Keywords processadas: {len(RELATORIO_KEYWORDS)}")
 
-def iniciar():
+def iniciar(processos=PROCESSOS):
     print(f"🚀 Iniciando GID v{__version__} | {DATA_EXECUCAO}")
     
     # --- INPUT COM MEMÓRIA ---
@@ -300,18 +577,25 @@ def iniciar():
     # Executa as funções
     sanitizar_diretorios(caminho_raiz)
     
+    print(f"📚 Bases de referência: {len(base_advisors())} orientadores | {len(base_keywords())} keywords | "
+          f"{len(mapa_preservar())} grafias fixas")
+
     print("\n🔍 Buscando arquivos XML...")
-    encontrados = 0
-    for raiz, _, arquivos in os.walk(caminho_raiz):
-        for arquivo in arquivos:
-            if arquivo.lower().endswith(".xml"): 
-                processar_xml(os.path.join(raiz, arquivo))
-                encontrados += 1
-                
+    encontrados = processar_pastas(caminho_raiz, processos)
+
     if encontrados == 0:
         print("[AVISO] Nenhum arquivo XML encontrado na pasta indicada.")
     
     exibir_relatorios()
 
 if __name__ == "__main__":
-    iniciar()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Higienização dos metadados (dublin_core.xml) das pastas de itens")
+    parser.add_argument('--processos', type=int, default=PROCESSOS,
+                        help="Pastas processadas em paralelo (padrão: GID_PROCESSOS ou 1)")
+    parser.add_argument('--csv-advisors', help="CSV de orientadores (padrão: GID_CSV_ADVISORS ou CAMINHO_CSV_ADVISORS)")
+    parser.add_argument('--csv-keywords', help="CSV de keywords (padrão: GID_CSV_KEYWORDS ou CAMINHO_CSV_KEYWORDS)")
+    parser.add_argument('--preservar', help="Arquivo com grafias fixas extras, uma por linha (padrão: GID_PRESERVAR ou preservar.txt)")
+    args = parser.parse_args()
+    configurar_bases(args.csv_advisors, args.csv_keywords)
+    configurar_preservar(args.preservar)
+    iniciar(max(1, args.processos))
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Testes do ControladorAdaptativo (modo --adaptativo do motor_coleta.py).
+
+Os limites (rpp_minimo/rpp_maximo, taxa_maxima do limitador) são conferidos
+resposta a resposta com latências e erros simulados; a coleta de ponta a
+ponta roda contra o servidor DSpace local com lentidão e 429, comparando os
+registros com os do modo fixo.
+
+Uso:
+    python -m pytest tests/
+"""
+
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'harvesters'))
+
+import motor_coleta  # noqa: E402
+import servidor_dspace_local  # noqa: E402
+from rinb_advisor import ORIENTADORES  # noqa: E402
+
+ORIENTADORES_TESTE = [(f"Orientador {k:04d}, Fulano", str(k % 7 + 1)) for k in range(800)]
+TAXA = 500.0
+RPP_MINIMO, RPP_MAXIMO = 20, 200
+
+
+def novo_controlador(taxa=5.0, rpp=50, latencia_alvo=1.0, janela=5):
+    limitador = motor_coleta.LimitadorDePolidez(taxa)
+    return motor_coleta.ControladorAdaptativo(limitador, rpp=rpp, rpp_minimo=RPP_MINIMO, rpp_maximo=RPP_MAXIMO,
+                                              latencia_alvo=latencia_alvo, janela=janela)
+
+
+def test_rpp_fica_entre_os_limites():
+    controlador = novo_controlador()
+    rpps = []
+    # Folga longa, crise longa, rajada de erros e folga de novo
+    for latencia, erro in [(0.1, False)] * 200 + [(5.0, False)] * 200 + [(None, True)] * 50 + [(0.1, False)] * 50:
+        controlador.registrar('advisor', latencia, erro=erro)
+        rpps.append(controlador.rpp('advisor'))
+
+    assert min(rpps) == RPP_MINIMO and max(rpps) == RPP_MAXIMO
+    assert all(RPP_MINIMO <= rpp <= RPP_MAXIMO for rpp in rpps)
+
+
+def test_rpp_encolhe_na_lentidao():
+    controlador = novo_controlador(rpp=100)
+    for _ in range(10):
+        controlador.registrar('advisor', 0.6)  # Dentro do alvo, mas sem folga: fica como está
+    assert controlador.rpp('advisor') == 100
+    for _ in range(5):
+        controlador.registrar('advisor', 3.0)
+    assert controlador.rpp('advisor') < 100
+    assert controlador.limitador.taxa < controlador.limitador.taxa_maxima
+
+
+def test_taxa_nunca_passa_do_teto():
+    random.seed(3)
+    controlador = novo_controlador(taxa=5.0)
+    limitador = controlador.limitador
+    for _ in range(2000):
+        sorteio = random.random()
+        if sorteio < 0.02:
+            limitador.penalizar(retry_after=0)
+        elif sorteio < 0.05:
+            controlador.registrar('advisor', erro=True)
+        else:
+            controlador.registrar('advisor', random.choice([0.05, 0.3, 2.0]))
+        assert limitador.taxa_minima <= limitador.taxa <= limitador.taxa_maxima == 5.0
+
+
+@pytest.fixture
+def servidor():
+    ativos = []
+
+    def subir(**humor):
+        ativos.append(servidor_dspace_local.iniciar_em_segundo_plano({'advisor': ORIENTADORES_TESTE}, **humor))
+        return ativos[-1]
+
+    yield subir
+    for ativo in ativos:
+        ativo.shutdown()
+        ativo.server_close()
+
+
+def coletar(url, destino, controlador=None, rpp=50):
+    limitador = controlador.limitador if controlador else motor_coleta.LimitadorDePolidez(TAXA)
+    motor = motor_coleta.MotorDeColeta(ORIENTADORES, base_url=url, rpp=rpp, concorrencia=4,
+                                       limitador=limitador, controlador=controlador)
+    diario = motor_coleta.DiarioDeColeta(destino)
+    diario.abrir(ORIENTADORES, motor.rpp)
+    asyncio.run(motor.coletar(destino, diario))
+    with open(destino, newline='', encoding='utf-8-sig') as f:
+        registros = [tuple(linha[:2]) for linha in list(csv.reader(f))[1:]]
+    with open(diario.caminho, encoding='utf-8') as f:
+        checkpoints = [json.loads(linha) for linha in f if '"offset"' in linha]
+    return motor, registros, checkpoints
+
+
+# Latência proporcional ao tamanho da página (50 itens ~ 0.2s) para o rpp ter efeito
+HUMOR_BASE = {'latencia': 0.01, 'latencia_por_item': 0.004}
+CENARIOS = {
+    'lentidao': {'lentidao': (1.0, 0.5, 5)},
+    '429': {'taxa_429': 0.1, 'retry_after': 0},
+}
+
+
+@pytest.mark.parametrize('cenario', list(CENARIOS))
+def test_coleta_adaptativa_igual_ao_modo_fixo(servidor, tmp_path, cenario):
+    random.seed(11)
+    _, fixos, _ = coletar(servidor(**HUMOR_BASE, **CENARIOS[cenario]).url_browse, str(tmp_path / 'fixo.csv'))
+
+    random.seed(11)
+    controlador = motor_coleta.ControladorAdaptativo(motor_coleta.LimitadorDePolidez(TAXA), rpp=50,
+                                                     rpp_minimo=RPP_MINIMO, rpp_maximo=RPP_MAXIMO,
+                                                     latencia_alvo=0.1, janela=3, pausa_minima=0.05)
+    local = servidor(**HUMOR_BASE, **CENARIOS[cenario])
+    motor, adaptativos, checkpoints = coletar(local.url_browse, str(tmp_path / 'adaptativo.csv'), controlador)
+
+    assert fixos == adaptativos == ORIENTADORES_TESTE
+    if cenario == '429':
+        assert local.respostas_429 > 0
+    # Páginas de 50 passam do alvo: o rpp encolhe, sem sair dos limites, e as páginas seguem contíguas
+    rpps = [checkpoint['rpp'] for checkpoint in checkpoints]
+    assert min(rpps) < 50 and all(RPP_MINIMO <= rpp <= RPP_MAXIMO for rpp in rpps)
+    for anterior, seguinte in zip(checkpoints, checkpoints[1:]):
+        assert seguinte['offset'] == anterior['offset'] + anterior['rpp']
+    assert motor.limitador.taxa <= TAXA
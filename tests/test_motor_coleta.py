@@ -0,0 +1,166 @@
+"""
+Testes do motor_coleta.py contra o servidor DSpace local (servidor_dspace_local.py).
+
+Cada teste sobe o servidor numa porta livre com um índice pequeno e conhecido,
+coleta com o MotorDeColeta de verdade (sessão, limitador, diário) e confere
+os arquivos gravados.
+
+Uso:
+    python -m pytest tests/
+"""
+
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'harvesters'))
+
+import motor_coleta  # noqa: E402
+import servidor_dspace_local  # noqa: E402
+from rinb_advisor import ORIENTADORES  # noqa: E402
+from riunb_title import TITULOS  # noqa: E402
+
+ORIENTADORES_TESTE = [(f"Orientador {k:04d}, Fulano", str(k % 7 + 1)) for k in range(237)]
+TITULOS_TESTE = [(f"Título de teste {k:04d}", str(k)) for k in range(1, 181)]
+TAXA = 500.0  # O servidor é local: o limitador só entra em cena quando há 429
+
+
+@pytest.fixture
+def servidor():
+    """Fábrica: servidor(**humor) sobe um servidor local; todos caem no fim do teste."""
+    ativos = []
+
+    def subir(**humor):
+        indices = {'advisor': ORIENTADORES_TESTE, 'title': TITULOS_TESTE}
+        ativos.append(servidor_dspace_local.iniciar_em_segundo_plano(indices, **humor))
+        return ativos[-1]
+
+    yield subir
+    for ativo in ativos:
+        ativo.shutdown()
+        ativo.server_close()
+
+
+def coletar(motor, destino, diario=None, retomando=False, arquivo_json=None):
+    return asyncio.run(motor.coletar(destino, diario, retomando, arquivo_json))
+
+
+def ler_csv(caminho):
+    with open(caminho, newline='', encoding='utf-8-sig') as f:
+        linhas = list(csv.reader(f))
+    return linhas[0], linhas[1:]
+
+
+def test_grava_em_ordem_com_concorrencia(servidor, tmp_path):
+    # Crises curtas de lentidão: as respostas chegam fora da ordem dos offsets
+    local = servidor(latencia=0.005, lentidao=(0.05, 0.02, 10))
+    motor = motor_coleta.MotorDeColeta(TITULOS, base_url=local.url_browse, rpp=20, concorrencia=4, taxa=TAXA)
+    destino, destino_json = str(tmp_path / 'titulos.csv'), str(tmp_path / 'titulos.jsonl')
+
+    assert coletar(motor, destino, arquivo_json=destino_json) == len(TITULOS_TESTE)
+
+    cabecalho, linhas = ler_csv(destino)
+    assert cabecalho == TITULOS.cabecalho
+    assert [linha[0] for linha in linhas] == [titulo for titulo, _ in TITULOS_TESTE]
+    assert [linha[1] for linha in linhas] == [f"/handle/10482/{handle}" for _, handle in TITULOS_TESTE]
+    offsets = [int(linha[2]) for linha in linhas]
+    assert offsets == sorted(offsets)
+    assert local.pico_simultaneas > 1
+
+    with open(destino_json, encoding='utf-8') as f:
+        registros = [json.loads(linha) for linha in f]
+    assert [r['titulo'] for r in registros] == [linha[0] for linha in linhas]
+    assert [r['origem_offset'] for r in registros] == offsets
+
+
+def test_fim_do_indice(servidor, tmp_path):
+    local = servidor()
+    motor = motor_coleta.MotorDeColeta(ORIENTADORES, base_url=local.url_browse, rpp=50, concorrencia=3, taxa=TAXA)
+    destino = str(tmp_path / 'orientadores.csv')
+    diario = motor_coleta.DiarioDeColeta(destino)
+    diario.abrir(ORIENTADORES, motor.rpp)
+
+    assert coletar(motor, destino, diario) == len(ORIENTADORES_TESTE)
+
+    _, linhas = ler_csv(destino)
+    assert [tuple(linha[:2]) for linha in linhas] == ORIENTADORES_TESTE
+    estado = diario.ler_estado()
+    assert estado['concluido'] and estado['offset_final'] == 250
+    # 5 páginas com dados + a primeira vazia; as outras vagas param no máximo uma página adiante cada
+    assert 6 <= local.requisicoes <= 6 + motor.concorrencia
+
+
+def test_recua_no_429_com_retry_after(servidor, tmp_path):
+    random.seed(7)
+    local = servidor(taxa_429=0.2, retry_after=1)
+    motor = motor_coleta.MotorDeColeta(ORIENTADORES, base_url=local.url_browse, rpp=20, concorrencia=2, taxa=TAXA)
+    destino = str(tmp_path / 'orientadores.csv')
+
+    inicio = time.monotonic()
+    assert coletar(motor, destino) == len(ORIENTADORES_TESTE)
+    duracao = time.monotonic() - inicio
+
+    assert local.respostas_429 > 0
+    # Todo 429 chegou ao limitador (o urllib3 não repete 429 por conta própria)...
+    assert motor.requisicoes == local.requisicoes
+    # ...que pausou todos pelo Retry-After e derrubou a taxa
+    assert duracao >= 1.0
+    assert motor.limitador.taxa < TAXA
+    _, linhas = ler_csv(destino)
+    assert [tuple(linha[:2]) for linha in linhas] == ORIENTADORES_TESTE
+
+
+def test_limitador_respeita_retry_after():
+    limitador = motor_coleta.LimitadorDePolidez(10.0)
+    limitador.penalizar(retry_after=0.5)
+    assert limitador.taxa == 5.0
+
+    inicio = time.monotonic()
+    asyncio.run(limitador.adquirir())
+    assert time.monotonic() - inicio >= 0.5
+
+
+def test_resume_sem_linhas_duplicadas(servidor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    local = servidor(latencia=0.02)
+
+    async def interromper(motor, saida):
+        destino, diario, retomando, arquivo_json = saida
+        tarefa = asyncio.create_task(motor.coletar(destino, diario, retomando, arquivo_json))
+        while motor.total_coletado < 60:
+            await asyncio.sleep(0.005)
+        tarefa.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+
+    motor = motor_coleta.MotorDeColeta(TITULOS, base_url=local.url_browse, rpp=20, concorrencia=2, taxa=TAXA)
+    saida = motor_coleta.preparar_saida(TITULOS, motor)
+    asyncio.run(interromper(motor, saida))
+    destino, _, _, destino_json = saida
+    # Queda no meio da escrita: meia página além do último checkpoint
+    with open(destino, 'a', newline='', encoding='utf-8') as f:
+        f.write('"Título pela met')
+    with open(destino_json, 'a', encoding='utf-8') as f:
+        f.write('{"titulo": "Título pela')
+
+    retomado = motor_coleta.MotorDeColeta(TITULOS, base_url=local.url_browse, rpp=20, concorrencia=2, taxa=TAXA)
+    arquivo_csv, diario, retomando, arquivo_json = motor_coleta.preparar_saida(TITULOS, retomado, resume=True)
+    assert retomando and arquivo_csv == destino
+    assert retomado.proximo_offset > 0
+    coletar(retomado, arquivo_csv, diario, retomando, arquivo_json)
+
+    with open(destino, 'rb') as f:
+        bruto = f.read()
+    assert bruto.startswith(b'\xef\xbb\xbf') and bruto.count(b'\xef\xbb\xbf') == 1
+    cabecalho, linhas = ler_csv(destino)
+    assert cabecalho == TITULOS.cabecalho
+    assert [linha[0] for linha in linhas] == [titulo for titulo, _ in TITULOS_TESTE]
+    with open(destino_json, encoding='utf-8') as f:
+        assert [json.loads(linha)['titulo'] for linha in f] == [linha[0] for linha in linhas]
+    assert motor_coleta.DiarioDeColeta(destino).ler_estado()['concluido']